@@ -19,6 +19,28 @@ a = Analysis(
         ('package_operations.py', '.'),
         ('system_monitor.py', '.'),
         ('unattend_creator.py', '.'),
+        ('system_alerts.py', '.'),
+        ('system_anomaly.py', '.'),
+        ('metrics_provider.py', '.'),
+        ('metrics_exporter.py', '.'),
+        ('monitor_daemon.py', '.'),
+        ('log_config.py', '.'),
+        ('startup_report.py', '.'),
+        ('app_paths.py', '.'),
+        ('prewarm.py', '.'),
+        ('single_instance.py', '.'),
+        ('wintool_cli.py', '.'),
+        ('operation_history.py', '.'),
+        ('install_scheduler.py', '.'),
+        ('install_benchmark.py', '.'),
+        ('installer_manifest.py', '.'),
+        ('elevation_broker.py', '.'),
+        ('winget_progress.py', '.'),
+        ('command_runner.py', '.'),
+        ('winget_updates.py', '.'),
+        ('software_inventory.py', '.'),
+        ('package_catalog.py', '.'),
+        ('package_search.py', '.'),
     ],
     hiddenimports=[
         'sv_ttk',
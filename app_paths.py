@@ -0,0 +1,16 @@
+import os
+
+APP_DIR_NAME = 'MTechWinTool'
+
+
+def get_data_dir():
+    """Per-user directory for caches and state, created on first use"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    path = os.path.join(base, APP_DIR_NAME)
+    if not os.path.exists(path):
+        os.makedirs(path)
+    return path
+
+
+def get_data_path(filename):
+    return os.path.join(get_data_dir(), filename)
@@ -0,0 +1,174 @@
+"""
+Shared runner for external commands (winget, sc, powercfg, ...).
+
+Every command gets a watchdog: an overall timeout, an optional output
+inactivity timeout for commands that hang silently (e.g. waiting on a
+prompt), a process-tree kill when either fires, and bounded retries with
+exponential backoff. stdin is closed so a command that asks a question
+fails instead of waiting forever.
+"""
+
+import codecs
+import locale
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# How often the watchdog checks a running command
+POLL_INTERVAL = 0.5
+# Time allowed for readers to drain the pipes after a kill
+DRAIN_TIMEOUT = 5
+
+command_stats = {'runs': 0, 'timeouts': 0, 'hangs': 0, 'retries': 0, 'failures': 0}
+_stats_lock = threading.Lock()
+
+
+class CommandHung(subprocess.TimeoutExpired):
+    """The command produced no output for longer than its idle timeout"""
+
+    def __str__(self):
+        return f"Command '{self.cmd}' produced no output for {self.timeout} seconds"
+
+
+def _count(key):
+    with _stats_lock:
+        command_stats[key] += 1
+
+
+def kill_process_tree(process):
+    """Terminate a process and everything it started (winget spawns installers)"""
+    if process.poll() is not None:
+        return
+    if hasattr(process, 'kill_tree'):
+        # Runs somewhere we cannot signal directly, e.g. the elevation broker
+        process.kill_tree()
+        return
+    try:
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/T', '/F', '/PID', str(process.pid)],
+                           capture_output=True, timeout=30, creationflags=subprocess.CREATE_NO_WINDOW)
+        else:
+            os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+    except Exception as e:
+        logger.warning(f"Failed to kill process tree {process.pid}: {str(e)}")
+        process.kill()
+
+
+def _read_pipe(pipe, decoder, chunks, activity, on_output=None):
+    """Reader thread: collect decoded output and stamp the time of the last chunk"""
+    while True:
+        data = pipe.read1(4096)
+        text = decoder.decode(data, final=not data)
+        if text:
+            activity[0] = time.monotonic()
+            chunks.append(text)
+            if on_output:
+                on_output(text)
+        if not data:
+            break
+
+
+def _run_once(cmd, timeout, idle_timeout, job, on_output, encoding, kwargs):
+    if os.name != 'nt':
+        kwargs.setdefault('start_new_session', True)
+    kwargs.setdefault('stdin', subprocess.DEVNULL)
+    stderr = subprocess.STDOUT if on_output else subprocess.PIPE
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, **kwargs)
+    if job:
+        job.attach(process)
+
+    started = time.monotonic()
+    activity = [started]
+    stdout_chunks, stderr_chunks = [], []
+    readers = [threading.Thread(target=_read_pipe, daemon=True, args=(
+        process.stdout, codecs.getincrementaldecoder(encoding)(errors='replace'), stdout_chunks, activity, on_output))]
+    if process.stderr:
+        readers.append(threading.Thread(target=_read_pipe, daemon=True, args=(
+            process.stderr, codecs.getincrementaldecoder(encoding)(errors='replace'), stderr_chunks, activity)))
+    for reader in readers:
+        reader.start()
+
+    error = None
+    try:
+        while True:
+            try:
+                process.wait(POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            now = time.monotonic()
+            if timeout is not None and now - started > timeout:
+                error = subprocess.TimeoutExpired
+                break
+            if idle_timeout is not None and now - activity[0] > idle_timeout:
+                error = CommandHung
+                break
+        if error:
+            kill_process_tree(process)
+            process.wait()
+        for reader in readers:
+            reader.join(DRAIN_TIMEOUT)
+    finally:
+        if job:
+            job.detach()
+
+    stdout, stderr = ''.join(stdout_chunks), ''.join(stderr_chunks)
+    if error:
+        raise error(cmd, idle_timeout if error is CommandHung else timeout, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
+def run_command(cmd, timeout=None, idle_timeout=None, retries=0, backoff=1.0, check=False,
+                job=None, on_output=None, encoding=None, **kwargs):
+    """subprocess.run() replacement with a watchdog. Output is always captured as text.
+
+    A command that runs longer than `timeout` raises TimeoutExpired, one that
+    is silent for longer than `idle_timeout` raises CommandHung; either way
+    its process tree is killed first. Timed out or hung commands are retried
+    up to `retries` times, waiting `backoff * 2**attempt` seconds in between.
+    A cancelled `job` is never retried.
+
+    With `on_output`, stderr is merged into stdout and each chunk of output
+    is passed on as soon as it arrives rather than after the process exits.
+    """
+    encoding = encoding or ('utf-8' if on_output else locale.getpreferredencoding(False))
+    attempt = 0
+    while True:
+        _count('runs')
+        try:
+            result = _run_once(cmd, timeout, idle_timeout, job, on_output, encoding, dict(kwargs))
+            break
+        except subprocess.TimeoutExpired as e:
+            _count('hangs' if isinstance(e, CommandHung) else 'timeouts')
+            logger.warning(f"{str(e)}; process tree killed")
+            if attempt >= retries or (job and job.cancelled):
+                _count('failures')
+                raise
+        delay = backoff * 2 ** attempt
+        attempt += 1
+        _count('retries')
+        logger.info(f"Retrying {cmd[0] if isinstance(cmd, (list, tuple)) else cmd} in {delay:.1f}s "
+                    f"(attempt {attempt + 1} of {retries + 1})")
+        time.sleep(delay)
+
+    if check and result.returncode != 0:
+        _count('failures')
+        raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+    return result
+
+
+def get_metrics():
+    with _stats_lock:
+        stats = dict(command_stats)
+    return [
+        ('wintool_commands_run', 'counter', 'External commands started, including retries', stats['runs']),
+        ('wintool_command_timeouts', 'counter', 'External commands killed for exceeding their timeout', stats['timeouts']),
+        ('wintool_command_hangs', 'counter', 'External commands killed for producing no output', stats['hangs']),
+        ('wintool_command_retries', 'counter', 'External command retries after a timeout or hang', stats['retries']),
+        ('wintool_command_failures', 'counter', 'External commands that failed after all attempts', stats['failures'])
+    ]
@@ -0,0 +1,297 @@
+"""
+Elevation broker for MTech WinTool.
+
+Instead of a UAC prompt and a PowerShell `Start-Process -Verb RunAs` per
+package, the app starts one elevated helper per session. The helper connects
+back to a localhost port opened by the app, proves it holds the session
+token, and then runs winget install/upgrade/uninstall jobs one at a time,
+streaming output lines and the exit code back as JSON lines.
+
+The helper only accepts the three winget operations with a validated
+package ID, never arbitrary commands.
+"""
+
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+from command_runner import kill_process_tree, run_command
+
+logger = logging.getLogger(__name__)
+
+BROKER_ARG = '--elevation-broker'
+OPERATIONS = {
+    'install': ['install', '--id', None, '-e', '--accept-source-agreements', '--accept-package-agreements'],
+    'upgrade': ['upgrade', '--id', None, '-e', '--accept-source-agreements', '--accept-package-agreements'],
+    'uninstall': ['uninstall', '--id', None, '-e', '--accept-source-agreements']
+}
+PACKAGE_ID_PATTERN = re.compile(r'^[\w.+\-]+$')
+# How long to wait for the user to answer the UAC prompt
+CONNECT_TIMEOUT = 120
+# After a declined or failed prompt, don't ask again for this long
+RETRY_AFTER = 300
+# Watchdog limits for a job when the app doesn't send its own
+JOB_TIMEOUT = 3600
+JOB_IDLE_TIMEOUT = 900
+# Extra time the app waits on the helper beyond a job's own limits before
+# giving up on it
+REPLY_GRACE = 60
+
+
+def build_command(op, package_id):
+    if op not in OPERATIONS or not PACKAGE_ID_PATTERN.match(package_id or ''):
+        raise ValueError(f"Refusing elevated {op} of {package_id!r}")
+    return ['winget'] + [package_id if arg is None else arg for arg in OPERATIONS[op]]
+
+
+def _send(conn, message):
+    conn.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+class HelperJob:
+    """Helper side: the running process of a job, for cancel requests"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.process = None
+        self.cancelled = False
+
+    def attach(self, process):
+        with self.lock:
+            self.process = process
+            cancelled = self.cancelled
+        if cancelled:
+            kill_process_tree(process)
+
+    def detach(self):
+        with self.lock:
+            self.process = None
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            process = self.process
+        if process:
+            kill_process_tree(process)
+
+
+class BrokerJob:
+    """Handle for a job running in the helper; lets a cancel reach the elevated process"""
+
+    def __init__(self, broker, job_id):
+        self.broker = broker
+        self.job_id = job_id
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def kill_tree(self):
+        self.broker.send({'cancel': self.job_id})
+
+
+class ElevationBroker:
+    """App side: launches the elevated helper once and submits jobs to it"""
+
+    def __init__(self):
+        self.token = secrets.token_hex(16)
+        self.conn = None
+        self.reader = None
+        self.lock = threading.Lock()
+        self.send_lock = threading.Lock()
+        self.job_ids = iter(range(1, sys.maxsize))
+        self.failed_at = None
+
+    def _helper_command(self, port):
+        args = [BROKER_ARG, '--port', str(port), '--token', self.token]
+        if getattr(sys, 'frozen', False):
+            return sys.executable, args
+        return sys.executable, [os.path.abspath(__file__)] + args
+
+    def start(self):
+        """Start the elevated helper (one UAC prompt). Returns True once connected"""
+        if self.conn:
+            return True
+        if self.failed_at and time.monotonic() - self.failed_at < RETRY_AFTER:
+            return False
+
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            listener.bind(('127.0.0.1', 0))
+            listener.listen(1)
+            listener.settimeout(CONNECT_TIMEOUT)
+            executable, args = self._helper_command(listener.getsockname()[1])
+            import ctypes
+            params = subprocess.list2cmdline(args)
+            if ctypes.windll.shell32.ShellExecuteW(None, "runas", executable, params, None, 0) <= 32:
+                raise RuntimeError("elevation was declined")
+
+            # Only a client that presents the session token is accepted
+            deadline = time.monotonic() + CONNECT_TIMEOUT
+            while time.monotonic() < deadline:
+                conn, _ = listener.accept()
+                reader = conn.makefile('r', encoding='utf-8')
+                conn.settimeout(5)
+                try:
+                    hello = json.loads(reader.readline())
+                except Exception:
+                    hello = {}
+                if hmac.compare_digest(str(hello.get('token', '')), self.token):
+                    conn.settimeout(None)
+                    self.conn, self.reader = conn, reader
+                    logger.info(f"Elevation broker connected (pid {hello.get('pid')})")
+                    return True
+                logger.warning("Rejected elevation broker connection with a bad token")
+                conn.close()
+            raise RuntimeError("timed out waiting for the elevated helper")
+        except Exception as e:
+            logger.error(f"Failed to start elevation broker: {str(e)}")
+            self.failed_at = time.monotonic()
+            return False
+        finally:
+            listener.close()
+
+    def send(self, message):
+        with self.send_lock:
+            _send(self.conn, message)
+
+    def run(self, op, package_id, job=None, on_output=None, timeout=JOB_TIMEOUT, idle_timeout=JOB_IDLE_TIMEOUT):
+        """Run a winget operation elevated.
+
+        The helper runs it under the same watchdog as a non-elevated command.
+        Should the helper itself stop answering for longer than that, the job
+        is cancelled and the helper dropped. Returns a CompletedProcess with
+        the streamed output, or None if the helper could not be started.
+        """
+        with self.lock:
+            if not self.start():
+                return None
+            job_id = next(self.job_ids)
+            handle = BrokerJob(self, job_id)
+            output = []
+            deadline = time.monotonic() + timeout + REPLY_GRACE
+            try:
+                # A read that sees nothing for this long raises TimeoutError
+                self.conn.settimeout(idle_timeout + REPLY_GRACE)
+                self.send({'id': job_id, 'op': op, 'package_id': package_id,
+                           'timeout': timeout, 'idle_timeout': idle_timeout})
+                if job:
+                    job.attach(handle)
+                for line in self.reader:
+                    message = json.loads(line)
+                    if message.get('id') != job_id:
+                        continue
+                    if 'output' in message:
+                        output.append(message['output'])
+                        if on_output:
+                            on_output(message['output'] + '\n')
+                    elif 'exit_code' in message:
+                        handle.returncode = message['exit_code']
+                        break
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"elevated {op} of {package_id} ran past {timeout} seconds")
+                else:
+                    raise ConnectionError("elevation broker disconnected")
+            except Exception as e:
+                logger.error(f"Elevation broker failed: {str(e)}")
+                if isinstance(e, TimeoutError):
+                    try:
+                        handle.kill_tree()
+                    except OSError:
+                        pass
+                # A timed out read leaves the connection unusable
+                self.close()
+                handle.returncode = -1
+            finally:
+                if job:
+                    job.detach()
+            return subprocess.CompletedProcess(build_command(op, package_id), handle.returncode, '\n'.join(output), '')
+
+    def close(self):
+        if self.conn:
+            try:
+                self.conn.close()
+            except OSError:
+                pass
+            self.conn = None
+            self.reader = None
+
+
+def serve(port, token):
+    """Helper side: connect back to the app and run jobs until it disconnects"""
+    conn = socket.create_connection(('127.0.0.1', port))
+    reader = conn.makefile('r', encoding='utf-8')
+    send_lock = threading.Lock()
+    running = {}
+
+    def send(message):
+        with send_lock:
+            _send(conn, message)
+
+    def run_job(request, job):
+        job_id = request.get('id')
+        pending = ['']
+
+        def on_output(text):
+            # Forward whole lines only
+            lines = (pending[0] + text).replace('\r', '\n').split('\n')
+            pending[0] = lines.pop()
+            for line in lines:
+                if line.strip():
+                    send({'id': job_id, 'output': line.rstrip()})
+
+        try:
+            cmd = build_command(request.get('op'), request.get('package_id'))
+            timeout = request.get('timeout')
+            idle_timeout = request.get('idle_timeout')
+            process = run_command(
+                cmd,
+                timeout=timeout if isinstance(timeout, (int, float)) and timeout > 0 else JOB_TIMEOUT,
+                idle_timeout=idle_timeout if isinstance(idle_timeout, (int, float)) and idle_timeout > 0 else JOB_IDLE_TIMEOUT,
+                job=job, on_output=on_output, creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+            )
+            exit_code = process.returncode
+        except Exception as e:
+            # Includes a timed out or hung winget, whose tree was killed
+            on_output(f"\nError: {str(e)}")
+            exit_code = -1
+        finally:
+            on_output('\n')
+            running.pop(job_id, None)
+        send({'id': job_id, 'exit_code': exit_code})
+
+    send({'token': token, 'pid': os.getpid()})
+    for line in reader:
+        request = json.loads(line)
+        if 'cancel' in request:
+            job = running.get(request['cancel'])
+            if job:
+                job.cancel()
+        else:
+            # Jobs run on a thread so cancel requests are still read meanwhile;
+            # registered first so a cancel can't arrive before the job exists
+            job = running[request.get('id')] = HelperJob()
+            threading.Thread(target=run_job, args=(request, job), daemon=True).start()
+    for job in list(running.values()):
+        job.cancel()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = dict(zip(argv[1::2], argv[2::2])) if argv[:1] == [BROKER_ARG] else {}
+    if '--port' not in args or '--token' not in args:
+        print(f"usage: elevation_broker {BROKER_ARG} --port PORT --token TOKEN", file=sys.stderr)
+        return 2
+    serve(int(args['--port']), args['--token'])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
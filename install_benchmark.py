@@ -0,0 +1,178 @@
+"""
+Benchmark for the download-ahead install pipeline.
+
+Installs a batch of packages against a fake winget that sleeps for a fixed
+download and install time: once one package at a time (install_package,
+where each online install includes its download) and through the pipeline
+(install_packages, where `winget download` leaves an installer and its
+manifest and the app runs the installer itself). Nothing is installed and
+the app data directory is redirected to a temporary folder.
+
+    python -m install_benchmark --packages 6 --download 1.0 --install 1.0
+
+The same file is the fake winget when run as `install_benchmark fake-winget`,
+and the downloaded fake installers run it as `install_benchmark fake-installer`.
+"""
+
+import argparse
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+
+# What `winget download` writes next to the installer: the merged manifest
+# of the installer it picked
+FAKE_MANIFEST = """# Created using wingetcreate
+PackageIdentifier: {package_id}
+PackageVersion: 1.0.0
+PackageLocale: en-US
+Publisher: Benchmark
+PackageName: {package_id}
+ShortDescription: Fake package for the install pipeline benchmark
+Description: |-
+  Sleeps for the configured install time when run with its silent switch.
+InstallerType: exe
+Installers:
+- Architecture: x64
+  InstallerUrl: https://example.invalid/{package_id}.exe
+  InstallerSha256: 0000000000000000000000000000000000000000000000000000000000000000
+  InstallerSwitches:
+    Silent: /S
+    SilentWithProgress: /S
+  InstallerSuccessCodes:
+  - 3010
+ManifestType: singleton
+ManifestVersion: 1.6.0
+"""
+
+
+def _record_install(package_id):
+    with open(os.path.join(os.environ['LOCALAPPDATA'], 'fake_installed.txt'), 'a') as f:
+        f.write(package_id + '\n')
+
+
+def _write_fake_installer(download_dir, package_id):
+    """An executable that runs this file as `fake-installer`: a batch file on Windows, a script elsewhere"""
+    base = os.path.join(download_dir, f"{package_id}_1.0.0_X64_exe")
+    if os.name == 'nt':
+        with open(base + '.cmd', 'w') as f:
+            f.write(f'@"{sys.executable}" "{os.path.abspath(__file__)}" fake-installer {package_id} %*\n')
+        return
+    with open(base + '.exe', 'w') as f:
+        f.write(f"#!{sys.executable}\n"
+                f"import sys\nsys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+                f"import install_benchmark\n"
+                f"sys.exit(install_benchmark.main(['fake-installer', {package_id!r}] + sys.argv[1:]))\n")
+    os.chmod(base + '.exe', os.stat(base + '.exe').st_mode | stat.S_IXUSR)
+
+
+def fake_installer(args):
+    """A downloaded installer: installs only when given its silent switch"""
+    install_time = float(os.environ.get('WINTOOL_FAKE_INSTALL', '1.0'))
+    package_id = args[0]
+    if '/S' not in args[1:]:
+        print("Interactive installs are not supported")
+        return 1
+    time.sleep(install_time)
+    _record_install(package_id)
+    return 0
+
+
+def fake_winget(args):
+    download_time = float(os.environ.get('WINTOOL_FAKE_DOWNLOAD', '1.0'))
+    install_time = float(os.environ.get('WINTOOL_FAKE_INSTALL', '1.0'))
+    command = args[0] if args else ''
+
+    if command == 'download':
+        download_dir = args[args.index('-d') + 1]
+        package_id = args[args.index('--id') + 1]
+        time.sleep(download_time)
+        os.makedirs(download_dir, exist_ok=True)
+        _write_fake_installer(download_dir, package_id)
+        with open(os.path.join(download_dir, f"{package_id}_1.0.0_X64_exe_en-US.yaml"), 'w') as f:
+            f.write(FAKE_MANIFEST.format(package_id=package_id))
+    elif command == 'install':
+        # Like winget, an install (from the source or a manifest) downloads first
+        time.sleep(download_time + install_time)
+        package_id = args[args.index('--id') + 1]
+        _record_install(package_id)
+        print(f"Successfully installed {package_id}")
+    elif command == 'list':
+        print(f"{'Name':<24}{'Id':<24}{'Version':<10}Source")
+        print('-' * 64)
+        path = os.path.join(os.environ['LOCALAPPDATA'], 'fake_installed.txt')
+        if os.path.exists(path):
+            with open(path) as f:
+                for package_id in f.read().split():
+                    print(f"{package_id.replace('.', ' '):<24}{package_id:<24}{'1.0':<10}winget")
+    return 0
+
+
+def run_batch(pkg_ops, names, pipelined):
+    start = time.perf_counter()
+    if pipelined:
+        pkg_ops.install_packages(names)
+    else:
+        for name in names:
+            pkg_ops.install_package(name)
+    pkg_ops.scheduler.wait_idle()
+    return time.perf_counter() - start
+
+
+def time_batch(count, pipelined):
+    """Install a batch with a fresh PackageOperations"""
+    import package_operations
+    from package_catalog import CatalogEntry, PackageCatalog
+    pkg_ops = package_operations.PackageOperations()
+    names = [f"Package {i}" for i in range(count)]
+    pkg_ops.packages_data = PackageCatalog(CatalogEntry(name, 'Benchmark', winget_id=f"Fake.Package{i}")
+                                           for i, name in enumerate(names))
+    try:
+        return run_batch(pkg_ops, names, pipelined)
+    finally:
+        pkg_ops.shutdown()
+
+
+def run_benchmark(count, download_time, install_time):
+    os.environ['LOCALAPPDATA'] = tempfile.mkdtemp(prefix='wintool_bench_')
+    os.environ['WINTOOL_FAKE_DOWNLOAD'] = str(download_time)
+    os.environ['WINTOOL_FAKE_INSTALL'] = str(install_time)
+
+    import package_operations
+    package_operations.WINGET = [sys.executable, os.path.abspath(__file__), 'fake-winget']
+    sequential = time_batch(count, pipelined=False)
+    pipelined = time_batch(count, pipelined=True)
+    installed = open(os.path.join(os.environ['LOCALAPPDATA'], 'fake_installed.txt')).read().split()
+    return {
+        'packages': count,
+        'download_s': download_time,
+        'install_s': install_time,
+        'sequential_s': round(sequential, 2),
+        'pipelined_s': round(pipelined, 2),
+        'ideal_pipelined_s': round(download_time + count * max(install_time, download_time / package_operations.DOWNLOAD_WORKERS), 2),
+        'speedup': round(sequential / pipelined, 2),
+        # Every package once per run; a pipelined package installed twice would show here
+        'installs': len(installed)
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['fake-winget']:
+        return fake_winget(argv[1:])
+    if argv[:1] == ['fake-installer']:
+        return fake_installer(argv[1:])
+
+    parser = argparse.ArgumentParser(prog='install_benchmark', description='Benchmark the install pipeline with a fake winget')
+    parser.add_argument('--packages', type=int, default=6)
+    parser.add_argument('--download', type=float, default=1.0, help='seconds per fake download')
+    parser.add_argument('--install', type=float, default=1.0, help='seconds per fake install')
+    args = parser.parse_args(argv)
+    print(json.dumps(run_benchmark(args.packages, args.download, args.install)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
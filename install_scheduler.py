@@ -0,0 +1,238 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from command_runner import kill_process_tree
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+
+
+class InstallJob:
+    """A queued install or upgrade. Lower priority values run first; ties run in FIFO order"""
+
+    def __init__(self, job_id, package_name, callback=None, priority=0, download=None, op='install', on_done=None):
+        self.id = job_id
+        self.package_name = package_name
+        self.callback = callback
+        self.priority = priority
+        # Future for a download-ahead of the installer, if any
+        self.download = download
+        self.op = op
+        # Called with the job once it has finished or was cancelled
+        self.on_done = on_done
+        # Set by the runner: True if the operation succeeded
+        self.result = None
+        self.state = QUEUED
+        self.enqueued = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.process = None
+        self.lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self.state == CANCELLED
+
+    @property
+    def wait_time(self):
+        """Seconds from enqueue to start (so far, if still queued)"""
+        return (self.started or time.monotonic()) - self.enqueued
+
+    def attach(self, process):
+        """Register the running winget process so a cancel can kill it"""
+        with self.lock:
+            self.process = process
+            cancelled = self.cancelled
+        if cancelled:
+            kill_process_tree(process)
+
+    def detach(self):
+        with self.lock:
+            self.process = None
+
+
+class InstallScheduler:
+    """Runs install jobs one at a time from a priority queue.
+
+    The worker blocks on a condition variable while idle and exits on
+    shutdown. Queued jobs can be reprioritised or cancelled; cancelling a
+    running job kills its winget process tree. `runner(package_name,
+    callback, job)` does the actual work; `on_idle()` runs on the worker each
+    time the queue drains.
+    """
+
+    def __init__(self, runner, on_idle=None):
+        self.runner = runner
+        self.on_idle = on_idle
+        self.condition = threading.Condition()
+        self.heap = []
+        self.jobs = {}
+        self.counter = itertools.count()
+        self.ids = itertools.count(1)
+        self.running = None
+        self.stopping = False
+        self.worker = None
+        self.wait_stats = {'count': 0, 'sum': 0.0, 'max': 0.0}
+
+    def submit(self, package_name, callback=None, priority=0, download=None, op='install', on_done=None):
+        with self.condition:
+            if self.stopping:
+                raise RuntimeError("Install scheduler is shut down")
+            job = InstallJob(next(self.ids), package_name, callback, priority, download, op, on_done)
+            self.jobs[job.id] = job
+            heapq.heappush(self.heap, (priority, next(self.counter), job))
+            if not self.worker or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, daemon=True, name='install-worker')
+                self.worker.start()
+            self.condition.notify_all()
+        return job
+
+    def _run(self):
+        while True:
+            with self.condition:
+                job = None
+                while job is None:
+                    while not self.heap and not self.stopping:
+                        self.condition.wait()
+                    if self.stopping:
+                        return
+                    _, _, candidate = heapq.heappop(self.heap)
+                    # Cancelled jobs are left in the heap and skipped here
+                    if candidate.state == QUEUED:
+                        job = candidate
+                job.state = RUNNING
+                job.started = time.monotonic()
+                self.running = job
+                wait = job.started - job.enqueued
+                self.wait_stats['count'] += 1
+                self.wait_stats['sum'] += wait
+                self.wait_stats['max'] = max(self.wait_stats['max'], wait)
+            logger.info(f"Starting {job.op} of {job.package_name} after {wait * 1000:.0f} ms in queue")
+
+            try:
+                self.runner(job.package_name, job.callback, job)
+            except Exception as e:
+                logger.error(f"Error in install worker: {str(e)}", exc_info=True)
+            finally:
+                with self.condition:
+                    if job.state == RUNNING:
+                        job.state = DONE
+                    job.finished = time.monotonic()
+                # May queue follow-up jobs, so it runs before the drain check
+                self._job_done(job)
+                with self.condition:
+                    drained = not self._has_queued()
+
+            # The job still counts as running here, so wait_idle() covers this too
+            if drained and self.on_idle:
+                try:
+                    self.on_idle()
+                except Exception as e:
+                    logger.error(f"Error in install queue idle handler: {str(e)}", exc_info=True)
+
+            with self.condition:
+                self.running = None
+                self.jobs.pop(job.id, None)
+                self.condition.notify_all()
+
+    def _job_done(self, job):
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                logger.error(f"Error in {job.op} completion handler: {str(e)}", exc_info=True)
+
+    def find(self, package_name):
+        """The queued or running job for a package, if any"""
+        with self.condition:
+            for job in self.jobs.values():
+                if job.package_name == package_name and job.state in (QUEUED, RUNNING):
+                    return job
+        return None
+
+    def pending(self):
+        """Queued jobs in the order they will run"""
+        with self.condition:
+            return [job for _, _, job in sorted(self.heap) if job.state == QUEUED]
+
+    def qsize(self):
+        return len(self.pending())
+
+    def set_priority(self, job_id, priority):
+        """Reorder a queued job. Returns False if it is no longer queued"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if not job or job.state != QUEUED:
+                return False
+            job.priority = priority
+            self.heap = [(j.priority, seq, j) for _, seq, j in self.heap if j.state == QUEUED]
+            heapq.heapify(self.heap)
+            return True
+
+    def move_to_front(self, job_id):
+        with self.condition:
+            front = min((j.priority for _, _, j in self.heap if j.state == QUEUED), default=0)
+            return self.set_priority(job_id, front - 1)
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or kill a running one. Returns False if already finished"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if not job or job.state not in (QUEUED, RUNNING):
+                return False
+            was_running = job.state == RUNNING
+            with job.lock:
+                job.state = CANCELLED
+                process = job.process
+            if not was_running:
+                self.jobs.pop(job_id, None)
+            self.condition.notify_all()
+
+        logger.info(f"Cancelled {'running' if was_running else 'queued'} {job.op} of {job.package_name}")
+        if job.download:
+            job.download.cancel()
+        if process:
+            kill_process_tree(process)
+        if not was_running:
+            if job.callback:
+                job.callback(f"Cancelled {'update' if job.op == 'upgrade' else 'installation'} of {job.package_name}")
+            self._job_done(job)
+        return True
+
+    def wait_idle(self, timeout=None):
+        """Block until nothing is queued or running. Returns False on timeout"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.running is None and not self._has_queued(), timeout)
+
+    def _has_queued(self):
+        return any(job.state == QUEUED for _, _, job in self.heap)
+
+    def shutdown(self, cancel_running=True, timeout=5):
+        """Drop queued jobs, optionally kill the running one, and stop the worker"""
+        with self.condition:
+            self.stopping = True
+            queued = [job for _, _, job in self.heap if job.state == QUEUED]
+            running = self.running
+            self.condition.notify_all()
+        for job in queued:
+            self.cancel(job.id)
+        if cancel_running and running:
+            self.cancel(running.id)
+        if self.worker and self.worker is not threading.current_thread():
+            self.worker.join(timeout)
+
+    def get_metrics(self):
+        stats = self.wait_stats
+        return [
+            ('wintool_install_queue_depth', 'gauge', 'Packages waiting to be installed', self.qsize()),
+            ('wintool_installing', 'gauge', 'Whether an install is running', self.running is not None),
+            ('wintool_install_queue_wait_seconds', 'summary', 'Time from enqueue to install start',
+             {'count': stats['count'], 'sum': stats['sum']}),
+            ('wintool_install_queue_wait_max_seconds', 'gauge', 'Longest enqueue to start wait', stats['max'])
+        ]
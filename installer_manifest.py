@@ -0,0 +1,234 @@
+"""
+Running an installer fetched by `winget download` without winget.
+
+`winget install --manifest` downloads the installer again from the
+manifest's InstallerUrl, so a cached installer is only useful if the app
+runs it itself. `winget download` leaves the installer next to a manifest
+describing it; this reads the manifest's InstallerType, switches and
+success codes and builds the silent command line winget would use.
+
+Only the YAML subset winget writes is read: block mappings and sequences,
+plain or quoted scalars, flow sequences and block scalars.
+"""
+
+import logging
+import os
+import shlex
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Switches winget uses per installer type when the manifest gives none,
+# in its default (silent with progress) mode and in silent mode
+DEFAULT_SWITCHES = {
+    'msi': ('/passive /norestart', '/quiet /norestart'),
+    'wix': ('/passive /norestart', '/quiet /norestart'),
+    'burn': ('/passive /norestart', '/quiet /norestart'),
+    'inno': ('/SP- /SILENT /SUPPRESSMSGBOXES /NORESTART', '/SP- /VERYSILENT /SUPPRESSMSGBOXES /NORESTART'),
+    'nullsoft': ('/S', '/S'),
+    # A plain exe has no known switches; the manifest has to supply them
+    'exe': (None, None)
+}
+MSI_TYPES = {'msi', 'wix'}
+# Windows Installer and Burn "installed, restart required" results
+REBOOT_CODES = {1641, 3010}
+# ExpectedReturnCodes responses that still leave the package installed
+INSTALLED_RESPONSES = {'alreadyInstalled', 'rebootRequiredToFinish', 'rebootRequiredForInstall', 'rebootInitiated'}
+# Exit code of a process that needs to be started elevated
+ELEVATION_REQUIRED = 740
+
+
+def _scalar(text):
+    text = text.strip()
+    if text[:1] == "'" and text[-1:] == "'" and len(text) > 1:
+        return text[1:-1].replace("''", "'")
+    if text[:1] == '"' and text[-1:] == '"' and len(text) > 1:
+        return text[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    if text[:1] == '[' and text[-1:] == ']':
+        return [_scalar(item) for item in text[1:-1].split(',') if item.strip()]
+    # Strip a trailing comment from a plain scalar
+    position = text.find(' #')
+    return text[:position].rstrip() if position >= 0 else text
+
+
+def _split_key(text):
+    """(key, value) for a `key: value` line, or None if it isn't one"""
+    if text[:1] in ('"', "'"):
+        return None
+    key, colon, value = text.partition(':')
+    if not colon or (value and not value.startswith(' ')) or ' #' in key:
+        return None
+    return key.strip(), value.strip()
+
+
+def parse_manifest(text):
+    """Parse a winget manifest into nested dicts and lists"""
+    lines = []
+    for raw in text.replace('\t', '  ').splitlines():
+        stripped = raw.strip()
+        if stripped and not stripped.startswith('#') and stripped != '---':
+            lines.append((len(raw) - len(raw.lstrip(' ')), raw.rstrip()))
+    position = 0
+
+    def block_scalar(indent):
+        """Skip the lines of a `|`/`>` block more indented than `indent`"""
+        nonlocal position
+        collected = []
+        while position < len(lines) and lines[position][0] > indent:
+            collected.append(lines[position][1].strip())
+            position += 1
+        return '\n'.join(collected)
+
+    def value_for(value, indent):
+        nonlocal position
+        if value[:1] in ('|', '>'):
+            return block_scalar(indent)
+        if value:
+            return _scalar(value)
+        # A nested block; sequences may sit at the parent key's indent
+        if position < len(lines) and (lines[position][0] > indent or
+                                      (lines[position][0] == indent and lines[position][1].lstrip().startswith('- '))):
+            return parse_block(lines[position][0])
+        return None
+
+    def parse_block(indent):
+        nonlocal position
+        is_sequence = lines[position][1].lstrip().startswith('- ') or lines[position][1].strip() == '-'
+        result = [] if is_sequence else {}
+        while position < len(lines):
+            line_indent, line = lines[position]
+            text = line.strip()
+            if line_indent < indent or (line_indent == indent and is_sequence != (text.startswith('- ') or text == '-')):
+                break
+            if line_indent > indent:
+                # Continuation of a multi-line plain scalar; not used by winget
+                position += 1
+                continue
+            position += 1
+            if is_sequence:
+                item = text[1:].strip()
+                item_indent = line_indent + len(text) - len(item)
+                pair = _split_key(item) if item else None
+                if pair is None:
+                    result.append(value_for(item, line_indent) if item else value_for('', line_indent))
+                    continue
+                # A mapping starting on the dash line: reparse it at its own indent
+                position -= 1
+                lines[position] = (item_indent, ' ' * item_indent + item)
+                result.append(parse_block(item_indent))
+            else:
+                pair = _split_key(text)
+                if pair is None:
+                    continue
+                key, value = pair
+                result[key] = value_for(value, line_indent)
+        return result
+
+    if not lines:
+        return {}
+    manifest = parse_block(lines[0][0])
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _as_int(value):
+    try:
+        return int(str(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class CachedInstaller(namedtuple('CachedInstaller', ['path', 'installer_type', 'command', 'success_codes'])):
+    """A downloaded installer and the silent command line that runs it"""
+    __slots__ = ()
+
+    def succeeded(self, returncode):
+        return returncode == 0 or returncode in self.success_codes
+
+
+def _pick_installer(manifest):
+    """The manifest's installer entry with root-level defaults filled in, or None if it is ambiguous"""
+    defaults = {key: value for key, value in manifest.items() if key != 'Installers'}
+    installers = manifest.get('Installers') or [{}]
+    merged = []
+    for installer in installers:
+        if not isinstance(installer, dict):
+            return None
+        entry = dict(defaults)
+        entry.update(installer)
+        # Switches are inherited one by one, like winget does
+        if isinstance(defaults.get('InstallerSwitches'), dict) and isinstance(installer.get('InstallerSwitches'), dict):
+            entry['InstallerSwitches'] = dict(defaults['InstallerSwitches'], **installer['InstallerSwitches'])
+        merged.append(entry)
+    # `winget download` writes the installer it picked; if several remain,
+    # use them only when they would all run the same way
+    relevant = ('InstallerType', 'NestedInstallerType', 'InstallerSwitches', 'InstallerSuccessCodes',
+                'ExpectedReturnCodes', 'ElevationRequirement')
+    if any({key: entry.get(key) for key in relevant} != {key: merged[0].get(key) for key in relevant}
+           for entry in merged[1:]):
+        return None
+    return merged[0]
+
+
+def _build_command(path, installer_type, switches):
+    """Argument list for a silent install, or None if winget's switches can't be reproduced"""
+    switches = switches if isinstance(switches, dict) else {}
+    default_progress, default_silent = DEFAULT_SWITCHES[installer_type]
+    mode = switches.get('SilentWithProgress') or switches.get('Silent') or default_progress or default_silent
+    if not mode:
+        return None
+    arguments = f"{mode} {switches.get('Custom') or ''}"
+    try:
+        tokens = shlex.split(arguments, posix=False)
+    except ValueError:
+        return None
+    # Quoted values (e.g. INSTALLDIR="C:\Program Files\x") would be quoted
+    # again when the list is turned back into a command line
+    if any('"' in token or "'" in token for token in tokens):
+        return None
+    if installer_type in MSI_TYPES:
+        return ['msiexec', '/i', path] + tokens
+    return [path] + tokens
+
+
+def read_cached_installer(download_dir):
+    """The installer `winget download` left in `download_dir` as a CachedInstaller.
+
+    Returns None if there is no single installer and manifest, or the
+    installer can't be run silently without winget (MSIX, zip and portable
+    packages, plain exe installers without switches, installers that must
+    be started elevated); those go through a regular winget install.
+    """
+    if not download_dir or not os.path.isdir(download_dir):
+        return None
+    names = os.listdir(download_dir)
+    manifests = [name for name in names if name.lower().endswith(('.yaml', '.yml'))]
+    installers = [name for name in names if name not in manifests]
+    if len(manifests) != 1 or len(installers) != 1:
+        return None
+    try:
+        with open(os.path.join(download_dir, manifests[0]), 'r', encoding='utf-8-sig') as f:
+            installer = _pick_installer(parse_manifest(f.read()))
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning(f"Could not read manifest in {download_dir}: {str(e)}")
+        return None
+    if installer is None:
+        return None
+
+    installer_type = str(installer.get('InstallerType') or '').lower()
+    if installer_type not in DEFAULT_SWITCHES or installer.get('ElevationRequirement') == 'elevationRequired':
+        logger.info(f"Cached {installer_type or 'unknown'} installer in {download_dir} needs winget to install")
+        return None
+    path = os.path.join(download_dir, installers[0])
+    command = _build_command(path, installer_type, installer.get('InstallerSwitches'))
+    if command is None:
+        logger.info(f"No usable silent switches for the cached installer in {download_dir}")
+        return None
+
+    success_codes = {_as_int(code) for code in installer.get('InstallerSuccessCodes') or []}
+    for expected in installer.get('ExpectedReturnCodes') or []:
+        if isinstance(expected, dict) and expected.get('ReturnResponse') in INSTALLED_RESPONSES:
+            success_codes.add(_as_int(expected.get('InstallerReturnCode')))
+    if installer_type in MSI_TYPES or installer_type == 'burn':
+        success_codes |= REBOOT_CODES
+    success_codes.discard(None)
+    return CachedInstaller(path, installer_type, command, frozenset(success_codes))
@@ -0,0 +1,114 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+
+LOG_DIR = 'logs'
+LOG_FILE = 'mtech_wintool.log'
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Default per-module levels; override with WINTOOL_LOG_LEVELS="name=LEVEL,..."
+MODULE_LEVELS = {
+    'system_tweaks': logging.WARNING,
+    'urllib3': logging.WARNING
+}
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per record, including any `extra` fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, separators=(',', ':'))
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that skips formatting on the calling thread.
+
+    The stock prepare() runs the full formatter (and traceback rendering)
+    before enqueueing; here we only merge the args, leaving all formatting
+    and I/O to the listener thread.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def parse_levels(spec):
+    """Parse 'name=LEVEL,name=LEVEL' into a {name: level} dict"""
+    levels = {}
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        name, level = item.split('=', 1)
+        level = logging.getLevelName(level.strip().upper())
+        if isinstance(level, int):
+            levels[name.strip()] = level
+    return levels
+
+
+def setup_logging(level=logging.INFO, log_dir=LOG_DIR, module_levels=None, console=True,
+                  max_bytes=5 * 1024 * 1024, backup_count=3):
+    """Route all logging through one queue to a rotating JSON file and the console.
+
+    Safe to call more than once; only the first call installs handlers.
+    Returns the running QueueListener.
+    """
+    global _listener
+    if _listener:
+        return _listener
+
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, LOG_FILE),
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        encoding='utf-8',
+        delay=True
+    )
+    file_handler.setFormatter(JsonFormatter())
+    handlers = [file_handler]
+
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_QueueHandler(log_queue))
+
+    levels = dict(MODULE_LEVELS)
+    levels.update(module_levels or {})
+    levels.update(parse_levels(os.environ.get('WINTOOL_LOG_LEVELS', '')))
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    return _listener
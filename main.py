@@ -16,31 +16,62 @@ License: MIT
 Repository: https://github.com/MTechWare/wintools
 """
 
+import startup_report
+startup_report.enable_from_args()
+
+import sys
+import single_instance
+if __name__ == "__main__" and sys.argv[1:2] == ['--elevation-broker']:
+    # The packaged exe re-launches itself elevated to act as the broker helper
+    import elevation_broker
+    sys.exit(elevation_broker.main())
+if __name__ == "__main__":
+    # Hand the request to an already running instance before loading anything heavy
+    launch_request = single_instance.parse_request(sys.argv[1:])
+    instance = single_instance.InstanceServer()
+    if not instance.acquire():
+        if single_instance.forward_request(launch_request):
+            sys.exit(0)
+        # Something else holds the port; run without single-instance support
+    instance.submit(launch_request)
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import sv_ttk
 import threading
 import queue
 from package_operations import PackageOperations
+from operation_history import format_duration
+from winget_progress import format_progress
+from prewarm import Prewarm
+import command_runner
 from system_health import SystemHealth
+from metrics_provider import provider_from_env
+from system_alerts import AlertEngine, load_rules
+from system_anomaly import AnomalyDetector, default_watches
 from system_tools import SystemTools
 from unattend_creator import UnattendCreator
 import os
-import sys
 import platform
 from datetime import datetime
 import subprocess
-from system_tweaks import (
-    SystemTweaks, PerformanceTweaks, PrivacyTweaks, DesktopTweaks,
-    GamingTweaks, PowerTweaks, NetworkTweaks, MaintenanceTweaks
-)
+import time
 import ctypes
 import logging
 import webbrowser
+from log_config import setup_logging
+
+# Pause in typing before the package search runs
+SEARCH_DEBOUNCE_MS = 150
+# Package rows inserted at a time as a category is scrolled through
+PACKAGE_PAGE_SIZE = 50
 
 class WinGetInstaller:
-    def __init__(self, root):
+    def __init__(self, root, prewarm=None, instance=None):
         self.root = root
+        self.prewarm = prewarm or Prewarm()
+        self.instance = instance
+        self.catalog_deadline = None
         self.root.title("Initializing")
         self.root.resizable(False, False)
         self.root.attributes('-topmost', True)  # Make window stay on top
@@ -122,7 +153,8 @@ class WinGetInstaller:
         )
         self.progress = ttk.Progressbar(
             self.status_frame,
-            mode="indeterminate",
+            mode="determinate",
+            maximum=len(self.prewarm.tasks()),
             style="Custom.Horizontal.TProgressbar",
             length=250
         )
@@ -138,30 +170,51 @@ class WinGetInstaller:
         )
         self.info_text.grid(row=3, column=0, pady=(0, 15), sticky="n")
         
+        self.root.after_idle(lambda: startup_report.mark_first_paint('splash'))
+        
         # Start checking WinGet
         self.check_winget()
     
+    def update_prewarm_progress(self):
+        """Reflect the prewarm tasks that have finished in the progress bar"""
+        done, total, pending = self.prewarm.progress()
+        self.progress['value'] = done
+        if pending:
+            self.status_label.configure(text=f"🔍 {pending}... ({done}/{total})")
+    
     def check_winget(self):
-        """Check if WinGet is installed"""
-        try:
-            subprocess.run(['winget', '--version'], capture_output=True, text=True)
+        """Wait for the prewarmed WinGet probe without blocking the Tk thread"""
+        self.update_prewarm_progress()
+        if not self.prewarm.winget.done():
+            self.root.after(50, self.check_winget)
+            return
+        
+        if self.prewarm.winget.result():
             self.winget_found()
-        except FileNotFoundError:
+        else:
             self.winget_not_found()
     
     def winget_found(self):
         """Called when WinGet is found"""
-        self.progress.stop()
-        self.progress.grid_forget()
         self.status_label.configure(text="✅ WinGet is installed", foreground="green")
-        # Wait
-        self.root.after(100, self.continue_to_app)
+        # Give the catalog a moment so the package list can show immediately;
+        # the installed/update queries keep running in the background
+        self.catalog_deadline = time.monotonic() + 5
+        self.root.after(100, self.wait_for_catalog)
+    
+    def wait_for_catalog(self):
+        self.update_prewarm_progress()
+        if self.prewarm.catalog.done() or time.monotonic() > self.catalog_deadline:
+            self.continue_to_app()
+        else:
+            self.root.after(50, self.wait_for_catalog)
         
     def winget_not_found(self):
         """Called when WinGet is not found"""
         self.progress.stop()
         self.progress.grid_forget()
         self.status_label.configure(text="⚠️ WinGet not found. Installing...", foreground="orange")
+        self.progress.configure(mode="indeterminate")
         self.progress.grid(row=1, column=0, pady=(0, 10), sticky="ew")
         self.progress.start()
         threading.Thread(target=self.install_winget, daemon=True).start()
@@ -221,7 +274,8 @@ class WinGetInstaller:
             os.remove(script_path)
             
             # Check if installation was successful
-            self.root.after(500, self.check_winget)
+            self.prewarm.start_winget_tasks()
+            self.root.after(500, self.resume_progress)
             
         except subprocess.CalledProcessError as e:
             self.progress.stop()
@@ -230,14 +284,23 @@ class WinGetInstaller:
             self.status_label.configure(text="❌ Installation failed: PowerShell error", foreground="red")
             print(f"PowerShell Error: {error_msg}")  # For debugging
             # Try again after 3 seconds
-            self.root.after(3000, self.check_winget)
+            self.prewarm.start_winget_tasks()
+            self.root.after(3000, self.resume_progress)
         except Exception as e:
             self.progress.stop()
             self.progress.grid_forget()
             self.status_label.configure(text=f"❌ Installation failed: {str(e)}", foreground="red")
             print(f"Error: {str(e)}")  # For debugging
             # Try again after 3 seconds
-            self.root.after(3000, self.check_winget)
+            self.prewarm.start_winget_tasks()
+            self.root.after(3000, self.resume_progress)
+    
+    def resume_progress(self):
+        """Switch back to task progress and wait for the new WinGet probe"""
+        self.progress.stop()
+        self.progress.configure(mode="determinate")
+        self.progress.grid(row=1, column=0, pady=(0, 10), sticky="ew")
+        self.check_winget()
     
     def continue_to_app(self):
         """Continue to main application"""
@@ -245,40 +308,16 @@ class WinGetInstaller:
         for widget in self.root.winfo_children():
             widget.destroy()
         
-        # Start main application with same root
-        app = WinTool(self.root)
+        # Start main application with same root, handing over the prewarmed work
+        app = WinTool(self.root, prewarm=self.prewarm, instance=self.instance)
         app.run()
     
     def run(self):
         self.root.mainloop()
 
 class WinTool:
-    def __init__(self, root=None):
-        # Set up logging
+    def __init__(self, root=None, prewarm=None, instance=None):
         self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logging.INFO)
-        
-        # Create logs directory if it doesn't exist
-        if not os.path.exists('logs'):
-            os.makedirs('logs')
-            
-        # Create file handler
-        log_file = os.path.join('logs', 'mtech_wintool.log')
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # Create console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Create formatter
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers to logger
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
         
         if root is None:
             self.root = tk.Tk()
@@ -373,25 +412,59 @@ class WinTool:
         sv_ttk.set_theme("dark")
         
         # Initialize components
-        self.pkg_ops = PackageOperations()
-        self.sys_health = SystemHealth(self.update_dashboard_metrics)
+        self.prewarm = prewarm
+        self.pkg_ops = prewarm.pkg_ops if prewarm else PackageOperations()
+        self.sys_health = SystemHealth(self.update_dashboard_metrics, provider=provider_from_env())
+        self.alert_engine = AlertEngine(load_rules(), self.post_activity)
+        self.sys_health.add_listener(self.alert_engine.evaluate)
+        self.anomaly_detector = AnomalyDetector(default_watches(), self.post_activity)
+        self.sys_health.add_listener(self.anomaly_detector.evaluate)
+
+        # Optional OpenMetrics endpoint for Prometheus scraping
+        self.metrics_exporter = None
+        metrics_port = os.environ.get('WINTOOL_METRICS_PORT')
+        if metrics_port:
+            try:
+                from metrics_exporter import MetricsExporter
+                self.metrics_exporter = MetricsExporter(int(metrics_port))
+                self.metrics_exporter.add_source(self.pkg_ops.get_metrics)
+                self.metrics_exporter.add_source(startup_report.get_metrics)
+                self.metrics_exporter.add_source(command_runner.get_metrics)
+                self.metrics_exporter.add_source(self.get_tab_metrics)
+                self.sys_health.add_listener(self.metrics_exporter.update)
+                self.metrics_exporter.start()
+            except Exception as e:
+                self.logger.error(f"Failed to start metrics exporter: {str(e)}")
         self.sys_tools = SystemTools()
         self.unattend_creator = UnattendCreator()
         self.status_queue = queue.Queue()
         self.tweak_frames = []  # Initialize tweak_frames list
         
-        # Initialize tweak components
-        self.performance_tweaks = PerformanceTweaks()
-        self.privacy_tweaks = PrivacyTweaks()
-        self.desktop_tweaks = DesktopTweaks()
-        self.power_tweaks = PowerTweaks()
-        self.gaming_tweaks = GamingTweaks()
-        self.network_tweaks = NetworkTweaks()
-        self.maintenance_tweaks = MaintenanceTweaks()
+        # Tweak components are created on first use (see get_tweak_handler)
+        self.tweak_handlers = {}
         
         # Dictionary to store tweak functions
         self.tweak_functions = {}
         
+        # Lazy tab state
+        self.tab_builders = {}
+        self.tab_ids = {}
+        self.built_tabs = set()
+        self.tab_build_times = {}
+        self.package_status = ("Ready", False)
+        self.package_progress = None
+        # Rows currently in the package tree, kept so a new search result
+        # only inserts, deletes or moves the rows that differ. Each category
+        # holds a loaded prefix of its matches plus a placeholder row
+        self.package_rows = {}
+        self.package_row_values = {}
+        self.category_rows = {}
+        self.category_children = {}
+        self.category_results = {}
+        self.category_placeholders = {}
+        self.search_after_id = None
+        self.page_check_pending = False
+        
         # Setup UI first
         self.setup_ui()
         
@@ -404,6 +477,14 @@ class WinTool:
         # Load packages asynchronously
         threading.Thread(target=self.initial_package_load, daemon=True).start()
 
+        # Requests from later launches arrive on the instance server thread
+        self.instance = instance
+        if self.instance:
+            self.instance.set_handler(lambda request: self.status_queue.put(("instance_request", request)))
+
+        # Record time-to-first-paint once Tk has drawn the main window
+        self.root.after_idle(lambda: startup_report.mark_first_paint('main_window'))
+
     def setup_ui(self):
         # Create style
         style = ttk.Style()
@@ -440,7 +521,8 @@ class WinTool:
         self.tree_tags = {
             'installed': 'green',
             'not_installed': 'white',
-            'needs_update': 'orange'
+            'needs_update': 'orange',
+            'placeholder': 'gray'
         }
         
         # Add gradient header
@@ -492,19 +574,55 @@ class WinTool:
         # Bind tab change event
         self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         
-        # Create tabs
-        self.setup_dashboard_tab()  # Add dashboard as first tab
-        self.setup_packages_tab()
-        self.setup_tweaks_tab()
-        self.setup_monitor_tab()
-        self.setup_tools_tab()
-        self.setup_unattend_tab()
-        self.setup_about_tab()
-
-    def setup_packages_tab(self):
-        packages_tab = ttk.Frame(self.notebook, padding="20 10 20 10")
-        self.notebook.add(packages_tab, text="📦 Packages")
+        # Create tabs. Each one starts as a placeholder and is built the first
+        # time it is selected (see build_tab)
+        tabs = [
+            ('home', "🏠 Home", self.setup_dashboard_tab, "Dashboard.TFrame"),
+            ('packages', "📦 Packages", self.setup_packages_tab, None),
+            ('tweaks', "⚡ Tweaks", self.setup_tweaks_tab, None),
+            ('monitor', "📊 Monitor", self.setup_monitor_tab, None),
+            ('tools', "🔧 Tools", self.setup_tools_tab, None),
+            ('unattend', "📝 Unattend", self.setup_unattend_tab, None),
+            ('about', "ℹ️ About", self.setup_about_tab, None)
+        ]
+        for key, text, builder, tab_style in tabs:
+            if tab_style:
+                tab = ttk.Frame(self.notebook, padding="20 10 20 10", style=tab_style)
+            else:
+                tab = ttk.Frame(self.notebook, padding="20 10 20 10")
+            self.notebook.add(tab, text=text)
+            placeholder = ttk.Label(tab, text="Loading...", style="Status.TLabel")
+            placeholder.pack(expand=True)
+            self.tab_builders[str(tab)] = (key, builder, placeholder)
+            self.tab_ids[key] = str(tab)
+        
+        # Make dashboard the default tab
+        self.notebook.select(0)
+        self.build_tab(self.tab_ids['home'])
+
+    def build_tab(self, tab_id):
+        """Build a tab's contents the first time it is shown"""
+        entry = self.tab_builders.pop(str(tab_id), None)
+        if entry is None:
+            return
         
+        key, builder, placeholder = entry
+        start = time.perf_counter()
+        placeholder.destroy()
+        builder(self.notebook.nametowidget(tab_id))
+        self.built_tabs.add(key)
+        self.tab_build_times[key] = (time.perf_counter() - start) * 1000
+        self.logger.info(f"Built {key} tab in {self.tab_build_times[key]:.1f} ms",
+                         extra={'metric': 'tab_build_ms', 'tab': key, 'value': round(self.tab_build_times[key], 1)})
+
+    def get_tab_metrics(self):
+        """Tab build times as (name, type, help, value) tuples for the exporter"""
+        return [
+            (f"wintool_tab_build_{key}_milliseconds", 'gauge', f"Time spent building the {key} tab", value)
+            for key, value in self.tab_build_times.items()
+        ]
+
+    def setup_packages_tab(self, packages_tab):
         # Header frame with status
         header_frame = ttk.Frame(packages_tab)
         header_frame.pack(fill=tk.X, pady=(10, 20))
@@ -541,7 +659,7 @@ class WinTool:
         search_label.bind('<B1-Motion>', self.on_move)
         
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self.filter_packages)
+        self.search_var.trace('w', self.schedule_package_filter)
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, font=("Segoe UI", 10))
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
@@ -572,10 +690,12 @@ class WinTool:
         
         # Create Treeview with columns
         self.tree = ttk.Treeview(list_frame, show='tree headings', style="Category.Treeview")
-        self.tree['columns'] = ('status', 'description')
+        self.tree['columns'] = ('status', 'version', 'description')
         self.tree.heading('status', text='Status')
+        self.tree.heading('version', text='Version')
         self.tree.heading('description', text='Description')
         self.tree.column('status', width=100)
+        self.tree.column('version', width=140)
         self.tree.column('description', width=300)
         
         # Configure tag colors
@@ -583,13 +703,14 @@ class WinTool:
             self.tree.tag_configure(tag, foreground=color)
             
         # Add scrollbars
-        y_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
         x_scrollbar = ttk.Scrollbar(list_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
-        self.tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        # Scrolling can bring a placeholder into view
+        self.tree.configure(yscrollcommand=self.on_tree_scroll, xscrollcommand=x_scrollbar.set)
         
         # Grid layout for better organization
         self.tree.grid(row=0, column=0, sticky='nsew')
-        y_scrollbar.grid(row=0, column=1, sticky='ns')
+        self.tree_scrollbar.grid(row=0, column=1, sticky='ns')
         x_scrollbar.grid(row=1, column=0, sticky='ew')
         
         list_frame.grid_columnconfigure(0, weight=1)
@@ -612,6 +733,15 @@ class WinTool:
         update_btn = ttk.Button(left_buttons, text="🔄 Update", command=self.update_package, style="Action.TButton", width=15)
         update_btn.pack(side=tk.LEFT, padx=5)
         
+        update_all_btn = ttk.Button(left_buttons, text="⏫ Update All", command=self.update_all_packages, style="Action.TButton", width=15)
+        update_all_btn.pack(side=tk.LEFT, padx=5)
+        
+        next_btn = ttk.Button(left_buttons, text="⏫ Install Next", command=self.prioritize_install, style="Action.TButton", width=15)
+        next_btn.pack(side=tk.LEFT, padx=5)
+        
+        cancel_btn = ttk.Button(left_buttons, text="⏹ Cancel", command=self.cancel_install, style="Action.TButton", width=15)
+        cancel_btn.pack(side=tk.LEFT, padx=5)
+        
         # Right-side buttons
         right_buttons = ttk.Frame(button_frame)
         right_buttons.pack(side=tk.RIGHT)
@@ -623,11 +753,12 @@ class WinTool:
         self.tree.bind('<<TreeviewOpen>>', self.on_category_open)
         self.tree.bind('<<TreeviewClose>>', self.on_category_close)
         self.tree.bind('<Double-1>', self.on_item_double_click)
-
-    def setup_monitor_tab(self):
-        monitor_tab = ttk.Frame(self.notebook, padding="20 10 20 10")
-        self.notebook.add(monitor_tab, text="📊 Monitor")
+        self.tree.bind('<Configure>', self.schedule_page_check)
         
+        # Catch up on anything loaded before the tab was first opened
+        self.root.after_idle(self.sync_packages_tab)
+
+    def setup_monitor_tab(self, monitor_tab):
         # Resource Usage Frame
         resource_frame = ttk.LabelFrame(monitor_tab, text="💻 Resource Usage", padding="15")
         resource_frame.pack(fill=tk.X, pady=(0, 15))
@@ -710,10 +841,7 @@ class WinTool:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
-    def setup_tools_tab(self):
-        tools_tab = ttk.Frame(self.notebook, padding="20 10 20 10")
-        self.notebook.add(tools_tab, text="🔧 Tools")
-        
+    def setup_tools_tab(self, tools_tab):
         # Create a frame for the tools grid
         tools_frame = ttk.LabelFrame(tools_tab, text="🔧 System Tools", padding="15")
         tools_frame.pack(fill=tk.BOTH, expand=True)
@@ -746,12 +874,9 @@ class WinTool:
         self.cleanup_label.pack(fill=tk.X, padx=5, pady=5)
 
         # Start updating system info
-        self.update_system_info()
+        self.root.after_idle(self.update_system_info)
 
-    def setup_unattend_tab(self):
-        unattend_tab = ttk.Frame(self.notebook, padding="20 10 20 10")
-        self.notebook.add(unattend_tab, text="📝 Unattend")
-        
+    def setup_unattend_tab(self, unattend_tab):
         # Create notebook for settings categories
         self.settings_notebook = ttk.Notebook(unattend_tab)
         self.settings_notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -791,10 +916,7 @@ class WinTool:
         # Bind tab change event
         self.settings_notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
 
-    def setup_about_tab(self):
-        about_tab = ttk.Frame(self.notebook, padding="20 10 20 10")
-        self.notebook.add(about_tab, text="ℹ️ About")
-        
+    def setup_about_tab(self, about_tab):
         # Create main content frame
         content_frame = ttk.Frame(about_tab)
         content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -881,6 +1003,9 @@ class WinTool:
                             "The Tweaks tab requires administrator rights to function properly. Do you want to restart the application as administrator?"
                         )
                         if result:
+                            # Release the instance lock so the elevated process can take it over
+                            if self.instance:
+                                self.instance.close()
                             # Start the elevated process
                             ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, " ".join(sys.argv), None, 1)
                             # Destroy the root window and exit
@@ -891,6 +1016,8 @@ class WinTool:
                             self.notebook.select(0)  # Select dashboard tab
                             return
                         
+                self.build_tab(current_tab)
+                
             # If it's the settings notebook (for unattend tab)
             elif hasattr(self, 'settings_notebook') and widget == self.settings_notebook:
                 current_tab = self.settings_notebook.select()
@@ -1081,7 +1208,7 @@ class WinTool:
             messagebox.showinfo("Success", message)
         else:
             messagebox.showerror("Error", message)
-        self.update_system_info()
+        self.refresh_cleanup_info()
 
     def open_task_manager(self):
         success, message = self.sys_tools.open_task_manager()
@@ -1114,7 +1241,15 @@ class WinTool:
             messagebox.showerror("Error", message)
 
     def update_system_info(self):
-        # Update cleanup info
+        """Refresh the cleanup info and schedule the next refresh"""
+        self.refresh_cleanup_info()
+        self.root.after(30000, self.update_system_info)  # Update every 30 seconds
+
+    def refresh_cleanup_info(self):
+        """Calculate cleanup sizes on a worker thread; the recycle bin walk is slow"""
+        threading.Thread(target=self._calculate_cleanup_info, daemon=True).start()
+
+    def _calculate_cleanup_info(self):
         success, cleanup_info = self.sys_tools.get_disk_cleanup_size()
         if success:
             temp_size = cleanup_info['temp_size'] / (1024 * 1024)  # Convert to MB
@@ -1126,10 +1261,7 @@ class WinTool:
             cleanup_text += f"📁 Temp Files: {temp_size:.2f} MB\n"
             cleanup_text += f"💾 Total: {total_size:.2f} MB"
             
-            self.cleanup_label.configure(text=cleanup_text)
-
-        # Schedule next update
-        self.root.after(30000, self.update_system_info)  # Update every 30 seconds
+            self.status_queue.put(("cleanup_info", cleanup_text))
 
     def update_dashboard_metrics(self, stats):
         """Update the dashboard metrics with current system stats"""
@@ -1143,8 +1275,9 @@ class WinTool:
             cpu_freq = stats['cpu_frequency'] / 1000  # Convert MHz to GHz
             
             self.dash_cpu_label.configure(text=f"{cpu_percent:.1f}%")
-            self.cpu_label.configure(text=f"{cpu_percent:.1f}%")
-            self.cpu_progress['value'] = cpu_percent
+            if 'monitor' in self.built_tabs:
+                self.cpu_label.configure(text=f"{cpu_percent:.1f}%")
+                self.cpu_progress['value'] = cpu_percent
             self.cpu_details_label.configure(
                 text=f"🔄 Cores: {cpu_cores} | ⚡ Frequency: {cpu_freq:.2f} GHz"
             )
@@ -1158,8 +1291,9 @@ class WinTool:
             available_gb = (memory_total - memory_used) / (1024**3)
             
             self.dash_memory_label.configure(text=f"{memory_percent:.1f}%")
-            self.memory_label.configure(text=f"{memory_percent:.1f}%")
-            self.memory_progress['value'] = memory_percent
+            if 'monitor' in self.built_tabs:
+                self.memory_label.configure(text=f"{memory_percent:.1f}%")
+                self.memory_progress['value'] = memory_percent
             self.memory_details_label.configure(
                 text=f"💾 Total: {total_gb:.1f} GB | 📈 Used: {used_gb:.1f} GB | 📉 Available: {available_gb:.1f} GB"
             )
@@ -1176,8 +1310,9 @@ class WinTool:
             disk_free_gb = round(disk_free / (1024**3), 1)
             
             self.dash_disk_label.configure(text=f"{disk_percent:.1f}%")
-            self.disk_label.configure(text=f"{disk_percent:.1f}%")
-            self.disk_progress['value'] = disk_percent
+            if 'monitor' in self.built_tabs:
+                self.disk_label.configure(text=f"{disk_percent:.1f}%")
+                self.disk_progress['value'] = disk_percent
             self.disk_details_label.configure(
                 text=f"💽 Total: {disk_total_gb} GB | 📈 Used: {disk_used_gb} GB | 📉 Free: {disk_free_gb} GB"
             )
@@ -1185,6 +1320,10 @@ class WinTool:
         except Exception as e:
             print(f"Error updating dashboard metrics: {e}")
 
+    def post_activity(self, message):
+        """Queue an activity feed message from a worker thread"""
+        self.status_queue.put(("activity", message))
+
     def update_status(self, message, show_progress=False):
         """Update the status bar message and progress indicator"""
         self.status_queue.put(("status", message))
@@ -1227,9 +1366,8 @@ class WinTool:
         if not item:
             return None
             
-        # If a category is selected, return None
-        parent = self.tree.parent(selection[0])
-        if not parent:
+        # If a category or placeholder is selected, return None
+        if not self.is_package_item(selection[0]):
             return None
             
         return item['text']
@@ -1243,8 +1381,8 @@ class WinTool:
         # Get all selected packages that are not categories
         packages_to_install = []
         for item in selected_items:
-            # Skip if it's a category (no parent)
-            if not self.tree.parent(item):
+            # Skip categories and placeholders
+            if not self.is_package_item(item):
                 continue
                 
             package_name = self.tree.item(item)['text']
@@ -1267,25 +1405,60 @@ class WinTool:
         if not messagebox.askyesno("Confirm Installation", msg):
             return
             
-        # Queue each package for installation
+        # Queue each package for installation; the ETA comes from how long
+        # each package took to install before
         total_packages = len(packages_to_install)
-        current_package = 0
-        
-        def update_status_with_progress(message, show_progress=False):
-            current_nonlocal = getattr(update_status_with_progress, 'current', 0)
-            if "Successfully installed" in message:
-                current_nonlocal += 1
-                setattr(update_status_with_progress, 'current', current_nonlocal)
-                progress = int((current_nonlocal / total_packages) * 100)
-                self.update_status(f"Installing packages... ({current_nonlocal}/{total_packages}) {progress}% - {message}")
+        remaining = list(packages_to_install)
+        remaining_lock = threading.Lock()
+        history = self.pkg_ops.history
+        
+        def on_install_done(job):
+            # Runs on the install worker, or on this thread when a queued job is cancelled
+            if job.cancelled:
+                outcome = "cancelled"
+            elif job.result:
+                outcome = "installed"
             else:
-                self.update_status(message, show_progress)
+                outcome = "failed"
+            with remaining_lock:
+                remaining.remove(job.package_name)
+                done = total_packages - len(remaining)
+                left = list(remaining)
+            if left:
+                eta = format_duration(history.estimate('install', left))
+                self.update_status(f"Installing packages... ({done}/{total_packages}) ETA {eta} - {job.package_name} {outcome}", True)
+            else:
+                self.update_status(f"Installed packages ({done}/{total_packages}) - {job.package_name} {outcome}")
         
-        setattr(update_status_with_progress, 'current', 0)
+        eta = format_duration(history.estimate('install', packages_to_install))
+        self.update_status(f"Installing {total_packages} package(s)... ETA {eta}", True)
         
-        # Queue installations
-        for package in packages_to_install:
-            self.pkg_ops.install_package(package, update_status_with_progress)
+        # Queue installations; installers download ahead while earlier ones install
+        self.pkg_ops.install_packages(packages_to_install, self.update_status, on_done=on_install_done)
+
+    def get_selected_packages(self):
+        """Names of all selected packages, skipping category and placeholder rows"""
+        return [self.tree.item(item)['text'] for item in self.tree.selection() if self.is_package_item(item)]
+
+    def cancel_install(self):
+        """Cancel queued or running installs of the selected packages"""
+        cancelled = [name for name in self.get_selected_packages() if self.pkg_ops.cancel_install(name)]
+        if not cancelled:
+            messagebox.showinfo("Nothing to Cancel", "None of the selected packages are queued or installing.")
+            return
+        self.add_activity(f"Cancelled install of {', '.join(cancelled)}")
+
+    def prioritize_install(self):
+        """Move the selected queued installs to the front of the queue"""
+        moved = []
+        for name in reversed(self.get_selected_packages()):
+            job = self.pkg_ops.scheduler.find(name)
+            if job and self.pkg_ops.scheduler.move_to_front(job.id):
+                moved.append(name)
+        if not moved:
+            messagebox.showinfo("Nothing Queued", "None of the selected packages are waiting to be installed.")
+            return
+        self.update_status(f"Moved {', '.join(reversed(moved))} to the front of the install queue")
 
     def uninstall_package(self):
         package_name = self.get_selected_package()
@@ -1301,38 +1474,77 @@ class WinTool:
             threading.Thread(target=self.pkg_ops.uninstall_package, args=(package_name, self.update_status), daemon=True).start()
 
     def update_package(self):
-        package_name = self.get_selected_package()
-        if not package_name:
-            messagebox.showwarning("No Package Selected", "Please select a package to update.")
+        """Update the selected packages that have an update available"""
+        selected = self.get_selected_packages()
+        if not selected:
+            messagebox.showwarning("No Package Selected", "Please select one or more packages to update.")
             return
             
-        if not self.pkg_ops.installation_status.get(package_name, False):
-            messagebox.showinfo("Not Installed", f"{package_name} is not installed.")
+        packages_to_update = [name for name in selected if self.pkg_ops.update_status_dict.get(name, False)]
+        if not packages_to_update:
+            if len(selected) == 1 and not self.pkg_ops.installation_status.get(selected[0], False):
+                messagebox.showinfo("Not Installed", f"{selected[0]} is not installed.")
+            else:
+                messagebox.showinfo("No Update Available", "The selected packages are already up to date.")
             return
             
-        if not self.pkg_ops.update_status_dict.get(package_name, False):
-            messagebox.showinfo("No Update Available", f"{package_name} is already up to date.")
+        self.start_upgrades(packages_to_update)
+
+    def update_all_packages(self):
+        """Update every catalog package with an update available"""
+        packages_to_update = [name for name, needs_update in self.pkg_ops.update_status_dict.items() if needs_update]
+        if not packages_to_update:
+            messagebox.showinfo("No Updates", "All installed packages are up to date.")
             return
-            
-        threading.Thread(target=self.pkg_ops.update_package, args=(package_name, self.update_status), daemon=True).start()
+        
+        updates = self.pkg_ops.available_updates
+        lines = [f"{name} ({updates[name].delta})" if name in updates else name for name in packages_to_update]
+        if not messagebox.askyesno("Confirm Update",
+                                   f"Update these {len(packages_to_update)} packages?\n\n" + "\n".join(lines)):
+            return
+        self.start_upgrades(packages_to_update)
+
+    def start_upgrades(self, package_names):
+        """Queue upgrades on the install pipeline; a summary is shown when all finish"""
+        total = len(package_names)
+        self.update_status(f"Updating {total} package(s)...", True)
+        self.add_activity(f"Queued update of {', '.join(package_names)}")
+        self.pkg_ops.upgrade_packages(
+            package_names, self.update_status,
+            on_complete=lambda results: self.status_queue.put(("upgrade_summary", results))
+        )
+
+    def show_upgrade_summary(self, results):
+        """Report the per-package outcome of an update batch"""
+        counts = {}
+        lines = []
+        for r in results:
+            counts[r['result']] = counts.get(r['result'], 0) + 1
+            versions = f" ({r['from_version']} → {r['to_version']})" if r['from_version'] and r['to_version'] else ""
+            lines.append(f"{r['package']}: {r['result']}{versions}")
+        summary = ", ".join(f"{count} {result}" for result, count in counts.items())
+        self.add_activity(f"Update finished: {summary}")
+        self.package_status = (f"Update finished: {summary}", False)
+        self.package_progress = None
+        self.apply_package_status()
+        if len(results) > 1:
+            messagebox.showinfo("Update Summary", "\n".join(lines))
 
     def refresh_packages(self):
         """Refresh the package list"""
         self.pkg_ops.refresh_packages(self.update_status, self.status_queue)
         
         # Update category dropdown with available categories
-        categories = list(self.pkg_ops.categories.keys())
-        categories.sort()
-        categories.insert(0, "All")
-        self.category_dropdown['values'] = categories
+        self.update_category_dropdown()
 
     def on_category_open(self, event):
-        item = self.tree.selection()[0]
-        self.tree.item(item, open=True)
+        # The event comes before the category opens; its first page is
+        # loaded once its placeholder is in view
+        self.schedule_page_check()
 
     def on_category_close(self, event):
-        item = self.tree.selection()[0]
-        self.tree.item(item, open=False)
+        # Categories below move up and may bring their placeholders into view
+        self.schedule_page_check()
 
     def on_item_double_click(self, event):
         package_name = self.get_selected_package()
@@ -1347,25 +1559,113 @@ class WinTool:
             while True:
                 action, data = self.status_queue.get_nowait()
                 if action == "status":
-                    self.status_label.configure(text=data)
+                    self.package_status = (data, self.package_status[1])
+                    self.package_progress = None
+                    self.apply_package_status()
+                elif action == "install_progress":
+                    package_name, event = data
+                    job = self.pkg_ops.scheduler.find(package_name)
+                    verb = "Updating" if job and job.op == 'upgrade' else "Installing"
+                    self.package_status = (f"{verb} {package_name} - {format_progress(event)}", True)
+                    self.package_progress = event.percent
+                    self.apply_package_status()
+                    self.show_row_progress(package_name, event)
                 elif action == "show_progress":
-                    self.progress_bar.pack(side=tk.RIGHT, padx=(0, 10))
-                    self.progress_bar.start(10)
+                    self.package_status = (self.package_status[0], True)
+                    self.apply_package_status()
                 elif action == "hide_progress":
-                    self.progress_bar.stop()
-                    self.progress_bar.pack_forget()
+                    self.package_status = (self.package_status[0], False)
+                    self.apply_package_status()
                 elif action == "populate_initial":
                     self.filter_packages()
                 elif action == "update_package":
                     package_name, is_installed, needs_updating = data
                     self.pkg_ops.installation_status[package_name] = is_installed
                     self.pkg_ops.update_status_dict[package_name] = needs_updating
-                    self.filter_packages()
+                    self.update_package_row(package_name)
+                elif action == "status_reconciled":
+                    if 'packages' in self.built_tabs:
+                        self.update_stats()
+                elif action == "instance_request":
+                    self.handle_instance_request(data)
+                elif action == "upgrade_summary":
+                    self.show_upgrade_summary(data)
+                elif action == "activity":
+                    self.add_activity(data)
+                elif action == "cleanup_info":
+                    self.cleanup_label.configure(text=data)
         except queue.Empty:
             pass
         finally:
             self.root.after(100, self.process_queue)
 
+    def handle_instance_request(self, request):
+        """Act on a command-line request handed over by another launch"""
+        self.root.deiconify()
+        self.root.lift()
+        self.root.focus_force()
+        
+        tab = request.get('tab')
+        if tab:
+            if tab in self.tab_ids:
+                self.notebook.select(self.tab_ids[tab])
+            else:
+                self.logger.warning(f"Unknown tab requested: {tab}")
+        
+        if request.get('install'):
+            self.install_requested_packages(request['install'])
+    
+    def install_requested_packages(self, names):
+        """Queue packages named on the command line once the catalog is loaded"""
+        if not self.pkg_ops.packages_data:
+            self.root.after(500, lambda: self.install_requested_packages(names))
+            return
+        
+        for name in names:
+            package_name = self.pkg_ops.find_package(name)
+            if not package_name:
+                self.add_activity(f"Requested package not found: {name}")
+            elif self.pkg_ops.installation_status.get(package_name, False):
+                self.add_activity(f"{package_name} is already installed")
+            else:
+                self.add_activity(f"Installing {package_name} (requested from command line)")
+                self.pkg_ops.install_package(package_name, self.update_status)
+    
+    def apply_package_status(self):
+        """Show the latest package status once the Packages tab exists"""
+        if 'packages' not in self.built_tabs:
+            return
+        
+        text, show_progress = self.package_status
+        self.status_label.configure(text=text)
+        if show_progress and self.package_progress is not None:
+            # winget reported a percentage, so show real progress
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode='determinate', value=self.package_progress)
+            self.progress_bar.pack(side=tk.RIGHT, padx=(0, 10))
+        elif show_progress:
+            self.progress_bar.configure(mode='indeterminate')
+            self.progress_bar.pack(side=tk.RIGHT, padx=(0, 10))
+            self.progress_bar.start(10)
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.pack_forget()
+
+    def sync_packages_tab(self):
+        """Bring a freshly built Packages tab up to date with loaded data"""
+        self.apply_package_status()
+        self.update_category_dropdown()
+        self.filter_packages()
+
+    def update_category_dropdown(self):
+        if 'packages' not in self.built_tabs:
+            return
+        
+        categories = list(self.pkg_ops.categories.keys())
+        categories.sort()
+        categories.insert(0, "All")
+        self.category_dropdown['values'] = categories
+
     def save_unattend(self):
         self.update_unattend_settings()
         file_path = filedialog.asksaveasfilename(
@@ -1467,10 +1767,7 @@ class WinTool:
 
         return scrollable_frame
 
-    def setup_tweaks_tab(self):
-        tweaks_tab = ttk.Frame(self.notebook, padding="20 10 20 10")
-        self.notebook.add(tweaks_tab, text="⚡ Tweaks")
-        
+    def setup_tweaks_tab(self, tweaks_tab):
         # Create top frame for search (fixed at top)
         top_frame = ttk.Frame(tweaks_tab)
         top_frame.pack(fill=tk.X, pady=(0, 10))
@@ -1532,64 +1829,11 @@ class WinTool:
         # Store references to all tweak frames for filtering
         self.tweak_frames = []
         
-        # Create sections for different types of tweaks
-        sections = [
-            ("🚀 Performance Optimization", [
-                ("Set Services to Manual", "set_services_manual", "Set selected Windows services to manual startup", "service"),
-                ("Disable Visual Effects", "disable_visual_effects", "Optimize Windows for better performance", "performance"),
-                ("Disable Transparency", "disable_transparency", "Turn off transparency effects", "performance"),
-                ("Disable Animations", "disable_animations", "Turn off animation effects", "performance"),
-                ("Optimize Processor Scheduling", "optimize_processor_scheduling", "Adjust for best performance of programs", "performance"),
-                ("Disable Background Apps", "disable_background_apps", "Prevent apps from running in background", "performance"),
-                ("Disable Startup Delay", "disable_startup_delay", "Remove delay for startup programs", "performance"),
-                ("Clear Page File at Shutdown", "clear_page_file", "Secure but slower shutdown", "performance"),
-                ("Optimize SSD", "optimize_ssd", "Enable TRIM and disable defrag for SSDs", "performance")
-            ]),
-            ("🔒 Privacy & Security", [
-                ("Disable Telemetry", "disable_telemetry", "Reduce data collection by Windows", "privacy"),
-                ("Disable Cortana", "disable_cortana", "Turn off Cortana assistant", "privacy"),
-                ("Disable Activity History", "disable_activity_history", "Stop Windows from tracking activities", "privacy"),
-                ("Disable Location Tracking", "disable_location_tracking", "Turn off location services", "privacy"),
-                ("Disable Advertising ID", "disable_advertising_id", "Stop personalized ads", "privacy"),
-                ("Disable Windows Tips", "disable_windows_tips", "Stop Windows suggestions", "privacy"),
-                ("Disable Timeline", "disable_timeline", "Turn off Windows Timeline feature", "privacy"),
-                ("Disable Cloud Clipboard", "disable_cloud_clipboard", "Stop syncing clipboard to cloud", "privacy"),
-                ("Disable Diagnostic Data", "disable_diagnostic_data", "Minimize diagnostic data collection", "privacy"),
-                ("Disable Feedback", "disable_feedback", "Turn off feedback notifications", "privacy")
-            ]),
-            ("🖥️ Desktop & Explorer", [
-                ("Show File Extensions", "show_file_extensions", "Display all file extensions", "desktop"),
-                ("Show Hidden Files", "show_hidden_files", "Show hidden files and folders", "desktop"),
-                ("Disable Quick Access", "disable_quick_access", "Clean up File Explorer sidebar", "desktop"),
-                ("Classic Context Menu", "classic_context_menu", "Use Windows 10 style context menu", "desktop"),
-                ("Disable Search Highlights", "disable_search_highlights", "Remove search highlights", "desktop"),
-                ("Enable Dark Mode", "enable_dark_mode", "Enable system-wide dark theme", "desktop")
-            ]),
-            ("⚡ Power & Battery", [
-                ("High Performance", "set_high_performance", "Set power plan to high performance", "power"),
-                ("Disable USB Power Saving", "disable_usb_power_saving", "Prevent USB selective suspend", "power"),
-                ("Disable Sleep Timeout", "disable_sleep", "Prevent system from sleeping", "power")
-            ]),
-            ("🎮 Gaming Optimization", [
-                ("Game Mode", "enable_game_mode", "Enable Windows Game Mode", "gaming"),
-                ("Hardware Acceleration", "enable_hardware_acceleration", "Enable GPU scheduling", "gaming"),
-                ("Disable Game Bar", "disable_game_bar", "Remove Xbox Game Bar", "gaming")
-            ]),
-            ("🌐 Network & Internet", [
-                ("Optimize Network", "optimize_network", "Optimize network settings", "network"),
-                ("Use Fast DNS", "set_dns_servers", "Use faster DNS servers", "network")
-            ]),
-            ("🔧 System Maintenance", [
-                ("Clean Temp Files", "clean_temp_files", "Remove unnecessary files", "maintenance"),
-                ("Optimize Search", "optimize_windows_search", "Windows Search indexer", "maintenance"),
-                ("Optimize Prefetch", "optimize_prefetch", "Optimize Windows Prefetch settings", "maintenance"),
-                ("Optimize Disk Cleanup", "optimize_disk_cleanup", "Configure disk cleanup settings", "maintenance"),
-                ("Optimize System Restore", "optimize_system_restore", "Configure system restore settings", "maintenance")
-            ])
-        ]
+        # Sections and their tweaks are defined alongside the tweak classes
+        from system_tweaks import TWEAK_SECTIONS
         
         # Create sections
-        for i, (section_title, tweaks) in enumerate(sections):
+        for i, (section_title, tweaks) in enumerate(TWEAK_SECTIONS):
             # Section label
             section_label = ttk.Label(main_frame, text=section_title, font=("Segoe UI", 12, "bold"))
             section_label.grid(row=i*10, column=0, columnspan=2, sticky="w", pady=(20 if i > 0 else 0, 10))
@@ -1652,31 +1896,28 @@ class WinTool:
             else:
                 tweak['frame'].grid_remove()
 
+    def get_tweak_handler(self, category):
+        """Return the tweak class instance for a category, creating it on first use"""
+        handler = self.tweak_handlers.get(category)
+        if handler is None:
+            import system_tweaks
+            handler = system_tweaks.create_tweak_handler(category)
+            self.tweak_handlers[category] = handler
+        return handler
+
     def on_tweak_toggled(self, tweak_name, var):
         """Handle tweak checkbox toggle"""
         try:
             # Get the appropriate tweak class based on category
             category = self.tweak_functions[tweak_name]['category']
-            tweak_class = None
-            if category == 'performance':
-                tweak_class = self.performance_tweaks
-            elif category == 'privacy':
-                tweak_class = self.privacy_tweaks
-            elif category == 'desktop':
-                tweak_class = self.desktop_tweaks
-            elif category == 'power':
-                tweak_class = self.power_tweaks
-            elif category == 'gaming':
-                tweak_class = self.gaming_tweaks
-            elif category == 'network':
-                tweak_class = self.network_tweaks
-            elif category == 'maintenance':
-                tweak_class = self.maintenance_tweaks
+            tweak_class = self.get_tweak_handler(category)
 
             # Get the tweak function
             if hasattr(tweak_class, tweak_name):
                 tweak_func = getattr(tweak_class, tweak_name)
+                op_id = self.pkg_ops.history.safe_start('tweak', tweak_name)
                 success = tweak_func(var.get())
+                self.pkg_ops.history.safe_finish(op_id, success)
                 if success:
                     self.show_notification(f"Successfully {'applied' if var.get() else 'reverted'} {tweak_name}")
                     self.logger.info(f"Successfully {'applied' if var.get() else 'reverted'} tweak: {tweak_name}")
@@ -1716,21 +1957,7 @@ class WinTool:
                 try:
                     # Get the appropriate tweak class based on category
                     category = data['category']
-                    tweak_class = None
-                    if category == 'performance':
-                        tweak_class = self.performance_tweaks
-                    elif category == 'privacy':
-                        tweak_class = self.privacy_tweaks
-                    elif category == 'desktop':
-                        tweak_class = self.desktop_tweaks
-                    elif category == 'power':
-                        tweak_class = self.power_tweaks
-                    elif category == 'gaming':
-                        tweak_class = self.gaming_tweaks
-                    elif category == 'network':
-                        tweak_class = self.network_tweaks
-                    elif category == 'maintenance':
-                        tweak_class = self.maintenance_tweaks
+                    tweak_class = self.get_tweak_handler(category)
 
                     # Get the check function
                     check_name = f"check_{func_name}"
@@ -1738,7 +1965,7 @@ class WinTool:
                         check_func = getattr(tweak_class, check_name)
                         is_enabled = check_func()
                         data['var'].set(is_enabled)
-                        self.logger.info(f"State of {func_name}: {is_enabled}")
+                        self.logger.debug(f"State of {func_name}: {is_enabled}")
                     else:
                         self.logger.warning(f"No check function found: {check_name}")
                 except Exception as e:
@@ -1746,11 +1973,7 @@ class WinTool:
         except Exception as e:
             self.logger.error(f"Error refreshing tweak states: {str(e)}")
             
-    def setup_dashboard_tab(self):
-        dashboard_tab = ttk.Frame(self.notebook, padding="20 10 20 10", style="Dashboard.TFrame")
-        self.notebook.add(dashboard_tab, text="🏠 Home")
-        self.notebook.select(0)  # Make dashboard the default tab
-
+    def setup_dashboard_tab(self, dashboard_tab):
         # Welcome header with gradient-like effect
         header_frame = ttk.Frame(dashboard_tab, style="Header.TFrame")
         header_frame.pack(fill=tk.X, pady=(0, 20))
@@ -1896,62 +2119,194 @@ class WinTool:
     def update_stats(self):
         total_packages = sum(len(packages) for packages in self.pkg_ops.categories.values())
         total_categories = len(self.pkg_ops.categories)
-        self.stats_label.configure(text=f" 📦 {total_packages} WinGet Packages in {total_categories} Categories")
-        
+        text = f" 📦 {total_packages} WinGet Packages in {total_categories} Categories"
+        if self.pkg_ops.status_stale:
+            saved = self.pkg_ops.status_snapshot_time
+            since = f" from {time.strftime('%Y-%m-%d %H:%M', time.localtime(saved))}" if saved else ""
+            text += f" (showing last known status{since}, checking...)"
+        self.stats_label.configure(text=text)
+    
+    def get_package_row_values(self, package_name):
+        """Return (status, version, tag) for a package row"""
+        if self.pkg_ops.update_status_dict.get(package_name, False):
+            update = self.pkg_ops.available_updates.get(package_name)
+            return "Update Available", update.delta if update else "", 'needs_update'
+        if self.pkg_ops.installation_status.get(package_name, False):
+            return "Updated", "", 'installed'
+        return "Not Installed", "", 'not_installed'
+    
+    def show_row_progress(self, package_name, event):
+        """Show an install phase/percentage in the package's Status column"""
+        if 'packages' not in self.built_tabs:
+            return
+        item_id = self.package_rows.get(package_name)
+        if item_id and self.tree.exists(item_id):
+            percent = f" {event.percent}%" if event.percent is not None else ""
+            self.tree.set(item_id, 'status', f"{event.phase.capitalize()}{percent}")
+    
+    def update_package_row(self, package_name):
+        """Update a single package row in place instead of rebuilding the tree"""
+        if 'packages' not in self.built_tabs:
+            return
+        item_id = self.package_rows.get(package_name)
+        if not item_id or not self.tree.exists(item_id):
+            return
+        row = self.get_package_row_values(package_name)
+        status, version, tag = row
+        description = self.tree.set(item_id, 'description')
+        self.tree.item(item_id, values=(status, version, description), tags=(tag,))
+        self.package_row_values[package_name] = row
+
+    def schedule_package_filter(self, *args):
+        """Search once typing pauses rather than on every keystroke"""
+        if self.search_after_id:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.filter_packages)
+
+    def sync_tree_children(self, parent, current, wanted, items, create):
+        """Bring the children of `parent` from the `current` to the `wanted` key order.
+
+        `items` maps keys to item ids and gains the rows `create(key, index)`
+        inserts. Rows whose relative order holds are left where they are.
+        """
+        reorder = [key for key in wanted if key in items] != current
+        for index, key in enumerate(wanted):
+            if key not in items:
+                items[key] = create(key, index)
+            elif reorder:
+                self.tree.move(items[key], parent, index)
+
+    def insert_package_row(self, category, index, entry):
+        row = self.get_package_row_values(entry.name)
+        self.package_row_values[entry.name] = row
+        status, version, tag = row
+        return self.tree.insert(self.category_rows[category], index, text=entry.name,
+                                values=(status, version, entry.description), tags=(tag,))
+
+    def update_category_placeholder(self, category):
+        """Keep one placeholder row after a category's loaded rows while some are left to page in"""
+        remaining = len(self.category_results[category]) - len(self.category_children[category])
+        placeholder = self.category_placeholders.get(category)
+        if remaining <= 0:
+            if placeholder:
+                self.tree.delete(self.category_placeholders.pop(category))
+        elif placeholder:
+            self.tree.item(placeholder, text=f"{remaining} more...")
+        else:
+            self.category_placeholders[category] = self.tree.insert(
+                self.category_rows[category], 'end', text=f"{remaining} more...", tags=('placeholder',))
+
+    def load_package_page(self, category):
+        """Insert the next page of a category's rows before its placeholder"""
+        loaded = self.category_children[category]
+        start = len(loaded)
+        for index, entry in enumerate(self.category_results[category][start:start + PACKAGE_PAGE_SIZE], start):
+            self.package_rows[entry.name] = self.insert_package_row(category, index, entry)
+            loaded.append(entry.name)
+        self.update_category_placeholder(category)
+
+    def schedule_page_check(self, *args):
+        if not self.page_check_pending:
+            self.page_check_pending = True
+            self.root.after_idle(self.load_visible_pages)
+
+    def load_visible_pages(self):
+        """Page rows in while a placeholder is in view, i.e. its category is open and scrolled to its end"""
+        self.page_check_pending = False
+        if 'packages' not in self.built_tabs:
+            return
+        for category in list(self.category_placeholders):
+            while category in self.category_placeholders and self.tree.bbox(self.category_placeholders[category]):
+                self.load_package_page(category)
+
+    def on_tree_scroll(self, first, last):
+        self.tree_scrollbar.set(first, last)
+        self.schedule_page_check()
+
+    def is_package_item(self, item):
+        """Whether a tree item is a package row rather than a category or placeholder"""
+        return bool(self.tree.parent(item)) and not self.tree.tag_has('placeholder', item)
+
     def filter_packages(self, *args):
-        search_term = self.search_var.get().lower()
+        """Show the search results, changing only the rows that differ from what is shown.
+
+        Categories start with a placeholder instead of their rows; rows are
+        paged in once the placeholder scrolls into view, so the cost of a
+        search doesn't grow with the number of matches.
+        """
+        if 'packages' not in self.built_tabs:
+            return
+        self.search_after_id = None
+
         selected_category = self.category_var.get()
-        self.tree.delete(*self.tree.get_children())
-        
-        for category, packages in self.pkg_ops.categories.items():
-            # Skip if a specific category is selected and this isn't it
-            if selected_category != "All" and category != selected_category:
+        # Only categories with a match come back, so no empty category rows
+        results = dict(self.pkg_ops.search_index.search(
+            self.search_var.get(), None if selected_category == "All" else selected_category))
+
+        # A category keeps as many rows loaded as before so a new search
+        # doesn't scroll the view back. Deleting a category row also deletes
+        # its package rows and placeholder
+        wanted = {}
+        stale = []
+        for category, names in self.category_children.items():
+            if category not in results:
+                stale.append(self.category_rows.pop(category))
+                self.category_placeholders.pop(category, None)
+                for name in names:
+                    del self.package_rows[name]
+                    del self.package_row_values[name]
                 continue
-                
-            category_visible = False
-            category_id = self.tree.insert('', 'end', text=category)
-            
-            for package_name in packages:
-                if search_term in package_name.lower() or search_term in self.pkg_ops.get_package_info(package_name).get('description', '').lower():
-                    package_data = self.pkg_ops.get_package_info(package_name)
-                    description = package_data.get('description', '')
-                    
-                    is_installed = self.pkg_ops.installation_status.get(package_name, False)
-                    needs_update = self.pkg_ops.update_status_dict.get(package_name, False)
-                    
-                    if needs_update:
-                        status = "Update Available"
-                        tag = 'needs_update'
-                    elif is_installed:
-                        status = "Updated"
-                        tag = 'installed'
-                    else:
-                        status = "Not Installed"
-                        tag = 'not_installed'
-                    
-                    self.tree.insert(category_id, 'end', text=package_name, values=(status, description), tags=(tag,))
-                    category_visible = True
-            
-            if not category_visible:
-                self.tree.delete(category_id)
-            else:
-                # Open the category by default
-                self.tree.item(category_id, open=True)
-        
+            wanted[category] = results[category][:len(names)]
+            loaded = {entry.name for entry in wanted[category]}
+            kept = []
+            for name in names:
+                if name in loaded:
+                    kept.append(name)
+                else:
+                    stale.append(self.package_rows.pop(name))
+                    del self.package_row_values[name]
+            self.category_children[category] = kept
+        if stale:
+            self.tree.delete(*stale)
+        shown = [category for category in self.category_children if category in results]
+        self.category_children = {category: self.category_children.get(category, []) for category in results}
+        self.category_results = results
+
+        def insert_category(category, index):
+            # Open the category by default
+            return self.tree.insert('', index, text=category, open=True)
+
+        self.sync_tree_children('', shown, list(results), self.category_rows, insert_category)
+
+        for category, entries in wanted.items():
+            by_name = {entry.name: entry for entry in entries}
+            self.sync_tree_children(self.category_rows[category], self.category_children[category], list(by_name),
+                                    self.package_rows, lambda name, index: self.insert_package_row(category, index, by_name[name]))
+            self.category_children[category] = list(by_name)
+        for category in results:
+            self.update_category_placeholder(category)
+
+        # Rows that stayed may still have a new status
+        for name, row in self.package_row_values.items():
+            current = self.get_package_row_values(name)
+            if current != row:
+                self.update_package_row(name)
+
         self.update_stats()
+        self.schedule_page_check()
 
     def initial_package_load(self):
         """Initial load of packages and update UI"""
-        self.pkg_ops.load_packages_async(self.update_status, self.status_queue)
+        prewarm, self.prewarm = self.prewarm, None
+        self.pkg_ops.load_packages_async(self.update_status, self.status_queue, prewarm)
+        if prewarm:
+            prewarm.shutdown()
         self.root.after(100, self.check_and_update_categories)
     
     def check_and_update_categories(self):
         """Check if categories are loaded and update dropdown"""
         if self.pkg_ops.categories:
-            categories = list(self.pkg_ops.categories.keys())
-            categories.sort()
-            categories.insert(0, "All")
-            self.category_dropdown['values'] = categories
+            self.update_category_dropdown()
             self.filter_packages()
         else:
             # Check again in 100ms
@@ -1959,6 +2314,11 @@ class WinTool:
 
     def run(self):
         self.root.mainloop()
+        # Window closed: drop queued installs and stop the install worker
+        self.pkg_ops.shutdown()
+        # Stop sampling before closing the provider, so a recording ends on a complete line
+        self.sys_health.stop_monitoring()
+        self.sys_health.provider.close()
 
     def start_move(self, event):
         self.x = event.x
@@ -1979,6 +2339,9 @@ class WinTool:
         self.root.geometry(f"+{x}+{y}")
 
 if __name__ == "__main__":
+    setup_logging()
+    # Kick off winget, catalog and inventory work before Tk starts up
+    prewarm = Prewarm()
     root = tk.Tk()
-    winget_installer = WinGetInstaller(root)
+    winget_installer = WinGetInstaller(root, prewarm, instance)
     winget_installer.run()
@@ -0,0 +1,118 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+DEFAULT_PORT = 9184
+
+# (stats key, metric name, type, help)
+SAMPLER_METRICS = [
+    ('cpu_percent', 'wintool_cpu_usage_percent', 'gauge', 'CPU usage in percent'),
+    ('cpu_cores', 'wintool_cpu_cores', 'gauge', 'Number of logical CPUs'),
+    ('cpu_frequency', 'wintool_cpu_frequency_mhz', 'gauge', 'Current CPU frequency in MHz'),
+    ('memory_percent', 'wintool_memory_usage_percent', 'gauge', 'Memory usage in percent'),
+    ('memory_used', 'wintool_memory_used_bytes', 'gauge', 'Memory in use'),
+    ('memory_total', 'wintool_memory_total_bytes', 'gauge', 'Total physical memory'),
+    ('disk_percent', 'wintool_disk_activity_percent', 'gauge', 'Disk activity in percent'),
+    ('disk_used', 'wintool_disk_used_bytes', 'gauge', 'Used space on the system drive'),
+    ('disk_total', 'wintool_disk_total_bytes', 'gauge', 'Size of the system drive'),
+    ('disk_free', 'wintool_disk_free_bytes', 'gauge', 'Free space on the system drive'),
+    ('disk_read_bytes', 'wintool_disk_read_bytes', 'counter', 'Bytes read from disk'),
+    ('disk_write_bytes', 'wintool_disk_written_bytes', 'counter', 'Bytes written to disk'),
+    ('net_bytes_sent', 'wintool_network_sent_bytes', 'counter', 'Bytes sent on all interfaces'),
+    ('net_bytes_recv', 'wintool_network_received_bytes', 'counter', 'Bytes received on all interfaces')
+]
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def render_metric(lines, name, kind, help_text, value):
+    """Append one metric family in OpenMetrics text format"""
+    lines.append(f"# TYPE {name} {kind}")
+    lines.append(f"# HELP {name} {help_text}")
+    if kind == 'counter':
+        lines.append(f"{name}_total {_format_value(value)}")
+    elif kind == 'summary':
+        lines.append(f"{name}_count {_format_value(value['count'])}")
+        lines.append(f"{name}_sum {_format_value(value['sum'])}")
+    else:
+        lines.append(f"{name} {_format_value(value)}")
+
+
+class MetricsExporter:
+    """Serves the latest sampler metrics over HTTP in OpenMetrics format.
+
+    The exposition text is rendered once per sampler tick by `update`; a
+    scrape only hands out the pre-built bytes and never touches psutil.
+    Additional sources are callables returning (name, type, help, value)
+    tuples and are read at render time.
+    """
+
+    def __init__(self, port=DEFAULT_PORT, host='127.0.0.1'):
+        self.host = host
+        self.port = port
+        self.sources = []
+        self.buffer = b"# EOF\n"
+        self.server = None
+        self.server_thread = None
+
+    def add_source(self, source):
+        self.sources.append(source)
+
+    def update(self, stats):
+        """Render a stats sample and any internal sources into the buffer"""
+        lines = []
+        for key, name, kind, help_text in SAMPLER_METRICS:
+            if key in stats:
+                render_metric(lines, name, kind, help_text, stats[key])
+
+        for source in self.sources:
+            try:
+                for name, kind, help_text, value in source():
+                    render_metric(lines, name, kind, help_text, value)
+            except Exception as e:
+                logger.error(f"Failed to collect internal metrics: {str(e)}")
+
+        lines.append("# EOF")
+        self.buffer = ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def start(self):
+        """Start serving on localhost in a background thread"""
+        if self.server:
+            return
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.buffer
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+        self.server.daemon_threads = True
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        logger.info(f"Metrics exporter listening on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,309 @@
+import abc
+import gzip
+import json
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+# psutil-compatible records; only the fields the sampler and monitor read
+CpuFreq = namedtuple('CpuFreq', 'current')
+VirtualMemory = namedtuple('VirtualMemory', 'total available percent used')
+DiskUsage = namedtuple('DiskUsage', 'total used free percent')
+DiskIO = namedtuple('DiskIO', 'read_bytes write_bytes')
+NetIO = namedtuple('NetIO', 'bytes_sent bytes_recv')
+
+RECORD_TYPES = {
+    'cpu_freq': CpuFreq,
+    'virtual_memory': VirtualMemory,
+    'disk_usage': DiskUsage,
+    'disk_io_counters': DiskIO,
+    'net_io_counters': NetIO
+}
+
+# Readings that only ever grow; a looping replay keeps them rising
+CUMULATIVE_METHODS = {'disk_io_counters', 'net_io_counters', 'time'}
+
+RECORDING_FORMAT = 'wintool-metrics'
+RECORDING_VERSION = 1
+
+
+class MetricsProvider(abc.ABC):
+    """Source of system counters for SystemHealth and SystemMonitor.
+
+    Methods mirror the psutil calls the samplers make, so the live provider
+    is a thin pass-through and the recorder/replayer can sit in between.
+    """
+
+    @abc.abstractmethod
+    def cpu_percent(self, interval=None):
+        pass
+
+    @abc.abstractmethod
+    def cpu_count(self):
+        pass
+
+    @abc.abstractmethod
+    def cpu_freq(self):
+        pass
+
+    @abc.abstractmethod
+    def virtual_memory(self):
+        pass
+
+    @abc.abstractmethod
+    def disk_usage(self, path):
+        pass
+
+    @abc.abstractmethod
+    def disk_io_counters(self):
+        pass
+
+    @abc.abstractmethod
+    def net_io_counters(self):
+        pass
+
+    @abc.abstractmethod
+    def boot_time(self):
+        pass
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def restarted(self):
+        """Whether the readings started over since the last call, so gauges jump there"""
+        return False
+
+    def close(self):
+        pass
+
+
+class PsutilProvider(MetricsProvider):
+    """Live counters straight from psutil"""
+
+    def __init__(self):
+        import psutil
+        self.psutil = psutil
+
+    def cpu_percent(self, interval=None):
+        return self.psutil.cpu_percent(interval=interval)
+
+    def cpu_count(self):
+        return self.psutil.cpu_count()
+
+    def cpu_freq(self):
+        return self.psutil.cpu_freq()
+
+    def virtual_memory(self):
+        return self.psutil.virtual_memory()
+
+    def disk_usage(self, path):
+        return self.psutil.disk_usage(path)
+
+    def disk_io_counters(self):
+        return self.psutil.disk_io_counters()
+
+    def net_io_counters(self):
+        return self.psutil.net_io_counters()
+
+    def boot_time(self):
+        return self.psutil.boot_time()
+
+
+def _open_recording(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class RecordingProvider(MetricsProvider):
+    """Pass-through provider that appends every reading to a recording file.
+
+    The file is JSON lines (gzip-compressed when the name ends in .gz): a
+    header, then one `[time, method, value]` entry per call, where record
+    types are stored as plain field lists.
+    """
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = _open_recording(path, 'w')
+        self.file.write(json.dumps({'format': RECORDING_FORMAT, 'version': RECORDING_VERSION}) + '\n')
+
+    def _record(self, method, value):
+        if method in RECORD_TYPES and value is not None:
+            stored = [getattr(value, field) for field in RECORD_TYPES[method]._fields]
+        else:
+            stored = value
+        entry = json.dumps([round(time.time(), 3), method, stored], separators=(',', ':'))
+        with self.lock:
+            if self.file:
+                self.file.write(entry + '\n')
+        return value
+
+    def cpu_percent(self, interval=None):
+        return self._record('cpu_percent', self.inner.cpu_percent(interval))
+
+    def cpu_count(self):
+        return self._record('cpu_count', self.inner.cpu_count())
+
+    def cpu_freq(self):
+        return self._record('cpu_freq', self.inner.cpu_freq())
+
+    def virtual_memory(self):
+        return self._record('virtual_memory', self.inner.virtual_memory())
+
+    def disk_usage(self, path):
+        return self._record('disk_usage', self.inner.disk_usage(path))
+
+    def disk_io_counters(self):
+        return self._record('disk_io_counters', self.inner.disk_io_counters())
+
+    def net_io_counters(self):
+        return self._record('net_io_counters', self.inner.net_io_counters())
+
+    def boot_time(self):
+        return self._record('boot_time', self.inner.boot_time())
+
+    def time(self):
+        return self._record('time', self.inner.time())
+
+    def sleep(self, seconds):
+        self.inner.sleep(seconds)
+
+    def restarted(self):
+        return self.inner.restarted()
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+        self.inner.close()
+
+
+class ReplayProvider(MetricsProvider):
+    """Plays a recording back, optionally faster than real time.
+
+    Readings are returned per method in the order they were recorded.
+    `speed` divides every wait (blocking cpu_percent intervals and sampler
+    sleeps); a speed of 0 replays as fast as possible. Raises EOFError once
+    a method runs out of readings, unless `loop` is set. A looping replay
+    shifts cumulative counters and the clock so they keep rising, and
+    reports each wrap through restarted().
+    """
+
+    def __init__(self, path, speed=1.0, loop=False):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.lock = threading.Lock()
+        self.readings = {}
+        with _open_recording(path, 'r') as f:
+            header = json.loads(f.readline())
+            if header.get('format') != RECORDING_FORMAT:
+                raise ValueError(f"{path} is not a metrics recording")
+            for line in f:
+                if not line.strip():
+                    continue
+                _, method, value = json.loads(line)
+                if method in RECORD_TYPES and value is not None:
+                    value = RECORD_TYPES[method](*value)
+                self.readings.setdefault(method, []).append(value)
+        self.cursors = {method: deque(values) for method, values in self.readings.items()}
+        # Added to cumulative readings after each wrap, and the last one returned
+        self.offsets = {}
+        self.last = {}
+        self.wrapped = False
+
+    def _shift(self, value, offset):
+        if value is None or not offset:
+            return value
+        if isinstance(value, tuple):
+            return type(value)(*(field + delta for field, delta in zip(value, offset)))
+        return value + offset
+
+    def _wrap(self, method):
+        """Start a method's readings over, continuing cumulative ones from the last value"""
+        self.cursors[method] = deque(self.readings[method])
+        self.wrapped = True
+        first, last = self.readings[method][0], self.last.get(method)
+        if method not in CUMULATIVE_METHODS or first is None or last is None:
+            return
+        if isinstance(first, tuple):
+            self.offsets[method] = tuple(b - a for a, b in zip(first, last))
+        else:
+            # The clock also moves on by one recorded step
+            step = self.readings[method][1] - first if len(self.readings[method]) > 1 else 0
+            self.offsets[method] = last - first + max(step, 0)
+
+    def _next(self, method):
+        with self.lock:
+            cursor = self.cursors.get(method)
+            if not cursor:
+                if not self.loop or method not in self.readings:
+                    raise EOFError(f"Recording exhausted for {method}")
+                self._wrap(method)
+                cursor = self.cursors[method]
+            value = self._shift(cursor.popleft(), self.offsets.get(method))
+            self.last[method] = value
+            return value
+
+    def restarted(self):
+        with self.lock:
+            wrapped, self.wrapped = self.wrapped, False
+            return wrapped
+
+    def sleep(self, seconds):
+        if self.speed:
+            time.sleep(seconds / self.speed)
+
+    def cpu_percent(self, interval=None):
+        if interval:
+            self.sleep(interval)
+        return self._next('cpu_percent')
+
+    def cpu_count(self):
+        return self._next('cpu_count')
+
+    def cpu_freq(self):
+        return self._next('cpu_freq')
+
+    def virtual_memory(self):
+        return self._next('virtual_memory')
+
+    def disk_usage(self, path):
+        return self._next('disk_usage')
+
+    def disk_io_counters(self):
+        return self._next('disk_io_counters')
+
+    def net_io_counters(self):
+        return self._next('net_io_counters')
+
+    def boot_time(self):
+        return self._next('boot_time')
+
+    def time(self):
+        return self._next('time')
+
+
+def provider_from_env():
+    """Pick a provider from WINTOOL_METRICS_REPLAY / WINTOOL_METRICS_RECORD.
+
+    WINTOOL_METRICS_SPEED sets the replay speed multiplier (default 1).
+    """
+    replay_path = os.environ.get('WINTOOL_METRICS_REPLAY')
+    if replay_path:
+        speed = float(os.environ.get('WINTOOL_METRICS_SPEED', '1'))
+        return ReplayProvider(replay_path, speed=speed, loop=True)
+
+    record_path = os.environ.get('WINTOOL_METRICS_RECORD')
+    if record_path:
+        return RecordingProvider(PsutilProvider(), record_path)
+
+    return PsutilProvider()
@@ -0,0 +1,218 @@
+"""
+Headless health monitor for MTech WinTool.
+
+Samples the same collectors as the dashboard (SystemHealth) and appends
+one record per tick to a size-rotated file, without loading Tk.
+
+    python -m monitor_daemon --output health.jsonl --interval 10
+    python -m monitor_daemon --format binary --output health.bin
+    python -m monitor_daemon --benchmark 200
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import struct
+import sys
+import threading
+import time
+from log_config import setup_logging
+from metrics_provider import provider_from_env
+from system_health import SystemHealth
+
+logger = logging.getLogger(__name__)
+
+# Field order of a binary record; every field is stored as a little-endian double
+BINARY_FIELDS = (
+    'timestamp', 'cpu_percent', 'cpu_cores', 'cpu_frequency',
+    'memory_percent', 'memory_used', 'memory_total',
+    'disk_percent', 'disk_used', 'disk_total', 'disk_free',
+    'disk_read_bytes', 'disk_write_bytes', 'net_bytes_sent', 'net_bytes_recv'
+)
+BINARY_MAGIC = b'WTM1'
+BINARY_RECORD = struct.Struct('<' + 'd' * len(BINARY_FIELDS))
+# Longest single sleep between checks for a stop request
+STOP_CHECK_INTERVAL = 0.5
+
+
+class RotatingRecordWriter:
+    """Appends encoded records to a file, rotating it once it reaches max_bytes"""
+
+    def __init__(self, path, fmt='jsonl', max_bytes=10 * 1024 * 1024, backup_count=5):
+        if fmt not in ('jsonl', 'binary'):
+            raise ValueError(f"Unsupported record format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.file = None
+        self.size = 0
+        self._open()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.file = open(self.path, 'ab')
+        self.size = self.file.tell()
+        if self.fmt == 'binary' and self.size == 0:
+            self.file.write(BINARY_MAGIC)
+            self.size = len(BINARY_MAGIC)
+
+    def _rotate(self):
+        self.file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def encode(self, stats):
+        if self.fmt == 'binary':
+            return BINARY_RECORD.pack(*(float(stats.get(field, 0)) for field in BINARY_FIELDS))
+        return (json.dumps(stats, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def write(self, stats):
+        record = self.encode(stats)
+        if self.max_bytes and self.size + len(record) > self.max_bytes:
+            self._rotate()
+        self.file.write(record)
+        self.file.flush()
+        self.size += len(record)
+        return len(record)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def read_binary_records(path):
+    """Yield stats dicts from a binary record file"""
+    with open(path, 'rb') as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{path} is not a binary health record file")
+        while True:
+            chunk = f.read(BINARY_RECORD.size)
+            if len(chunk) < BINARY_RECORD.size:
+                return
+            yield dict(zip(BINARY_FIELDS, BINARY_RECORD.unpack(chunk)))
+
+
+class MonitorDaemon:
+    """Runs the health sampler on a fixed interval and writes every sample"""
+
+    def __init__(self, writer, interval=5.0, health=None):
+        self.writer = writer
+        self.interval = interval
+        # CPU is measured between ticks rather than by blocking for a second
+        self.health = health or SystemHealth(None, provider=provider_from_env(), cpu_interval=None)
+        self.stop_event = threading.Event()
+
+    def stop(self, *args):
+        self.stop_event.set()
+
+    def _prime_cpu(self):
+        """Start psutil's non-blocking CPU counter so the first record is meaningful.
+
+        psutil is called directly: a reading through the provider would put
+        an extra cpu_percent entry in a recording and misalign its replay.
+        """
+        try:
+            import psutil
+            psutil.cpu_percent(interval=None)
+        except ImportError:
+            pass
+
+    def _wait(self, seconds):
+        """Sleep through the provider, so a replay runs at its speed, checking for stop requests"""
+        while seconds > 0 and not self.stop_event.is_set():
+            step = min(seconds, STOP_CHECK_INTERVAL)
+            self.health.provider.sleep(step)
+            seconds -= step
+
+    def run(self, count=None):
+        """Sample until stopped (or `count` samples). Returns samples written"""
+        written = 0
+        self._prime_cpu()
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            try:
+                stats = self.health.get_system_stats()
+            except EOFError:
+                break
+            if stats:
+                self.writer.write(stats)
+                written += 1
+                if count is not None and written >= count:
+                    break
+
+            # Take the sampling time off the wait so it does not stretch the interval
+            self._wait(self.interval - (time.monotonic() - started))
+        return written
+
+
+def run_benchmark(samples, fmt):
+    """Measure per-sample CPU cost and record size with no sleeping between ticks"""
+    path = os.path.join(os.environ.get('TEMP', '.'), f"wintool_monitor_benchmark.{fmt}")
+    writer = RotatingRecordWriter(path, fmt, max_bytes=0)
+    daemon = MonitorDaemon(writer, interval=0)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    written = daemon.run(count=samples)
+    cpu_time = time.process_time() - cpu_start
+    wall_time = time.perf_counter() - wall_start
+    writer.close()
+    size = os.path.getsize(path)
+    os.remove(path)
+    return {
+        'samples': written,
+        'format': fmt,
+        'cpu_ms_per_sample': round(cpu_time / max(written, 1) * 1000, 3),
+        'wall_ms_per_sample': round(wall_time / max(written, 1) * 1000, 3),
+        'bytes_per_sample': round(size / max(written, 1), 1)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='monitor_daemon', description='Headless MTech WinTool health monitor')
+    parser.add_argument('--output', default=os.path.join('logs', 'health.jsonl'), help='record file path')
+    parser.add_argument('--format', choices=('jsonl', 'binary'), default='jsonl', help='record encoding')
+    parser.add_argument('--interval', type=float, default=5.0, help='seconds between samples')
+    parser.add_argument('--max-bytes', type=int, default=10 * 1024 * 1024, help='rotate after this many bytes (0 disables)')
+    parser.add_argument('--backups', type=int, default=5, help='rotated files to keep')
+    parser.add_argument('--count', type=int, help='stop after this many samples')
+    parser.add_argument('--benchmark', type=int, metavar='SAMPLES', help='measure sampling overhead and exit')
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    if args.benchmark:
+        print(json.dumps(run_benchmark(args.benchmark, args.format)))
+        return 0
+
+    writer = RotatingRecordWriter(args.output, args.format, args.max_bytes, args.backups)
+    daemon = MonitorDaemon(writer, args.interval)
+    # Service wrappers stop us with SIGTERM (or CTRL_BREAK on Windows)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    if hasattr(signal, 'SIGBREAK'):
+        signal.signal(signal.SIGBREAK, daemon.stop)
+
+    logger.info(f"Writing {args.format} health records to {args.output} every {args.interval}s")
+    try:
+        written = daemon.run(args.count)
+    finally:
+        writer.close()
+    logger.info(f"Monitor stopped after {written} samples")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
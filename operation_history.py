@@ -0,0 +1,172 @@
+import logging
+import sqlite3
+import threading
+import time
+from app_paths import get_data_path
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILE = 'operations.db'
+DEFAULT_DURATION = 60.0
+# Recent successful runs averaged for a per-target estimate
+ESTIMATE_SAMPLES = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    id INTEGER PRIMARY KEY,
+    op TEXT NOT NULL,
+    target TEXT NOT NULL,
+    package_id TEXT,
+    started REAL NOT NULL,
+    ended REAL,
+    duration REAL,
+    exit_code INTEGER,
+    bytes INTEGER,
+    success INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_operations_target ON operations (op, target, started);
+CREATE INDEX IF NOT EXISTS idx_operations_package ON operations (package_id, started);
+CREATE INDEX IF NOT EXISTS idx_operations_started ON operations (started);
+"""
+
+
+class OperationHistory:
+    """Journal of install, update, uninstall and tweak operations in SQLite.
+
+    The database runs in WAL mode so the UI can read estimates while a worker
+    thread is writing. One connection is shared behind a lock.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_data_path(HISTORY_FILE)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._started = {}
+
+    def start(self, op, target, package_id=None):
+        """Record the start of an operation and return its id"""
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO operations (op, target, package_id, started) VALUES (?, ?, ?, ?)",
+                (op, target, package_id, time.time())
+            )
+            op_id = cursor.lastrowid
+            self._started[op_id] = time.monotonic()
+        return op_id
+
+    def finish(self, op_id, success, exit_code=None, bytes=None):
+        with self.lock:
+            started = self._started.pop(op_id, None)
+            duration = time.monotonic() - started if started is not None else None
+            self.conn.execute(
+                "UPDATE operations SET ended = ?, duration = ?, exit_code = ?, bytes = ?, success = ? WHERE id = ?",
+                (time.time(), duration, exit_code, bytes, int(bool(success)), op_id)
+            )
+        return duration
+
+    def safe_start(self, op, target, package_id=None):
+        """start() that logs instead of raising, so history never breaks an operation"""
+        try:
+            return self.start(op, target, package_id)
+        except Exception as e:
+            logger.warning(f"Failed to record {op} of {target}: {str(e)}")
+            return None
+
+    def safe_finish(self, op_id, success, exit_code=None, bytes=None):
+        if op_id is None:
+            return None
+        try:
+            return self.finish(op_id, success, exit_code, bytes)
+        except Exception as e:
+            logger.warning(f"Failed to record operation result: {str(e)}")
+            return None
+
+    def safe_set_success(self, op_id, success):
+        """Correct the outcome of a finished operation, e.g. after verification"""
+        if op_id is None:
+            return
+        try:
+            with self.lock:
+                self.conn.execute("UPDATE operations SET success = ? WHERE id = ?", (int(bool(success)), op_id))
+        except Exception as e:
+            logger.warning(f"Failed to update operation result: {str(e)}")
+
+    def average_duration(self, op, target=None):
+        """Mean duration of recent successful runs, or None without history"""
+        with self.lock:
+            if target is None:
+                row = self.conn.execute(
+                    "SELECT AVG(duration) FROM operations WHERE op = ? AND success = 1",
+                    (op,)
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    "SELECT AVG(duration) FROM (SELECT duration FROM operations "
+                    "WHERE op = ? AND target = ? AND success = 1 ORDER BY started DESC LIMIT ?)",
+                    (op, target, ESTIMATE_SAMPLES)
+                ).fetchone()
+        return row[0]
+
+    def estimate(self, op, targets):
+        """Estimated seconds to run `op` for every target.
+
+        Uses each target's own history, then the average across all targets
+        for that operation, then DEFAULT_DURATION.
+        """
+        fallback = None
+        total = 0.0
+        for target in targets:
+            duration = self.average_duration(op, target)
+            if duration is None:
+                if fallback is None:
+                    fallback = self.average_duration(op) or DEFAULT_DURATION
+                duration = fallback
+            total += duration
+        return total
+
+    def recent(self, limit=50, op=None, package_id=None):
+        """Most recent operations as dicts, newest first"""
+        query = "SELECT * FROM operations"
+        clauses, params = [], []
+        if op:
+            clauses.append("op = ?")
+            params.append(op)
+        if package_id:
+            clauses.append("package_id = ?")
+            params.append(package_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY started DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            cursor = self.conn.execute(query, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def open_history():
+    """Open the journal, falling back to an in-memory one if the file is unusable"""
+    try:
+        return OperationHistory()
+    except Exception as e:
+        logger.warning(f"Operation history unavailable, using a temporary one: {str(e)}")
+        return OperationHistory(':memory:')
+
+
+def format_duration(seconds):
+    """Short human readable duration, e.g. '1m 20s'"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m"
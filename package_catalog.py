@@ -0,0 +1,188 @@
+"""
+Typed package catalog.
+
+The catalog JSON is parsed once into CatalogEntry records with the winget
+ID already resolved and the search fields already lowercased, plus an index
+of entries by category and by winget ID. Filtering then does no per-package
+dictionary lookups or string lowering.
+
+    python -m package_catalog --entries 10000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+
+class CatalogEntry:
+    """One catalog package"""
+
+    __slots__ = ('name', 'category', 'description', 'link', 'winget_id', 'search_text')
+
+    def __init__(self, name, category='Uncategorized', description='', link='', winget_id=None):
+        self.name = name
+        # Every entry of a category shares one string
+        self.category = sys.intern(category)
+        self.description = description
+        self.link = link
+        self.winget_id = winget_id
+        # Fields joined by a newline, which a search term can't contain, so
+        # a match never spans name and description
+        self.search_text = f"{name.lower()}\n{description.lower()}"
+
+    @classmethod
+    def from_json(cls, name, data):
+        # The ID is usually top level, older entries keep it under 'dl'
+        winget_id = data.get('winget')
+        if not winget_id and isinstance(data.get('dl'), dict):
+            winget_id = data['dl'].get('winget')
+        return cls(name, data.get('category') or 'Uncategorized', data.get('description') or '',
+                   data.get('link') or '', winget_id or None)
+
+    def __repr__(self):
+        return f"CatalogEntry({self.name!r}, winget_id={self.winget_id!r})"
+
+
+class PackageCatalog(dict):
+    """Package name -> CatalogEntry, with category and winget ID indexes"""
+
+    def __init__(self, entries=()):
+        super().__init__()
+        self.categories = {}
+        self.by_id = {}
+        for entry in entries:
+            self[entry.name] = entry
+            self.categories.setdefault(entry.category, []).append(entry)
+            if entry.winget_id:
+                self.by_id.setdefault(entry.winget_id.lower(), entry)
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(CatalogEntry.from_json(name, package) for name, package in data.items())
+
+    def filter(self, term='', category=None):
+        """[(category, [entries])] whose name or description contains `term`.
+
+        Categories without a match are left out; `category` limits the
+        result to one category.
+        """
+        term = term.lower()
+        categories = self.categories.items() if category is None else [(category, self.categories.get(category, []))]
+        result = []
+        for name, entries in categories:
+            matches = [entry for entry in entries if term in entry.search_text] if term else list(entries)
+            if matches:
+                result.append((name, matches))
+        return result
+
+
+SAMPLE_WORDS = ['fast', 'secure', 'open', 'source', 'media', 'player', 'editor', 'browser', 'backup',
+                'sync', 'cloud', 'code', 'image', 'video', 'audio', 'network', 'disk', 'tool', 'manager']
+SYLLABLES = ['con', 'ter', 'ing', 'pro', 'tion', 're', 'in', 'de', 'com', 'per', 'ex', 'ment', 'al', 'er',
+             'sec', 'tor', 'ma', 'ni', 'ca', 'lo', 'vi', 'sion', 'net', 'work', 'ser', 'ver', 'dis', 'play',
+             'mo', 'bi', 'le', 'da', 'ta', 'base', 'edit', 'or', 'us', 'an', 'ly', 'sis', 'ge', 'ne', 'ra',
+             'im', 'age', 'sync', 'cloud', 'back', 'up', 'in', 'stall', 'ize', 'able', 'ful', 'ous', 'ive']
+
+
+def _sample_vocabulary(size, rng):
+    """`size` distinct made-up words with English-like letter combinations"""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _sample_catalog(count, seed=1, vocabulary=None):
+    """Synthetic catalog JSON; with `vocabulary`, descriptions draw from that many
+    made-up words, a few of them common and most rare, as in real text"""
+    rng = random.Random(seed)
+    words = SAMPLE_WORDS
+    weights = None
+    if vocabulary:
+        words = _sample_vocabulary(vocabulary, rng)
+        rng.shuffle(words)
+        weights = [1 / rank for rank in range(1, len(words) + 1)]
+    categories = ['Browsers', 'Communications', 'Development', 'Document', 'Games', 'Microsoft Tools',
+                  'Multimedia Tools', 'Pro Tools', 'Utilities']
+    data = {}
+    for i in range(count):
+        name = ' '.join(word.capitalize() for word in rng.choices(words, weights, k=2)) + f" {i}"
+        package = {
+            'category': rng.choice(categories),
+            'content': name,
+            'description': ' '.join(rng.choices(words, weights, k=12)).capitalize() + '.',
+            'link': f"https://example.com/{i}",
+            'choco': f"package{i}"
+        }
+        if i % 4:
+            package['winget'] = f"Vendor{i % 97}.Package{i}"
+        else:
+            package['dl'] = {'winget': f"Vendor{i % 97}.Package{i}"}
+        data[f"Package {i}"] = package
+    return data
+
+
+def _raw_filter(data, categories, term):
+    """The per-keystroke filter before the typed catalog, for comparison"""
+    result = []
+    for category, names in categories.items():
+        matches = [name for name in names
+                   if term in name.lower() or term in data[name].get('description', '').lower()]
+        if matches:
+            result.append((category, matches))
+    return result
+
+
+def _measure(build):
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def benchmark(count, terms=('b', 'br', 'bro', 'brow', 'browser', 'sync cloud', 'zzz')):
+    text = json.dumps(_sample_catalog(count))
+
+    raw, raw_bytes = _measure(lambda: json.loads(text))
+    raw_categories = {}
+    for name, package in raw.items():
+        raw_categories.setdefault(package.get('category', 'Uncategorized'), []).append(name)
+
+    catalog, catalog_bytes = _measure(lambda: PackageCatalog.from_json(json.loads(text)))
+    start = time.perf_counter()
+    PackageCatalog.from_json(json.loads(text))
+    parse_time = time.perf_counter() - start
+
+    def per_filter(run):
+        start = time.perf_counter()
+        for term in terms:
+            run(term)
+        return (time.perf_counter() - start) / len(terms)
+
+    raw_time = per_filter(lambda term: _raw_filter(raw, raw_categories, term))
+    typed_time = per_filter(catalog.filter)
+    return {
+        'entries': count,
+        'raw_filter_ms': round(raw_time * 1000, 2),
+        'typed_filter_ms': round(typed_time * 1000, 2),
+        'filter_speedup': round(raw_time / typed_time, 2),
+        'raw_bytes': raw_bytes,
+        'typed_bytes': catalog_bytes,
+        'load_ms': round(parse_time * 1000, 1)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='package_catalog', description='Benchmark catalog filtering on a synthetic catalog')
+    parser.add_argument('--entries', type=int, default=10000)
+    args = parser.parse_args(argv)
+    print(json.dumps(benchmark(args.entries)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,96 +1,180 @@
 import subprocess
-import requests
 import json
 import threading
-import queue
 import logging
 import os
 import time
-
-# Configure logging
-if not os.path.exists('logs'):
-    os.makedirs('logs')
+import shutil
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from app_paths import get_data_path
+from operation_history import open_history
+from install_scheduler import InstallScheduler
+from command_runner import run_command
+from elevation_broker import ElevationBroker
+from installer_manifest import ELEVATION_REQUIRED, read_cached_installer
+from winget_progress import WingetProgressParser, ProgressThrottle
+from winget_updates import UpdateInfo, parse_installed, parse_updates
+import software_inventory
+from package_catalog import PackageCatalog
+from package_search import SearchIndex
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-
-# Create file handler
-log_file = os.path.join('logs', 'mtech_wintool.log')
-file_handler = logging.FileHandler(log_file)
-file_handler.setLevel(logging.INFO)
 
-# Create console handler
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
+# Command used to run winget; the install pipeline benchmark swaps in a fake
+WINGET = ['winget']
+DOWNLOAD_DIR = 'downloads'
+DOWNLOAD_WORKERS = 3
+# Hides the console window of child processes; 0 where there are none
+NO_WINDOW = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+# Watchdog limits in seconds. Queries are retried once; installs are never
+# retried, but one silent for INSTALL_IDLE_TIMEOUT is treated as hung
+QUERY_TIMEOUT = 180
+QUERY_RETRIES = 1
+DOWNLOAD_TIMEOUT = 1800
+INSTALL_TIMEOUT = 3600
+INSTALL_IDLE_TIMEOUT = 900
+# Upgrades of an Update All batch queued at once; the rest are queued as
+# these finish so installs started meanwhile don't wait for the whole batch
+UPGRADE_BATCH_LIMIT = 2
+
+# winget results that still leave the package installed
+WINGET_INSTALLED_CODES = {
+    0x8A150061,  # APPINSTALLER_CLI_ERROR_PACKAGE_ALREADY_INSTALLED
+    0x8A150109,  # APPINSTALLER_CLI_ERROR_INSTALL_REBOOT_REQUIRED_TO_FINISH
+}
+WINGET_INSTALLED_MARKERS = (
+    'successfully installed',
+    'found an existing package already installed',
+    'restart your pc to finish installation'
+)
+
+CATALOG_URL = "https://raw.githubusercontent.com/ChrisTitusTech/winutil/refs/heads/main/config/applications.json"
+CATALOG_CACHE_FILE = 'applications_cache.json'
+STATUS_SNAPSHOT_FILE = 'package_status.json'
+
+def install_succeeded(returncode, output):
+    """Decide from winget's exit code and output whether an install worked"""
+    if returncode == 0:
+        return True
+    # Windows reports HRESULTs unsigned, other callers may pass them signed
+    if returncode is not None and returncode & 0xFFFFFFFF in WINGET_INSTALLED_CODES:
+        return True
+    output = (output or '').lower()
+    return any(marker in output for marker in WINGET_INSTALLED_MARKERS)
 
-# Create formatter
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-console_handler.setFormatter(formatter)
-
-# Add handlers to logger if they haven't been added already
-if not logger.handlers:
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
 
 class PackageOperations:
     def __init__(self):
-        self.packages_data = {}
-        self.categories = {}
+        self.packages_data = PackageCatalog()
+        self.search_index = SearchIndex(self.packages_data)
         self.installation_status = {}
         self.update_status_dict = {}
+        # UpdateInfo for each catalog package with an update available
+        self.available_updates = {}
+        # Name/ID index of the catalog for matching the registry inventory
+        self.catalog_index = None
+        self.status_stale = False
+        self.status_snapshot_time = None
         self.status_queue = None
-        self.install_queue = queue.Queue()
-        self.install_thread = None
-        self.installing = False
+        self.scheduler = InstallScheduler(self._run_job, on_idle=self.verify_installs)
+        self.pending_verification = {}
+        self.download_pool = None
+        self.elevation = ElevationBroker()
+        self.install_stats = {'succeeded': 0, 'failed': 0, 'duration_sum': 0.0}
+        self.history = open_history()
         # Create startupinfo to hide windows
-        self.startupinfo = subprocess.STARTUPINFO()
-        self.startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        self.startupinfo.wShowWindow = subprocess.SW_HIDE
-
-    def load_packages_async(self, callback=None, status_queue=None):
+        self.startupinfo = None
+        if os.name == 'nt':
+            self.startupinfo = subprocess.STARTUPINFO()
+            self.startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            self.startupinfo.wShowWindow = subprocess.SW_HIDE
+
+    def load_packages_async(self, callback=None, status_queue=None, prewarm=None):
+        """Load the catalog and installed/update status.
+
+        When a Prewarm is passed, its already-running catalog fetch and winget
+        queries are consumed instead of starting them again.
+        """
         try:
             self.status_queue = status_queue
             if callback:
                 callback("Loading package data...", show_progress=True)
-            response = requests.get("https://raw.githubusercontent.com/ChrisTitusTech/winutil/refs/heads/main/config/applications.json")
-            self.packages_data = response.json()
+            if prewarm:
+                catalog = PackageCatalog.from_json(prewarm.catalog.result())
+            else:
+                catalog = PackageCatalog.from_json(self.fetch_catalog())
+            # The UI starts filtering as soon as the catalog is set, so the
+            # index has to be ready first
+            self.search_index = SearchIndex(catalog)
+            self.packages_data = catalog
+            
+            # Show the last known status straight away while winget is queried
+            incremental = bool(self.installation_status) or self.load_status_snapshot()
             
-            # Create categories dictionary
-            for name, data in self.packages_data.items():
-                category = data.get('category', 'Uncategorized')
-                if category not in self.categories:
-                    self.categories[category] = []
-                self.categories[category].append(name)
+            self.catalog_index = software_inventory.CatalogIndex(
+                {name: entry.winget_id for name, entry in self.packages_data.items()})
+            
+            # The registry inventory gives installed status in milliseconds;
+            # winget reconciles it below and overrides it. A package it
+            # misses keeps its last known status until then
+            native = self.read_native_inventory()
+            if native is not None:
+                for package_name in native:
+                    self.installation_status[package_name] = True
+                incremental = True
+            if incremental and self.status_queue:
+                self.status_queue.put(("populate_initial", None))
             
             # Get installed software and updates using winget
             if callback:
                 callback("Checking installed packages and updates...", show_progress=True)
-            installed_software = self.get_winget_installed_software()
-            needs_update = self.get_winget_updates()
+            if prewarm:
+                installed_software = prewarm.installed.result()
+                needs_update = prewarm.updates.result()
+            else:
+                installed_software = self.get_winget_installed_software()
+                needs_update = self.get_winget_updates()
             
-            # Check installation and update status
+            # Check installation and update status; when rows are already shown
+            # only the packages whose status changed are sent to the UI
+            changed = 0
             batch_size = 20
             packages = list(self.packages_data.keys())
             for i in range(0, len(packages), batch_size):
                 batch = packages[i:i + batch_size]
                 for package_name in batch:
-                    is_installed = self.check_software_installed(package_name, installed_software)
-                    needs_updating = self.check_needs_update(package_name, needs_update) if is_installed else False
+                    is_installed = self.resolve_installed(package_name, installed_software, native)
+                    update = self.check_needs_update(package_name, needs_update) if is_installed else None
+                    needs_updating = update is not None
+                    # A newer available version also changes the row
+                    previous = (self.installation_status.get(package_name, False),
+                                self.update_status_dict.get(package_name, False),
+                                self.available_updates.get(package_name))
                     self.installation_status[package_name] = is_installed
                     self.update_status_dict[package_name] = needs_updating
+                    if update:
+                        self.available_updates[package_name] = update
+                    else:
+                        self.available_updates.pop(package_name, None)
                     
-                    # Send update for each package through the status queue
-                    if self.status_queue:
-                        self.status_queue.put(("update_package", (package_name, is_installed, needs_updating)))
+                    if incremental and previous != (is_installed, needs_updating, update):
+                        changed += 1
+                        if self.status_queue:
+                            self.status_queue.put(("update_package", (package_name, is_installed, needs_updating)))
                     
                 if callback:
                     progress = min(100, int((i + batch_size) / len(packages) * 100))
                     callback(f"Checking installed packages... {progress}%")
             
+            self.status_stale = False
+            self.save_status_snapshot()
+            if incremental:
+                logger.info(f"Package status reconciled, {changed} of {len(packages)} changed")
+            
             # Signal to populate the list after all updates
             if self.status_queue:
-                self.status_queue.put(("populate_initial", None))
+                self.status_queue.put(("status_reconciled", changed) if incremental else ("populate_initial", None))
             
             if callback:
                 callback("Ready")
@@ -100,150 +184,371 @@ class PackageOperations:
             if callback:
                 callback(f"Failed to load packages: {str(e)}")
 
+    def load_status_snapshot(self):
+        """Load the last saved installed/update status and mark it stale.
+
+        Returns True if a snapshot was found.
+        """
+        path = get_data_path(STATUS_SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            updates = set(snapshot['updates'])
+            for package_name in snapshot['installed']:
+                self.installation_status[package_name] = True
+                self.update_status_dict[package_name] = package_name in updates
+            self.available_updates = {package_name: UpdateInfo(*fields)
+                                      for package_name, fields in snapshot.get('versions', {}).items()}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable package status snapshot: {str(e)}")
+            return False
+        self.status_stale = True
+        self.status_snapshot_time = snapshot.get('saved')
+        return True
+
+    def save_status_snapshot(self):
+        """Persist installed/update status; only installed packages are stored"""
+        installed = [name for name, is_installed in self.installation_status.items() if is_installed]
+        snapshot = {
+            'saved': time.time(),
+            'installed': installed,
+            'updates': [name for name in installed if self.update_status_dict.get(name)],
+            'versions': {name: list(update) for name, update in self.available_updates.items()}
+        }
+        try:
+            with open(get_data_path(STATUS_SNAPSHOT_FILE), 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            self.status_snapshot_time = snapshot['saved']
+        except Exception as e:
+            logger.warning(f"Failed to write package status snapshot: {str(e)}")
+
+    def fetch_catalog(self):
+        """Fetch the package catalog, revalidating a local copy with its ETag.
+
+        Falls back to the cached copy when the network is unavailable.
+        """
+        cache_path = get_data_path(CATALOG_CACHE_FILE)
+        cached = None
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable catalog cache: {str(e)}")
+
+        try:
+            # requests is slow to import, so load it only when the catalog is fetched
+            import requests
+            headers = {}
+            if cached and cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            response = requests.get(CATALOG_URL, headers=headers, timeout=15)
+            if response.status_code == 304 and cached:
+                logger.info("Package catalog unchanged, using cached copy")
+                return cached['data']
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            if cached:
+                logger.warning(f"Failed to fetch package catalog, using cached copy: {str(e)}")
+                return cached['data']
+            raise
+
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'etag': response.headers.get('ETag'), 'data': data}, f, separators=(',', ':'))
+        except Exception as e:
+            logger.warning(f"Failed to write catalog cache: {str(e)}")
+        return data
+
+    def get_winget_version(self):
+        """Return the winget version string, or None if winget is not installed"""
+        try:
+            process = run_command(
+                [*WINGET, '--version'],
+                timeout=QUERY_TIMEOUT,
+                retries=QUERY_RETRIES,
+                startupinfo=self.startupinfo
+            )
+            return process.stdout.strip() or 'unknown'
+        except FileNotFoundError:
+            return None
+        except subprocess.TimeoutExpired as e:
+            # winget exists but did not answer; don't offer to install it
+            logger.warning(f"winget --version did not finish: {str(e)}")
+            return 'unknown'
+
     def get_winget_installed_software(self):
+        """Installed packages from one `winget list` call as an InstalledList, or None if it failed"""
         try:
-            process = subprocess.run(
-                ['winget', 'list'],
-                capture_output=True,
-                text=True,
+            process = run_command(
+                [*WINGET, 'list'],
+                timeout=QUERY_TIMEOUT,
+                retries=QUERY_RETRIES,
                 startupinfo=self.startupinfo
             )
-            return process.stdout.lower()
+            if process.returncode != 0:
+                logger.error(f"winget list failed with exit code {process.returncode}")
+                return None
+            return parse_installed(process.stdout)
         except Exception as e:
             logger.error(f"Failed to get installed software list: {str(e)}", exc_info=True)
-            return ""
+            return None
 
     def get_winget_updates(self):
+        """Available upgrades from one `winget upgrade` call as {lowercase ID: UpdateInfo}"""
         try:
-            process = subprocess.run(
-                ['winget', 'upgrade'],
-                capture_output=True,
-                text=True,
+            process = run_command(
+                [*WINGET, 'upgrade'],
+                timeout=QUERY_TIMEOUT,
+                retries=QUERY_RETRIES,
                 startupinfo=self.startupinfo
             )
-            
-            # Convert output to lowercase for case-insensitive comparison
-            output = process.stdout.lower()
-            
-            # Create a set of package IDs that need updates
-            updates = set()
-            
-            # Process each line
-            for line in output.split('\n'):
-                if line.strip() and not line.startswith('name') and not line.startswith('-'):
-                    # Split the line into parts and get the ID (usually second column)
-                    parts = [p.strip() for p in line.split() if p.strip()]
-                    if len(parts) >= 2:
-                        updates.add(parts[0])  # Add name to updates set
-                        if len(parts) >= 2:
-                            updates.add(parts[1])  # Add ID to updates set
-            
-            return updates
+            return parse_updates(process.stdout)
         except Exception as e:
             logger.error(f"Failed to get winget updates: {str(e)}", exc_info=True)
-            return set()
+            return {}
 
-    def check_software_installed(self, package_name, installed_software=""):
-        if package_name not in self.packages_data:
-            logger.warning(f"Package {package_name} not found in packages data")
-            return False
-            
+    def read_native_inventory(self):
+        """Catalog packages found in the registry, as {package name: InstalledApp}.
+
+        Returns None where the registry cannot be read (e.g. not on Windows).
+        """
+        start = time.perf_counter()
         try:
-            package_data = self.packages_data[package_name]
-            
-            # Check winget ID first
-            winget_id = package_data.get('winget')
-            if not winget_id and isinstance(package_data.get('dl'), dict):
-                winget_id = package_data['dl'].get('winget')
-                
-            # If we have a winget ID, check if it's in the cached list
-            if winget_id and winget_id.lower() in installed_software:
-                return True
-                
-            # If no winget ID or not found, check package name
-            if package_name.lower() in installed_software:
-                return True
-                
-            return False
-            
+            apps = software_inventory.scan()
         except Exception as e:
-            logger.error(f"Error checking software status for {package_name}: {str(e)}", exc_info=True)
-            return False
+            logger.warning(f"Registry inventory unavailable: {str(e)}")
+            return None
+        matched = self.catalog_index.match_all(apps) if self.catalog_index else {}
+        logger.info(f"Registry inventory: {len(apps)} programs, {len(matched)} in catalog, "
+                    f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        return matched
+
+    def check_software_installed(self, package_name, installed_software):
+        """Whether `winget list` (an InstalledList) shows the package.
 
-    def check_needs_update(self, package_name, update_list):
-        if not package_name in self.packages_data:
+        Matched by exact winget ID; by exact name only for packages without one.
+        """
+        if package_name not in self.packages_data:
             logger.warning(f"Package {package_name} not found in packages data")
             return False
-            
-        try:
-            package_data = self.packages_data[package_name]
-            
-            # Get the correct package ID
-            package_id = None
-            if isinstance(package_data.get('dl'), dict) and 'winget' in package_data['dl']:
-                package_id = package_data['dl']['winget']
-            elif 'winget' in package_data:
-                package_id = package_data['winget']
-
-            if package_id and package_id.lower() in update_list:
-                return True
-                
-            return False
-        except Exception as e:
-            logger.error(f"Error checking update status for {package_name}: {str(e)}", exc_info=True)
+        if installed_software is None:
             return False
+        winget_id = self.packages_data[package_name].winget_id
+        if winget_id:
+            return installed_software.has_id(winget_id)
+        return installed_software.has_name(package_name)
+
+    def resolve_installed(self, package_name, installed_software, native):
+        """Installed status from `winget list` output and the registry inventory.
+
+        winget wins when it answered, since a registry match by name can be
+        wrong; the registry only decides for packages without a winget ID,
+        or for all of them when `winget list` failed. With neither, the
+        last known status stays.
+        """
+        if installed_software is not None:
+            if self.check_software_installed(package_name, installed_software):
+                return True
+            return bool(native) and not self.get_package_id(package_name) and package_name in native
+        if native is not None:
+            return package_name in native
+        return self.installation_status.get(package_name, False)
 
-    def process_install_queue(self):
-        """Process the installation queue sequentially"""
-        while True:
+    def check_needs_update(self, package_name, updates):
+        """The package's UpdateInfo from get_winget_updates(), or None if it is up to date"""
+        if package_name not in self.packages_data:
+            logger.warning(f"Package {package_name} not found in packages data")
+            return None
+        package_id = self.get_package_id(package_name)
+        return updates.get(package_id.lower()) if package_id else None
+
+    def get_metrics(self):
+        """Internal metrics as (name, type, help, value) tuples for the exporter"""
+        stats = self.install_stats
+        return self.scheduler.get_metrics() + [
+            ('wintool_installs_succeeded', 'counter', 'Completed package installs', stats['succeeded']),
+            ('wintool_installs_failed', 'counter', 'Failed package installs', stats['failed']),
+            ('wintool_install_duration_seconds', 'summary', 'Time spent installing packages',
+             {'count': stats['succeeded'] + stats['failed'], 'sum': stats['duration_sum']})
+        ]
+
+    def _run_job(self, package_name, callback, job):
+        if job.op == 'upgrade':
+            self.update_package(package_name, callback, job)
+        else:
+            self._install_package(package_name, callback, job)
+
+    def install_package(self, package_name, callback=None, priority=0):
+        """Queue a package for installation and return its InstallJob"""
+        return self.scheduler.submit(package_name, callback, priority)
+
+    def install_packages(self, package_names, callback=None, on_done=None):
+        """Queue a batch using the download-ahead pipeline.
+
+        Installers are fetched in parallel with `winget download` while the
+        scheduler runs them one at a time in order, so download time
+        overlaps with the previous package's install. `on_done(job)` is
+        called as each one finishes or is cancelled; job.result tells whether
+        it installed.
+        """
+        if self.download_pool is None:
+            self.download_pool = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix='download')
+        jobs = []
+        for package_name in package_names:
+            download = self.download_pool.submit(self.download_package, package_name)
+            jobs.append(self.scheduler.submit(package_name, callback, download=download, on_done=on_done))
+        return jobs
+
+    def upgrade_packages(self, package_names, callback=None, on_complete=None, limit=UPGRADE_BATCH_LIMIT):
+        """Queue upgrades on the install scheduler and report a summary.
+
+        Upgrades run one at a time like installs, since Windows Installer
+        only allows one install at once. At most `limit` of the batch are
+        queued at a time. Once every package has finished or been cancelled,
+        `on_complete(results)` gets one dict per package with its result and
+        the installed and available versions from the last update check.
+        """
+        pending = list(package_names)
+        results = {}
+        lock = threading.Lock()
+        # A successful upgrade drops its entry, so keep the versions for the summary
+        updates = {name: self.available_updates.get(name) for name in package_names}
+
+        def record(package_name, result):
+            update = updates[package_name]
+            results[package_name] = {
+                'package': package_name,
+                'result': result,
+                'from_version': update.installed if update else None,
+                'to_version': update.available if update else None
+            }
+
+        def submit_next():
+            """Queue the next package; False if the scheduler is shut down"""
+            package_name = pending.pop(0)
             try:
-                if not self.install_queue.empty():
-                    package_name, callback = self.install_queue.get()
-                    self.installing = True
-                    self._install_package(package_name, callback)
-                    self.install_queue.task_done()
-                else:
-                    self.installing = False
-                    time.sleep(0.1)  # Prevent CPU thrashing
-            except Exception as e:
-                logger.error(f"Error in install queue processor: {str(e)}", exc_info=True)
-                self.installing = False
-                time.sleep(1)  # Wait before retrying
-
-    def install_package(self, package_name, callback=None):
-        """Queue a package for installation"""
-        if not self.install_thread or not self.install_thread.is_alive():
-            self.install_thread = threading.Thread(target=self.process_install_queue, daemon=True)
-            self.install_thread.start()
-            
-        self.install_queue.put((package_name, callback))
-
-    def _verify_package_installed(self, package_id):
-        """Verify if a package is actually installed by checking winget list"""
+                self.scheduler.submit(package_name, callback, op='upgrade', on_done=finished)
+                return True
+            except RuntimeError:
+                record(package_name, 'cancelled')
+                return False
+
+        def finished(job=None):
+            with lock:
+                if job:
+                    if job.cancelled:
+                        record(job.package_name, 'cancelled')
+                    else:
+                        record(job.package_name, 'updated' if job.result else 'failed')
+                    while pending and not submit_next():
+                        pass
+                complete = len(results) == len(package_names)
+            if complete:
+                summary = [results[name] for name in package_names]
+                logger.info("Upgrade batch finished: " + ", ".join(f"{r['package']} {r['result']}" for r in summary))
+                if on_complete:
+                    on_complete(summary)
+
+        with lock:
+            queued = 0
+            while pending and queued < limit:
+                queued += submit_next()
+        # Covers an empty batch and one the scheduler refused outright
+        if not queued:
+            finished()
+
+    def get_package_id(self, package_name):
+        entry = self.packages_data.get(package_name)
+        return entry.winget_id if entry else None
+
+    def download_package(self, package_name):
+        """Download a package's installer and manifest into the cache.
+
+        Returns the download directory, or None if the download failed (the
+        install then falls back to a regular online install).
+        """
+        package_id = self.get_package_id(package_name)
+        if not package_id:
+            return None
+        download_dir = os.path.join(get_data_path(DOWNLOAD_DIR), package_id)
+        op_id = self.history.safe_start('download', package_name, package_id)
+        exit_code = None
         try:
-            process = subprocess.run(
-                ['winget', 'list', '--id', package_id],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
+            process = run_command(
+                [*WINGET, 'download', '--id', package_id, '-e', '-d', download_dir,
+                 '--accept-source-agreements', '--accept-package-agreements'],
+                timeout=DOWNLOAD_TIMEOUT,
+                idle_timeout=INSTALL_IDLE_TIMEOUT,
+                creationflags=NO_WINDOW
             )
-            return package_id.lower() in process.stdout.lower()
+            exit_code = process.returncode
+            if exit_code != 0:
+                logger.warning(f"Download of {package_name} failed with exit code {exit_code}")
+                return None
+            return download_dir
         except Exception as e:
-            logger.error(f"Error verifying package installation: {str(e)}")
-            return False
-
-    def _install_package(self, package_name, callback=None):
-        """Internal method to actually install a package"""
+            logger.error(f"Error downloading {package_name}: {str(e)}")
+            return None
+        finally:
+            size = None
+            if exit_code == 0:
+                size = sum(os.path.getsize(os.path.join(root, f))
+                           for root, _, files in os.walk(download_dir) for f in files)
+            self.history.safe_finish(op_id, exit_code == 0, exit_code, size)
+
+    def _wait_for_download(self, package_name, callback, job):
+        """Block until the job's download finishes; None if it failed or was cancelled"""
+        if callback and not job.download.done():
+            callback(f"Waiting for download of {package_name}...")
+        while not job.cancelled:
+            try:
+                return job.download.result(timeout=0.5)
+            except TimeoutError:
+                continue
+            except Exception:
+                return None
+        return None
+
+    def cancel_install(self, package_name):
+        """Cancel a queued or running install. Returns False if there was none"""
+        job = self.scheduler.find(package_name)
+        return bool(job) and self.scheduler.cancel(job.id)
+
+    def run_elevated(self, op, package_id, job=None, on_output=None):
+        """Run a winget operation through the session's elevation broker.
+
+        The first call shows the UAC prompt; later ones reuse the helper.
+        Returns None if elevation is unavailable or was declined.
+        """
+        process = self.elevation.run(op, package_id, job, on_output,
+                                     timeout=INSTALL_TIMEOUT, idle_timeout=INSTALL_IDLE_TIMEOUT)
+        if process is not None:
+            logger.info(f"Elevated {op} of {package_id} exited with {process.returncode}\n{process.stdout}")
+        return process
+
+    def shutdown(self):
+        self.elevation.close()
+        self.scheduler.shutdown()
+        if self.download_pool:
+            self.download_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _install_package(self, package_name, callback=None, job=None):
+        """Internal method to actually install a package.
+
+        When run by the scheduler, `job` carries the cancellation state and
+        the running winget process is attached to it so it can be killed.
+        """
         if package_name not in self.packages_data:
             logger.warning(f"Package {package_name} not found in packages data")
             if callback:
                 callback(f"Package {package_name} not found")
             return
 
-        package_data = self.packages_data[package_name]
-        package_id = package_data.get('winget')
-        if not package_id and isinstance(package_data.get('dl'), dict):
-            package_id = package_data['dl'].get('winget')
+        package_id = self.packages_data[package_name].winget_id
 
         if not package_id:
             logger.warning(f"No winget ID found for package {package_name}")
@@ -251,6 +556,18 @@ class PackageOperations:
                 callback(f"No winget ID found for {package_name}")
             return
 
+        download_dir = None
+        if job and job.download:
+            download_dir = self._wait_for_download(package_name, callback, job)
+            if job.cancelled:
+                if download_dir:
+                    shutil.rmtree(download_dir, ignore_errors=True)
+                return
+
+        started = time.monotonic()
+        succeeded = False
+        exit_code = None
+        op_id = self.history.safe_start('install', package_name, package_id)
         try:
             if callback:
                 callback(f"Installing {package_name}...")
@@ -259,7 +576,7 @@ class PackageOperations:
 
             # First try non-elevated install
             cmd = [
-                'winget',
+                *WINGET,
                 'install',
                 '--id', package_id,
                 '-e',
@@ -267,55 +584,50 @@ class PackageOperations:
                 '--accept-package-agreements'
             ]
 
-            logger.info(f"Attempting non-elevated install for {package_name}")
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-
-            # If non-elevated fails, try elevated install
-            if process.returncode != 0:
-                logger.info(f"Non-elevated install failed for {package_name}, attempting elevated install")
-                
-                # Create elevated PowerShell command with proper argument handling
-                ps_cmd = [
-                    'powershell.exe',
-                    '-NoProfile',
-                    '-ExecutionPolicy', 'Bypass',
-                    '-Command',
-                    f'$process = Start-Process -FilePath winget -ArgumentList "install", "{package_id}" -Verb RunAs -Wait -PassThru; exit $process.ExitCode'
-                ]
-
-                logger.info(f"Running elevated install for {package_name}")
-                process = subprocess.run(
-                    ps_cmd,
-                    capture_output=True,
-                    text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-
-            # Check if installation was successful
-            verify_cmd = ['winget', 'list', '--id', package_id]
-            verify_process = subprocess.run(
-                verify_cmd,
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
+            on_output, progress = self._progress_reporter(package_name)
+            # winget would download a manifest's installer again, so a cached
+            # one is run directly; its result is final
+            installer = read_cached_installer(download_dir)
+            process = self._run_cached_installer(package_name, installer, job) if installer else None
+            if process is None:
+                installer = None
+                logger.info(f"Attempting non-elevated install for {package_name}")
+                process = run_command(cmd, timeout=INSTALL_TIMEOUT, idle_timeout=INSTALL_IDLE_TIMEOUT,
+                                      job=job, on_output=on_output, creationflags=NO_WINDOW)
+
+                # If non-elevated fails, try elevated install
+                if process.returncode != 0 and not (job and job.cancelled):
+                    logger.info(f"Non-elevated install failed for {package_name}, attempting elevated install")
+
+                    logger.info(f"Running elevated install for {package_name}")
+                    elevated = self.run_elevated('install', package_id, job, on_output)
+                    if elevated:
+                        process = elevated
+            progress.flush()
+            exit_code = process.returncode
+
+            if job and job.cancelled:
+                logger.info(f"Installation of {package_name} was cancelled")
+                if callback:
+                    callback(f"Cancelled installation of {package_name}")
+                return
 
-            if package_id.lower() in verify_process.stdout.lower():
+            # Judge the result from the exit code and output; the whole batch
+            # is confirmed with one inventory pass once the queue drains
+            if installer:
+                succeeded = installer.succeeded(process.returncode)
+            else:
+                succeeded = install_succeeded(process.returncode, process.stdout)
+            self.pending_verification[package_name] = (succeeded, callback, op_id)
+            if succeeded:
                 logger.info(f"Successfully installed {package_name}")
                 self.installation_status[package_name] = True
                 self.update_status_dict[package_name] = False
-                if self.status_queue:
-                    self.status_queue.put(("update_package", (package_name, True, False)))
                 if callback:
                     callback(f"Successfully installed {package_name}")
             else:
-                error_msg = process.stderr if process.stderr else "Unknown error"
-                logger.error(f"Failed to install {package_name}: {error_msg}")
+                error_msg = process.stderr or process.stdout or "Unknown error"
+                logger.error(f"Failed to install {package_name} (exit code {process.returncode}): {error_msg}")
                 if callback:
                     callback(f"Failed to install {package_name}")
 
@@ -323,36 +635,129 @@ class PackageOperations:
             logger.error(f"Error installing {package_name}: {str(e)}", exc_info=True)
             if callback:
                 callback(f"Error installing {package_name}: {str(e)}")
+        finally:
+            if job:
+                job.result = succeeded
+            self._publish_status(package_name)
+            self.install_stats['succeeded' if succeeded else 'failed'] += 1
+            self.install_stats['duration_sum'] += time.monotonic() - started
+            self.history.safe_finish(op_id, succeeded, exit_code)
+            if download_dir:
+                shutil.rmtree(download_dir, ignore_errors=True)
+
+    def verify_installs(self):
+        """Confirm every install since the last check with one inventory pass.
+
+        The registry inventory is read first and can confirm a successful
+        install; `winget list` only runs if it could not confirm every
+        package. A failed install is only overturned by winget, since a
+        registry match by name can be wrong.
+        """
+        pending, self.pending_verification = self.pending_verification, {}
+        if not pending:
+            return
+        native = self.read_native_inventory() or {}
+        installed_software = None
+        if not all(succeeded and package_name in native for package_name, (succeeded, _, _) in pending.items()):
+            installed_software = self.get_winget_installed_software()
+            if installed_software is None:
+                logger.warning("Could not read installed packages, keeping install results from exit codes")
+                return
+
+        for package_name, (succeeded, callback, op_id) in pending.items():
+            confirmed = ((succeeded and package_name in native)
+                         or self.check_software_installed(package_name, installed_software))
+            if confirmed == succeeded:
+                continue
+            logger.warning(f"Verification of {package_name} disagrees with its exit code (installed: {confirmed})")
+            self.installation_status[package_name] = confirmed
+            self.update_status_dict[package_name] = False
+            self.history.safe_set_success(op_id, confirmed)
+            if self.status_queue:
+                self.status_queue.put(("update_package", (package_name, confirmed, False)))
+            if callback:
+                callback(f"Verified {package_name} is installed" if confirmed else f"Could not verify installation of {package_name}")
+        logger.info(f"Verified {len(pending)} install(s) with one inventory pass")
+
+    def _publish_status(self, package_name):
+        """Send a package's status to the UI after an operation, whatever its outcome.
+
+        This also replaces the progress text left in the package's row.
+        """
+        if self.status_queue:
+            self.status_queue.put(("update_package", (package_name,
+                                                      self.installation_status.get(package_name, False),
+                                                      self.update_status_dict.get(package_name, False))))
+
+    def _progress_reporter(self, package_name):
+        """Output handler that turns winget output into throttled progress events.
+
+        Returns (on_output, throttle); call throttle.flush() when the command ends.
+        """
+        parser = WingetProgressParser()
+
+        def emit(event):
+            if self.status_queue:
+                self.status_queue.put(("install_progress", (package_name, event)))
+        throttle = ProgressThrottle(emit)
+
+        def on_output(text):
+            for event in parser.feed(text):
+                throttle(event)
+        return on_output, throttle
+
+    def _run_cached_installer(self, package_name, installer, job=None):
+        """Run a downloaded installer silently.
+
+        Returns None if it could not be started or has to be started
+        elevated, so the package goes through winget instead.
+        """
+        logger.info(f"Running cached {installer.installer_type} installer for {package_name}: {installer.command}")
+        try:
+            # Silent installers print nothing, so only the overall timeout applies
+            process = run_command(installer.command, timeout=INSTALL_TIMEOUT, job=job, creationflags=NO_WINDOW)
+        except OSError as e:
+            logger.info(f"Could not start the cached installer for {package_name}, installing with winget: {str(e)}")
+            return None
+        if process.returncode == ELEVATION_REQUIRED:
+            logger.info(f"Cached installer for {package_name} needs elevation, installing with winget")
+            return None
+        logger.info(f"Cached installer for {package_name} exited with {process.returncode}")
+        return process
 
     def uninstall_package(self, package_name, callback=None):
+        """Uninstall a package. Returns True if winget removed it"""
         if package_name not in self.packages_data:
             logger.warning(f"Package {package_name} not found in packages data")
             if callback:
                 callback(f"Package {package_name} not found")
-            return
+            return False
 
-        package_data = self.packages_data[package_name]
-        package_id = package_data.get('winget')
-        if not package_id and isinstance(package_data.get('dl'), dict):
-            package_id = package_data['dl'].get('winget')
+        package_id = self.packages_data[package_name].winget_id
 
         if not package_id:
             logger.warning(f"No winget ID found for package {package_name}")
             if callback:
                 callback(f"No winget ID found for {package_name}")
-            return
+            return False
 
+        op_id = self.history.safe_start('uninstall', package_name, package_id)
+        exit_code = None
         try:
             if callback:
                 #callback(f"Uninstalling {package_name}...")
                 callback(f" Uninstalling {package_name}...", show_progress=True)
             
-            process = subprocess.run(
-                ['winget', 'uninstall', '--id', package_id, '-e', '--accept-source-agreements'],
-                capture_output=True,
-                text=True,
+            process = run_command(
+                [*WINGET, 'uninstall', '--id', package_id, '-e', '--accept-source-agreements'],
+                timeout=INSTALL_TIMEOUT,
+                idle_timeout=INSTALL_IDLE_TIMEOUT,
                 startupinfo=self.startupinfo
             )
+            if process.returncode != 0:
+                logger.info(f"Uninstall of {package_name} failed, retrying elevated")
+                process = self.run_elevated('uninstall', package_id) or process
+            exit_code = process.returncode
             
             if process.returncode == 0:
                 # Update status to Not Installed
@@ -365,24 +770,24 @@ class PackageOperations:
                     callback(f"Successfully uninstalled {package_name}")
             else:
                 if callback:
-                    logger.error(f"Failed to uninstall {package_name}", 
-                                            f"Error: {process.stderr}\nOutput: {process.stdout}")
+                    logger.error(f"Failed to uninstall {package_name}\nError: {process.stderr}\nOutput: {process.stdout}")
                     callback(f"Failed to uninstall {package_name}")
 
         except Exception as e:
             logger.error(f"Error uninstalling {package_name}: {str(e)}", exc_info=True)
             if callback:
-                logger.error(f"Error uninstalling {package_name}", 
-                        f"{str(e)}")
                 callback(f"Failed to uninstall {package_name}")
+        finally:
+            self.history.safe_finish(op_id, exit_code == 0, exit_code)
+        return exit_code == 0
 
     def get_exact_package_id(self, package_name):
         try:
             # Search for the package to get its exact ID
-            process = subprocess.run(
-                ['winget', 'search', '--name', package_name, '--exact'],
-                capture_output=True,
-                text=True,
+            process = run_command(
+                [*WINGET, 'search', '--name', package_name, '--exact'],
+                timeout=QUERY_TIMEOUT,
+                retries=QUERY_RETRIES,
                 startupinfo=self.startupinfo
             )
             
@@ -399,21 +804,15 @@ class PackageOperations:
             logger.error(f"Error getting exact package ID for {package_name}: {str(e)}", exc_info=True)
             return None
 
-    def update_package(self, package_name, callback=None):
+    def update_package(self, package_name, callback=None, job=None):
+        """Upgrade a package. `job` is set when it runs on the install scheduler"""
         if package_name not in self.packages_data:
             logger.warning(f"Package {package_name} not found in packages data")
             if callback:
                 callback(f"Package {package_name} not found")
             return
 
-        package_data = self.packages_data[package_name]
-        
-        # First try to get ID from our JSON data
-        package_id = None
-        if isinstance(package_data.get('dl'), dict) and package_data['dl'].get('winget'):
-            package_id = package_data['dl']['winget']
-        elif package_data.get('winget'):
-            package_id = package_data['winget']
+        package_id = self.packages_data[package_name].winget_id
 
         if not package_id:
             logger.warning(f"No winget ID found in package data for {package_name}")
@@ -421,49 +820,83 @@ class PackageOperations:
                 callback(f"No winget ID found for {package_name}")
             return
 
+        op_id = self.history.safe_start('update', package_name, package_id)
+        exit_code = None
         try:
             if callback:
                 callback(f"Updating {package_name} (ID: {package_id})...", show_progress=True)
+            on_output, progress = self._progress_reporter(package_name)
                 
             # Try to update using the package ID
-            process = subprocess.run(
-                ['winget', 'upgrade', '--id', package_id, '--accept-source-agreements', '--accept-package-agreements'],
-                capture_output=True,
-                text=True,
+            process = run_command(
+                [*WINGET, 'upgrade', '--id', package_id, '--accept-source-agreements', '--accept-package-agreements'],
+                timeout=INSTALL_TIMEOUT,
+                idle_timeout=INSTALL_IDLE_TIMEOUT,
+                job=job,
+                on_output=on_output,
                 startupinfo=self.startupinfo
             )
             
             # If first attempt fails, try without --id flag
-            if process.returncode != 0:
-                process = subprocess.run(
-                    ['winget', 'upgrade', package_id, '--accept-source-agreements', '--accept-package-agreements'],
-                    capture_output=True,
-                    text=True,
+            if process.returncode != 0 and not (job and job.cancelled):
+                process = run_command(
+                    [*WINGET, 'upgrade', package_id, '--accept-source-agreements', '--accept-package-agreements'],
+                    timeout=INSTALL_TIMEOUT,
+                    idle_timeout=INSTALL_IDLE_TIMEOUT,
+                    job=job,
+                    on_output=on_output,
                     startupinfo=self.startupinfo
                 )
             
+            if process.returncode != 0 and not (job and job.cancelled):
+                logger.info(f"Update of {package_name} failed, retrying elevated")
+                process = self.run_elevated('upgrade', package_id, job, on_output) or process
+            progress.flush()
+            exit_code = process.returncode
+            if job and job.cancelled:
+                logger.info(f"Update of {package_name} was cancelled")
+                if callback:
+                    callback(f"Cancelled update of {package_name}")
+                return
+            if job:
+                job.result = process.returncode == 0
             if process.returncode == 0:
                 # Update both installation and update status
                 self.installation_status[package_name] = True
                 self.update_status_dict[package_name] = False
-                if self.status_queue:
-                    self.status_queue.put(("update_package", (package_name, True, False)))
+                self.available_updates.pop(package_name, None)
                 if callback:
                     callback(f"Successfully updated {package_name}")
             else:
                 if callback:
-                    logger.error(f"Failed to update {package_name}", 
-                                            f"Error: {process.stderr}\nOutput: {process.stdout}")
+                    logger.error(f"Failed to update {package_name}\nError: {process.stderr}\nOutput: {process.stdout}")
                     callback(f"Failed to updated {package_name}")
         except Exception as e:
             logger.error(f"Error updating {package_name}: {str(e)}", exc_info=True)
             if callback:
-                logger.error(f"Error updating {package_name}", 
-                        f"{str(e)}")
                 callback(f"Failed to updated {package_name}")
+        finally:
+            self._publish_status(package_name)
+            self.history.safe_finish(op_id, exit_code == 0, exit_code)
 
     def refresh_packages(self, callback=None, status_queue=None):
         threading.Thread(target=self.load_packages_async, args=(callback, status_queue), daemon=True).start()
 
+    def find_package(self, name):
+        """Resolve a catalog name or winget ID (case-insensitive) to a catalog name"""
+        if name in self.packages_data:
+            return name
+        name = name.lower()
+        entry = self.packages_data.by_id.get(name)
+        if entry:
+            return entry.name
+        return next((package_name for package_name in self.packages_data if package_name.lower() == name), None)
+
     def get_package_info(self, package_name):
-        return self.packages_data.get(package_name, {})
+        """The package's CatalogEntry, or None"""
+        return self.packages_data.get(package_name)
+
+    @property
+    def categories(self):
+        """Category name -> [CatalogEntry]"""
+        return self.packages_data.categories
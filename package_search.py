@@ -0,0 +1,223 @@
+"""
+Ranked, typo-tolerant search over the package catalog.
+
+An inverted index maps every token of a package's name and description to
+the entries containing it, and a trigram index over the token vocabulary
+finds substring and fuzzy (misspelt) matches without scanning the catalog.
+Query terms must all match; whole-token hits rank above prefixes, prefixes
+above substrings and substrings above typos, and hits in the name count
+double.
+
+    python -m package_search --entries 10000
+"""
+
+import argparse
+import bisect
+import heapq
+import json
+import re
+import sys
+import time
+
+TOKEN = re.compile(r'[a-z0-9]+')
+# Score of a query term per kind of match; name hits are worth double
+EXACT, PREFIX, SUBSTRING, FUZZY = 8, 6, 3, 2
+NAME_WEIGHT, DESCRIPTION_WEIGHT = 2, 1
+# Shortest term tried as a substring (needs one trigram) and as a typo
+MIN_SUBSTRING = 3
+MIN_FUZZY = 4
+# Most tokens per term given the (pure Python) edit distance check; the
+# ones sharing the most trigrams with the term go first
+MAX_FUZZY_CANDIDATES = 40
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+def trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def padded_trigrams(token):
+    """Trigrams with word boundaries, so a typo near either end still leaves some shared"""
+    return trigrams(f" {token} ")
+
+
+def max_typos(term):
+    return 1 if len(term) < 8 else 2
+
+
+def within_distance(a, b, limit):
+    """Whether a and b are at most `limit` edits apart, a swap of two adjacent letters being one edit"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                distance = min(distance, before[j - 2] + 1)
+            current.append(distance)
+        if min(current) > limit:
+            return False
+        before, previous = previous, current
+    return previous[-1] <= limit
+
+
+class SearchIndex:
+    """Token and trigram index over a PackageCatalog, built once per catalog load"""
+
+    def __init__(self, catalog):
+        self.entries = list(catalog.values())
+        self.categories = catalog.categories
+        # token -> {entry number: weight}
+        self.postings = {}
+        for number, entry in enumerate(self.entries):
+            name_tokens = set(tokenize(entry.name))
+            for token in set(tokenize(entry.description)) - name_tokens:
+                self.postings.setdefault(token, {})[number] = DESCRIPTION_WEIGHT
+            for token in name_tokens:
+                self.postings.setdefault(token, {})[number] = NAME_WEIGHT
+        self.vocabulary = sorted(self.postings)
+        # trigram -> tokens of the vocabulary containing it, for substrings
+        self.trigram_tokens = {}
+        # padded trigram -> {token length: tokens}, for typos
+        self.fuzzy_trigrams = {}
+        for token in self.vocabulary:
+            for trigram in trigrams(token):
+                self.trigram_tokens.setdefault(trigram, []).append(token)
+            for trigram in padded_trigrams(token):
+                self.fuzzy_trigrams.setdefault(trigram, {}).setdefault(len(token), []).append(token)
+
+    def _term_matches(self, term):
+        """[(token, score)] for every vocabulary token a query term matches"""
+        matches = {}
+        if term in self.postings:
+            matches[term] = EXACT
+        position = bisect.bisect_left(self.vocabulary, term)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(term):
+            matches.setdefault(self.vocabulary[position], PREFIX)
+            position += 1
+
+        if len(term) >= MIN_SUBSTRING:
+            # Every token containing the term contains its rarest trigram
+            postings = [self.trigram_tokens.get(trigram, ()) for trigram in trigrams(term)]
+            for token in min(postings, key=len):
+                if token not in matches and term in token:
+                    matches[token] = SUBSTRING
+
+        if len(term) >= MIN_FUZZY:
+            # Each edit breaks at most three trigrams, and only tokens within
+            # `limit` letters of the term's length can be close enough
+            limit = max_typos(term)
+            grams = padded_trigrams(term)
+            lengths = range(len(term) - limit, len(term) + limit + 1)
+            counts = {}
+            for trigram in grams:
+                buckets = self.fuzzy_trigrams.get(trigram)
+                if buckets:
+                    for length in lengths:
+                        for token in buckets.get(length, ()):
+                            counts[token] = counts.get(token, 0) + 1
+            needed = max(1, len(grams) - 3 * limit)
+            candidates = [(shared, token) for token, shared in counts.items()
+                          if shared >= needed and token not in matches]
+            for _, token in heapq.nlargest(MAX_FUZZY_CANDIDATES, candidates):
+                if within_distance(term, token, limit):
+                    matches[token] = FUZZY
+        return matches.items()
+
+    def search(self, query, category=None):
+        """[(category, [entries])] matching every term of `query`, best first within a category.
+
+        An empty query returns every entry in catalog order, as the catalog's
+        own category lists.
+        """
+        terms = tokenize(query)
+        if not terms:
+            if category is None:
+                return list(self.categories.items())
+            return [(category, self.categories[category])] if category in self.categories else []
+
+        scores = None
+        for term in dict.fromkeys(terms):
+            term_scores = {}
+            for token, score in self._term_matches(term):
+                for number, weight in self.postings[token].items():
+                    if term_scores.get(number, 0) < score * weight:
+                        term_scores[number] = score * weight
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {number: total + term_scores[number]
+                          for number, total in scores.items() if number in term_scores}
+            if not scores:
+                return []
+        # Catalog order breaks ties
+        numbers = sorted(sorted(scores), key=scores.__getitem__, reverse=True)
+
+        grouped = {}
+        for number in numbers:
+            entry = self.entries[number]
+            if category is None or entry.category == category:
+                grouped.setdefault(entry.category, []).append(entry)
+        return [(name, grouped[name]) for name in self.categories if name in grouped]
+
+
+def _typos(words, count, rng):
+    """Misspellings of real vocabulary words: a dropped, doubled, swapped or replaced letter"""
+    typos = []
+    for word in rng.sample([word for word in words if len(word) >= 7], count):
+        i = rng.randrange(1, len(word) - 2)
+        typos.append(rng.choice([
+            word[:i] + word[i + 1:],
+            word[:i] + word[i] + word[i:],
+            word[:i] + word[i + 1] + word[i] + word[i + 2:],
+            word[:i] + 'x' + word[i + 1:]
+        ]))
+    return typos
+
+
+def benchmark(count, vocabulary, runs=20, seed=1):
+    import random
+    from package_catalog import PackageCatalog, _sample_catalog
+    catalog = PackageCatalog.from_json(_sample_catalog(count, vocabulary=vocabulary))
+    start = time.perf_counter()
+    index = SearchIndex(catalog)
+    build_time = time.perf_counter() - start
+
+    words = [token for token in index.vocabulary if not token.isdigit()]
+    rng = random.Random(seed)
+    queries = ['c', 'co', 'con', 'cont', 'contering', 'proterming', 'intersection', 'zzz',
+               ' '.join(rng.sample(words, 2))] + rng.sample(words, 5) + _typos(words, 10, rng)
+    latencies = {}
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(runs):
+            results = index.search(query)
+        latencies[query] = {
+            'ms': round((time.perf_counter() - start) / runs * 1000, 2),
+            'matches': sum(len(entries) for _, entries in results)
+        }
+    return {
+        'entries': count,
+        'tokens': len(index.vocabulary),
+        'build_ms': round(build_time * 1000, 1),
+        'max_query_ms': max(latency['ms'] for latency in latencies.values()),
+        'queries': latencies
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='package_search', description='Benchmark search latency on a synthetic catalog')
+    parser.add_argument('--entries', type=int, default=10000)
+    parser.add_argument('--vocabulary', type=int, default=50000, help='distinct made-up words the descriptions draw from')
+    args = parser.parse_args(argv)
+    print(json.dumps(benchmark(args.entries, args.vocabulary), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from package_operations import PackageOperations
+
+logger = logging.getLogger(__name__)
+
+
+class Prewarm:
+    """Starts the slow startup work in parallel as soon as the process launches.
+
+    The winget probe, catalog fetch/revalidation and the installed and
+    upgradable inventory queries all run on a small pool while the splash is
+    shown. WinTool then consumes the futures instead of starting from zero.
+    """
+
+    def __init__(self, pkg_ops=None):
+        self.pkg_ops = pkg_ops or PackageOperations()
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='prewarm')
+        self.catalog = self.executor.submit(self.pkg_ops.fetch_catalog)
+        self.start_winget_tasks()
+
+    def start_winget_tasks(self):
+        """(Re)start everything that depends on winget, e.g. after installing it"""
+        self.winget = self.executor.submit(self.pkg_ops.get_winget_version)
+        self.installed = self.executor.submit(self.pkg_ops.get_winget_installed_software)
+        self.updates = self.executor.submit(self.pkg_ops.get_winget_updates)
+
+    def tasks(self):
+        return [
+            ("Checking WinGet installation", self.winget),
+            ("Loading package catalog", self.catalog),
+            ("Reading installed packages", self.installed),
+            ("Checking for updates", self.updates)
+        ]
+
+    def progress(self):
+        """Return (completed, total, label of the first pending task)"""
+        tasks = self.tasks()
+        pending = [label for label, future in tasks if not future.done()]
+        return len(tasks) - len(pending), len(tasks), pending[0] if pending else None
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,149 @@
+"""
+Single-instance support for MTech WinTool.
+
+The first instance binds a fixed localhost port, which serves both as the
+instance lock and as the channel later launches use to hand over their
+command-line request. A per-session token stored in the app data directory
+keeps other local processes from driving the running instance.
+
+Only lightweight stdlib modules are imported so a second launch can forward
+its request and exit before Tk or any of the app modules are loaded.
+"""
+
+import hmac
+import json
+import logging
+import os
+import secrets
+import socket
+import threading
+from app_paths import get_data_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 47185
+INSTANCE_FILE = 'instance.json'
+CONNECT_TIMEOUT = 0.5
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+def get_port():
+    return int(os.environ.get('WINTOOL_INSTANCE_PORT', DEFAULT_PORT))
+
+
+def parse_request(argv):
+    """Turn command-line arguments into a hand-off request.
+
+        --install NAME   install a package (repeatable)
+        --tab KEY        switch to a tab (home, packages, tweaks, monitor, ...)
+
+    Unknown arguments are ignored. Without any, the request just focuses
+    the running window.
+    """
+    request = {'action': 'open', 'install': [], 'tab': None}
+    args = iter(argv)
+    for arg in args:
+        if arg == '--install':
+            name = next(args, None)
+            if name:
+                request['install'].append(name)
+        elif arg == '--tab':
+            request['tab'] = next(args, None)
+    return request
+
+
+class InstanceServer:
+    """Owns the instance lock and receives requests from later launches.
+
+    Requests arriving before a handler is set (e.g. while the splash screen
+    is up) are kept and delivered once `set_handler` is called.
+    """
+
+    def __init__(self, port=None):
+        self.port = port or get_port()
+        self.token = secrets.token_hex(16)
+        self.sock = None
+        self.handler = None
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Try to become the primary instance. Returns False if one is running"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if hasattr(socket, 'SO_EXCLUSIVEADDRUSE'):
+            # Stop another process from binding the same port alongside us
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        try:
+            sock.bind(('127.0.0.1', self.port))
+            sock.listen(5)
+        except OSError:
+            sock.close()
+            return False
+
+        self.sock = sock
+        try:
+            with open(get_data_path(INSTANCE_FILE), 'w', encoding='utf-8') as f:
+                json.dump({'port': self.port, 'token': self.token, 'pid': os.getpid()}, f)
+        except Exception as e:
+            logger.warning(f"Failed to write instance file: {str(e)}")
+        threading.Thread(target=self._serve, daemon=True, name='instance-server').start()
+        return True
+
+    def _serve(self):
+        while self.sock:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with conn:
+                try:
+                    conn.settimeout(CONNECT_TIMEOUT)
+                    data = b''
+                    while not data.endswith(b'\n') and len(data) < MAX_REQUEST_BYTES:
+                        chunk = conn.recv(4096)
+                        if not chunk:
+                            break
+                        data += chunk
+                    message = json.loads(data.decode('utf-8'))
+                    if not hmac.compare_digest(str(message.get('token', '')), self.token):
+                        logger.warning("Rejected instance request with a bad token")
+                        conn.sendall(b'denied\n')
+                        continue
+                    conn.sendall(b'ok\n')
+                    self.submit(message.get('request') or {})
+                except Exception as e:
+                    logger.warning(f"Invalid instance request: {str(e)}")
+
+    def submit(self, request):
+        """Deliver a request to the handler, or keep it until one is set"""
+        with self.lock:
+            handler = self.handler
+            if handler is None:
+                self.pending.append(request)
+                return
+        handler(request)
+
+    def set_handler(self, handler):
+        with self.lock:
+            self.handler = handler
+            pending, self.pending = self.pending, []
+        for request in pending:
+            handler(request)
+
+    def close(self):
+        """Release the lock, e.g. before relaunching elevated"""
+        sock, self.sock = self.sock, None
+        if sock:
+            sock.close()
+
+
+def forward_request(request, port=None):
+    """Send a request to the running instance. Returns True if it was accepted"""
+    try:
+        with open(get_data_path(INSTANCE_FILE), 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        with socket.create_connection(('127.0.0.1', port or info['port']), timeout=CONNECT_TIMEOUT) as conn:
+            conn.sendall((json.dumps({'token': info['token'], 'request': request}) + '\n').encode('utf-8'))
+            return conn.recv(16).startswith(b'ok')
+    except Exception:
+        return False
@@ -0,0 +1,255 @@
+"""
+Fast inventory of installed software from the registry.
+
+Reads the Uninstall keys of HKLM (64- and 32-bit views) and HKCU, plus the
+per-user MSIX package repository, and matches the entries to catalog
+packages through a precomputed name/ID index. A scan takes milliseconds
+where `winget list` takes seconds, so it gives the first installed status;
+winget then reconciles it in the background.
+
+The registry module is injectable: pass MemoryRegistry to run a scan
+without Windows.
+
+    python -m software_inventory
+"""
+
+import json
+import logging
+import re
+import sys
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+UNINSTALL_KEY = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"
+MSIX_KEY = r"Software\Classes\Local Settings\Software\Microsoft\Windows\CurrentVersion\AppModel\Repository\Packages"
+# (root, view flag) pairs searched for Uninstall entries
+UNINSTALL_VIEWS = (
+    ('HKEY_LOCAL_MACHINE', 'KEY_WOW64_64KEY'),
+    ('HKEY_LOCAL_MACHINE', 'KEY_WOW64_32KEY'),
+    ('HKEY_CURRENT_USER', None)
+)
+# Uninstall entries that are patches rather than products
+SKIPPED_RELEASE_TYPES = {'update', 'hotfix', 'security update', 'service pack'}
+# Version numbers, parenthesised tags and architectures in display names
+NAME_NOISE = re.compile(r'\([^)]*\)|\bv?\d+(?:\.\d+)+\b|\b(?:x64|x86|arm64|64-bit|32-bit)\b', re.IGNORECASE)
+
+# source is 'registry' or 'msix'; key is the Uninstall subkey or MSIX full name
+InstalledApp = namedtuple('InstalledApp', ['name', 'version', 'publisher', 'source', 'key'])
+
+
+def _value(registry, key, name):
+    try:
+        return registry.QueryValueEx(key, name)[0]
+    except OSError:
+        return None
+
+
+def _subkeys(registry, key):
+    for i in range(registry.QueryInfoKey(key)[0]):
+        yield registry.EnumKey(key, i)
+
+
+def read_uninstall_entries(registry):
+    """Products listed in the Uninstall keys of every registry view"""
+    apps = []
+    for root_name, view_name in UNINSTALL_VIEWS:
+        access = registry.KEY_READ | (getattr(registry, view_name) if view_name else 0)
+        try:
+            root = registry.OpenKey(getattr(registry, root_name), UNINSTALL_KEY, 0, access)
+        except OSError:
+            continue
+        with root:
+            for subkey_name in _subkeys(registry, root):
+                try:
+                    with registry.OpenKey(root, subkey_name, 0, access) as key:
+                        name = _value(registry, key, 'DisplayName')
+                        if (not name or _value(registry, key, 'SystemComponent') == 1
+                                or _value(registry, key, 'ParentKeyName')
+                                or str(_value(registry, key, 'ReleaseType') or '').lower() in SKIPPED_RELEASE_TYPES):
+                            continue
+                        apps.append(InstalledApp(name, _value(registry, key, 'DisplayVersion') or '',
+                                                 _value(registry, key, 'Publisher') or '', 'registry', subkey_name))
+                except OSError:
+                    continue
+    return apps
+
+
+def read_msix_packages(registry):
+    """MSIX/Store packages registered for the current user.
+
+    Subkeys are package full names, Name_Version_Arch_ResourceId_PublisherId.
+    """
+    try:
+        root = registry.OpenKey(registry.HKEY_CURRENT_USER, MSIX_KEY, 0, registry.KEY_READ)
+    except OSError:
+        return []
+    apps = []
+    with root:
+        for full_name in _subkeys(registry, root):
+            parts = full_name.split('_')
+            if len(parts) >= 2:
+                apps.append(InstalledApp(parts[0], parts[1], '', 'msix', full_name))
+    return apps
+
+
+def scan(registry=None):
+    """All installed software found in the registry, as InstalledApp tuples"""
+    if registry is None:
+        import winreg as registry
+    return read_uninstall_entries(registry) + read_msix_packages(registry)
+
+
+def compact(text):
+    """Lowercase alphanumerics only: 'Mozilla.Firefox' and 'Mozilla Firefox' both give 'mozillafirefox'"""
+    return re.sub(r'[^a-z0-9]', '', text.lower())
+
+
+def name_keys(display_name, publisher=''):
+    """Index keys for an installed program's display name"""
+    base = ' '.join(NAME_NOISE.sub(' ', display_name).split())
+    keys = {compact(base)}
+    # "Mozilla Firefox" is usually catalogued as just "Firefox"
+    vendor = publisher.split()[0] if publisher.split() else ''
+    if vendor and base.lower().startswith(vendor.lower() + ' '):
+        keys.add(compact(base[len(vendor):]))
+    keys.discard('')
+    return keys
+
+
+class CatalogIndex:
+    """Maps installed programs to catalog packages by normalized name or winget ID.
+
+    Built once per catalog load from {package name: winget ID}. Catalog
+    names and full IDs take precedence over the ID without its publisher
+    prefix ('Mozilla.Firefox' -> 'firefox').
+    """
+
+    def __init__(self, catalog_ids):
+        self.ids = {}
+        self.keys = {}
+        for package_name, package_id in catalog_ids.items():
+            self.keys.setdefault(compact(package_name), package_name)
+            if package_id:
+                self.ids[package_id.lower()] = package_name
+                self.keys.setdefault(compact(package_id), package_name)
+        for package_name, package_id in catalog_ids.items():
+            if package_id and '.' in package_id:
+                self.keys.setdefault(compact(package_id.split('.', 1)[1]), package_name)
+        self.keys.pop('', None)
+
+    def match(self, app):
+        """The catalog package an installed program belongs to, or None"""
+        if app.source == 'msix' and app.name.lower() in self.ids:
+            return self.ids[app.name.lower()]
+        for key in name_keys(app.name, app.publisher):
+            if key in self.keys:
+                return self.keys[key]
+        return None
+
+    def match_all(self, apps):
+        """{package name: InstalledApp} for every installed program in the catalog"""
+        matched = {}
+        for app in apps:
+            package_name = self.match(app)
+            if package_name:
+                matched.setdefault(package_name, app)
+        return matched
+
+
+class _MemoryKey:
+    def __init__(self, path, values, subkeys):
+        self.path = path
+        self.values = values
+        self.subkeys = subkeys
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def Close(self):
+        pass
+
+
+class MemoryRegistry:
+    """In-memory stand-in for the parts of winreg the inventory uses.
+
+    Keys are added with set_value(); HKLM\\SOFTWARE opened with
+    KEY_WOW64_32KEY is redirected to SOFTWARE\\WOW6432Node as on 64-bit
+    Windows.
+    """
+
+    HKEY_CURRENT_USER = 0x80000001
+    HKEY_LOCAL_MACHINE = 0x80000002
+    KEY_READ = 0x20019
+    KEY_WOW64_64KEY = 0x0100
+    KEY_WOW64_32KEY = 0x0200
+    REG_SZ = 1
+    REG_DWORD = 4
+
+    def __init__(self):
+        # (root, lowercase path) -> (values, [subkey names])
+        self.keys = {}
+
+    def _path(self, root, path, access=0):
+        if (root == self.HKEY_LOCAL_MACHINE and access & self.KEY_WOW64_32KEY
+                and path.lower().startswith('software\\')):
+            path = 'SOFTWARE\\WOW6432Node\\' + path[len('software\\'):]
+        return path
+
+    def set_value(self, root, path, name, value):
+        """Create the key (and its parents) if needed and set a value on it"""
+        parts = path.split('\\')
+        for depth in range(1, len(parts) + 1):
+            key = (root, '\\'.join(parts[:depth]).lower())
+            if key not in self.keys:
+                self.keys[key] = ({}, [])
+                if depth > 1:
+                    self.keys[(root, '\\'.join(parts[:depth - 1]).lower())][1].append(parts[depth - 1])
+        self.keys[(root, path.lower())][0][name] = value
+
+    def OpenKey(self, key, sub_key, reserved=0, access=KEY_READ):
+        if isinstance(key, _MemoryKey):
+            root, path = key.path[0], f"{key.path[1]}\\{sub_key}"
+        else:
+            root, path = key, self._path(key, sub_key, access)
+        entry = self.keys.get((root, path.lower()))
+        if entry is None:
+            raise FileNotFoundError(2, 'The system cannot find the file specified')
+        return _MemoryKey((root, path), *entry)
+
+    def CloseKey(self, key):
+        pass
+
+    def QueryInfoKey(self, key):
+        return len(key.subkeys), len(key.values), 0
+
+    def EnumKey(self, key, index):
+        if index >= len(key.subkeys):
+            raise OSError(259, 'No more data is available')
+        return key.subkeys[index]
+
+    def QueryValueEx(self, key, name):
+        if name not in key.values:
+            raise FileNotFoundError(2, 'The system cannot find the file specified')
+        value = key.values[name]
+        return value, self.REG_DWORD if isinstance(value, int) else self.REG_SZ
+
+
+def main():
+    start = time.perf_counter()
+    apps = scan()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': round(elapsed, 4),
+        'count': len(apps),
+        'apps': [app._asdict() for app in apps]
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
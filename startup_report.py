@@ -0,0 +1,100 @@
+"""
+Startup timing for MTech WinTool.
+
+Import this module first. It records the process start reference and, when
+enabled with `--startup-report` or WINTOOL_STARTUP_REPORT=1, times every
+first-time import the way `python -X importtime` does. Time-to-first-paint
+is always recorded and logged as a metric.
+"""
+
+import builtins
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PROCESS_START = time.perf_counter()
+
+_original_import = builtins.__import__
+_main_thread = threading.get_ident()
+_import_stack = []
+_import_records = []
+_enabled = False
+paint_times = {}
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Only first-time absolute imports on the main thread cost anything worth timing
+    if level or name in sys.modules or threading.get_ident() != _main_thread:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    _import_stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _import_stack.pop()
+        if _import_stack:
+            _import_stack[-1] += elapsed
+        _import_records.append((name, elapsed - children, elapsed, len(_import_stack)))
+
+
+def enable_import_timing():
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        builtins.__import__ = _timed_import
+
+
+def disable_import_timing():
+    global _enabled
+    if _enabled:
+        _enabled = False
+        builtins.__import__ = _original_import
+
+
+def enable_from_args(argv=None):
+    """Turn on import timing if requested on the command line or environment"""
+    argv = sys.argv if argv is None else argv
+    if '--startup-report' in argv or os.environ.get('WINTOOL_STARTUP_REPORT') == '1':
+        enable_import_timing()
+
+
+def elapsed_ms():
+    return (time.perf_counter() - PROCESS_START) * 1000
+
+
+def format_import_report(limit=25):
+    """Render the slowest imports in -X importtime layout (microseconds)"""
+    lines = ["import time: self [us] | cumulative | imported package"]
+    top_level = sorted((r for r in _import_records if r[3] == 0), key=lambda r: r[2], reverse=True)
+    for name, self_time, cumulative, depth in top_level[:limit]:
+        lines.append(f"import time: {int(self_time * 1e6):>9} | {int(cumulative * 1e6):>10} | {name}")
+    total = sum(r[2] for r in top_level)
+    lines.append(f"import time: total {int(total * 1e6)} us across {len(_import_records)} modules")
+    return '\n'.join(lines)
+
+
+def mark_first_paint(window):
+    """Record time since process start until `window` first became idle"""
+    if window in paint_times:
+        return
+    paint_times[window] = elapsed_ms()
+    logger.info(f"Time to first paint ({window}): {paint_times[window]:.1f} ms",
+                extra={'metric': 'time_to_first_paint_ms', 'window': window, 'value': round(paint_times[window], 1)})
+
+    if _enabled and window == 'main_window':
+        disable_import_timing()
+        logger.info("Startup import report\n" + format_import_report())
+
+
+def get_metrics():
+    """Time-to-first-paint gauges for the metrics exporter"""
+    return [
+        (f"wintool_first_paint_{window}_milliseconds", 'gauge', f"Time from process start to first paint of the {window.replace('_', ' ')}", value)
+        for window, value in paint_times.items()
+    ]
@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+DEFAULT_RULES = [
+    {
+        'name': 'High CPU usage',
+        'metric': 'cpu_percent',
+        'op': '>',
+        'threshold': 90,
+        'clear_threshold': 80,
+        'duration': 30,
+        'message': 'CPU usage above 90% for 30 s ({value:.1f}%)'
+    },
+    {
+        'name': 'High memory usage',
+        'metric': 'memory_percent',
+        'op': '>',
+        'threshold': 90,
+        'clear_threshold': 85,
+        'duration': 60,
+        'message': 'Memory usage above 90% for 60 s ({value:.1f}%)'
+    },
+    {
+        'name': 'Low disk space',
+        'metric': 'disk_free',
+        'op': '<',
+        'threshold': 5 * GB,
+        'clear_threshold': 6 * GB,
+        'duration': 0,
+        'scale': GB,
+        'message': 'Free disk space below 5 GB ({value:.1f} GB)'
+    }
+]
+
+
+class AlertRule:
+    """A threshold rule over one sampler metric.
+
+    The rule fires once the metric has been past `threshold` for `duration`
+    seconds and only clears after it has been back past `clear_threshold`
+    for `clear_duration` seconds, so a value hovering around the threshold
+    does not flap. State is a handful of scalars; nothing is rescanned.
+    """
+
+    def __init__(self, name, metric, op, threshold, duration=0, clear_threshold=None,
+                 clear_duration=0, message=None, scale=1):
+        if op not in ('>', '<'):
+            raise ValueError(f"Unsupported operator for rule {name}: {op}")
+        self.name = name
+        self.metric = metric
+        self.op = op
+        self.threshold = threshold
+        self.duration = duration
+        self.clear_threshold = threshold if clear_threshold is None else clear_threshold
+        self.clear_duration = clear_duration
+        self.message = message or f"{name} ({{value}})"
+        self.scale = scale
+        self.active = False
+        self._pending_since = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['name'],
+            data['metric'],
+            data['op'],
+            data['threshold'],
+            duration=data.get('duration', 0),
+            clear_threshold=data.get('clear_threshold'),
+            clear_duration=data.get('clear_duration', 0),
+            message=data.get('message'),
+            scale=data.get('scale', 1)
+        )
+
+    def _breached(self, value):
+        if self.op == '>':
+            return value > self.threshold
+        return value < self.threshold
+
+    def _cleared(self, value):
+        if self.op == '>':
+            return value <= self.clear_threshold
+        return value >= self.clear_threshold
+
+    def update(self, value, now):
+        """Feed one sample. Returns 'fired', 'cleared' or None"""
+        crossing = self._cleared(value) if self.active else self._breached(value)
+        if not crossing:
+            self._pending_since = None
+            return None
+
+        if self._pending_since is None:
+            self._pending_since = now
+        hold = self.clear_duration if self.active else self.duration
+        if now - self._pending_since < hold:
+            return None
+
+        self._pending_since = None
+        self.active = not self.active
+        return 'fired' if self.active else 'cleared'
+
+    def format(self, value):
+        return self.message.format(value=value / self.scale)
+
+
+class AlertEngine:
+    """Evaluates alert rules against each sample from the health sampler"""
+
+    def __init__(self, rules, on_alert=None):
+        self.rules = rules
+        self.on_alert = on_alert
+
+    def evaluate(self, stats, now=None):
+        """Evaluate every rule once against a stats sample, O(rules)"""
+        if now is None:
+            now = time.monotonic()
+
+        messages = []
+        for rule in self.rules:
+            value = stats.get(rule.metric)
+            if value is None:
+                continue
+
+            state = rule.update(value, now)
+            if state == 'fired':
+                message = f"⚠️ {rule.format(value)}"
+                logger.warning(f"Alert fired: {rule.name} ({rule.metric}={value})")
+            elif state == 'cleared':
+                message = f"✅ {rule.name} back to normal"
+                logger.info(f"Alert cleared: {rule.name} ({rule.metric}={value})")
+            else:
+                continue
+
+            messages.append(message)
+            if self.on_alert:
+                self.on_alert(message)
+        return messages
+
+    def active_alerts(self):
+        return [rule.name for rule in self.rules if rule.active]
+
+
+def load_rules(path='alert_rules.json'):
+    """Load alert rules from a JSON list, falling back to the built-in rules"""
+    rules_data = DEFAULT_RULES
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                rules_data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load alert rules from {path}: {str(e)}", exc_info=True)
+            rules_data = DEFAULT_RULES
+
+    rules = []
+    for data in rules_data:
+        try:
+            rules.append(AlertRule.from_dict(data))
+        except Exception as e:
+            logger.error(f"Invalid alert rule {data}: {str(e)}")
+    return rules
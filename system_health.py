@@ -1,13 +1,41 @@
-import psutil
+import os
 import threading
-import time
+from collections import deque
+from metrics_provider import PsutilProvider
+
+# Number of samples kept per metric (10 minutes at the default 3 s tick)
+HISTORY_SIZE = 200
+
+SYSTEM_DRIVE = os.environ.get('SystemDrive', 'C:') + '\\' if os.name == 'nt' else '/'
 
 class SystemHealth:
-    def __init__(self, update_callback):
+    def __init__(self, update_callback, history_size=HISTORY_SIZE, provider=None, cpu_interval=1):
         self.update_callback = update_callback
+        self.provider = provider or PsutilProvider()
+        # Seconds to block measuring CPU; None measures since the previous call
+        self.cpu_interval = cpu_interval
         self.running = False
         self.monitor_thread = None
         self.last_disk_io = None
+        self.history_size = history_size
+        self.history = {}
+        self.listeners = []
+
+    def add_listener(self, listener):
+        """Register a callable that receives every stats sample"""
+        self.listeners.append(listener)
+
+    def get_history(self, metric):
+        """Return the ring buffer for a metric, oldest sample first"""
+        return self.history.get(metric, deque())
+
+    def _record_history(self, stats):
+        """Append a sample to the per-metric ring buffers"""
+        for metric, value in stats.items():
+            series = self.history.get(metric)
+            if series is None:
+                series = self.history[metric] = deque(maxlen=self.history_size)
+            series.append(value)
 
     def start_monitoring(self):
         """Start the system monitoring thread"""
@@ -19,7 +47,7 @@ class SystemHealth:
     def stop_monitoring(self):
         """Stop the system monitoring thread"""
         self.running = False
-        if self.monitor_thread:
+        if self.monitor_thread and self.monitor_thread is not threading.current_thread():
             self.monitor_thread.join()
 
     def _monitor_loop(self):
@@ -27,42 +55,58 @@ class SystemHealth:
         while self.running:
             try:
                 stats = self.get_system_stats()
-                if stats and self.update_callback:
-                    self.update_callback(stats)
+                if stats:
+                    self._record_history(stats)
+                    if self.update_callback:
+                        self.update_callback(stats)
+                    for listener in self.listeners:
+                        try:
+                            listener(stats)
+                        except Exception as e:
+                            print(f"Error in stats listener: {e}")
+            except EOFError:
+                # A replayed recording has run out of samples
+                self.running = False
+                break
             except Exception as e:
                 print(f"Error in monitor loop: {e}")
-            time.sleep(2)  # Update every 2 seconds
+            self.provider.sleep(2)  # Update every 2 seconds
 
     def get_system_stats(self):
         """Get current system statistics"""
         try:
             # CPU Usage and Info
-            cpu_percent = psutil.cpu_percent(interval=1)
-            cpu_count = psutil.cpu_count()
-            cpu_freq = psutil.cpu_freq()
+            cpu_percent = self.provider.cpu_percent(interval=self.cpu_interval)
+            cpu_count = self.provider.cpu_count()
+            cpu_freq = self.provider.cpu_freq()
             cpu_frequency = cpu_freq.current if cpu_freq else 0
             
             # Memory Usage
-            memory = psutil.virtual_memory()
+            memory = self.provider.virtual_memory()
             
             # Disk Usage (use C: drive for Windows)
-            disk = psutil.disk_usage('C:\\')
+            disk = self.provider.disk_usage(SYSTEM_DRIVE)
             
             # Get disk I/O activity
-            disk_io = psutil.disk_io_counters()
+            disk_io = self.provider.disk_io_counters()
             if self.last_disk_io is None:
                 disk_activity = 0
             else:
                 # Calculate disk activity based on read/write bytes difference
-                read_diff = disk_io.read_bytes - self.last_disk_io.read_bytes
-                write_diff = disk_io.write_bytes - self.last_disk_io.write_bytes
+                # Counters can go back (a replay starting over, a disk removed)
+                read_diff = max(0, disk_io.read_bytes - self.last_disk_io.read_bytes)
+                write_diff = max(0, disk_io.write_bytes - self.last_disk_io.write_bytes)
                 total_diff = read_diff + write_diff
                 # Convert to percentage (0-100)
                 disk_activity = min(100, (total_diff / (1024 * 1024)) / 2)  # Divide by 2MB for percentage
             
             self.last_disk_io = disk_io
             
-            return {
+            # Network counters (psutil returns None when there are no NICs)
+            net_io = self.provider.net_io_counters()
+            
+            stats = {
+                'timestamp': self.provider.time(),
                 'cpu_percent': cpu_percent,
                 'cpu_cores': cpu_count,
                 'cpu_frequency': cpu_frequency,
@@ -72,8 +116,18 @@ class SystemHealth:
                 'disk_percent': disk_activity,  # Using actual disk activity
                 'disk_used': disk.used,
                 'disk_total': disk.total,
-                'disk_free': disk.free
+                'disk_free': disk.free,
+                'disk_read_bytes': disk_io.read_bytes,
+                'disk_write_bytes': disk_io.write_bytes,
+                'net_bytes_sent': net_io.bytes_sent if net_io else 0,
+                'net_bytes_recv': net_io.bytes_recv if net_io else 0
             }
+            # Readings jumped since the previous sample, so rates across it are meaningless
+            if self.provider.restarted():
+                stats['discontinuity'] = True
+            return stats
+        except EOFError:
+            raise
         except Exception as e:
             print(f"Error getting system stats: {e}")
             return None
@@ -1,11 +1,11 @@
-import psutil
 import platform
 from datetime import datetime
 import threading
-import time
+from metrics_provider import PsutilProvider
 
 class SystemMonitor:
-    def __init__(self):
+    def __init__(self, provider=None):
+        self.provider = provider or PsutilProvider()
         self.callback = None
         self.running = False
         self.monitor_thread = None
@@ -23,23 +23,29 @@ class SystemMonitor:
 
     def _monitor_loop(self):
         while self.running:
-            stats = self.get_system_stats()
+            try:
+                stats = self.get_system_stats()
+            except EOFError:
+                # A replayed recording has run out of samples
+                self.running = False
+                break
             if self.callback:
                 self.callback(stats)
-            time.sleep(1)  # Update every second
+            self.provider.sleep(1)  # Update every second
 
     def get_system_stats(self):
         stats = {}
         
         # CPU Information
+        cpu_freq = self.provider.cpu_freq()
         stats['cpu'] = {
-            'usage_percent': psutil.cpu_percent(interval=None),
-            'count': psutil.cpu_count(),
-            'frequency': psutil.cpu_freq().current if hasattr(psutil.cpu_freq(), 'current') else 0
+            'usage_percent': self.provider.cpu_percent(interval=None),
+            'count': self.provider.cpu_count(),
+            'frequency': cpu_freq.current if hasattr(cpu_freq, 'current') else 0
         }
 
         # Memory Information
-        memory = psutil.virtual_memory()
+        memory = self.provider.virtual_memory()
         stats['memory'] = {
             'total': memory.total,
             'available': memory.available,
@@ -48,7 +54,7 @@ class SystemMonitor:
         }
 
         # Disk Information
-        disk = psutil.disk_usage('/')
+        disk = self.provider.disk_usage('/')
         stats['disk'] = {
             'total': disk.total,
             'used': disk.used,
@@ -58,7 +64,7 @@ class SystemMonitor:
 
         # System Information
         stats['system'] = {
-            'boot_time': datetime.fromtimestamp(psutil.boot_time()).strftime("%Y-%m-%d %H:%M:%S"),
+            'boot_time': datetime.fromtimestamp(self.provider.boot_time()).strftime("%Y-%m-%d %H:%M:%S"),
             'platform': platform.system(),
             'platform_release': platform.release(),
             'platform_version': platform.version(),
@@ -2,7 +2,6 @@ import os
 import subprocess
 import winreg
 import shutil
-import psutil
 
 class SystemTools:
     @staticmethod
@@ -80,6 +79,7 @@ class SystemTools:
             # Get recycle bin size
             recycle_size = 0
             # Get available drives
+            import psutil
             drives = [d.device for d in psutil.disk_partitions() if 'fixed' in d.opts.lower()]
             
             for drive in drives:
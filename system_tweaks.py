@@ -6,6 +6,85 @@ import logging
 from typing import Dict, Any
 import platform
 import shutil
+from command_runner import run_command
+
+# Watchdog limits in seconds for sc/powercfg/powershell and for cleanup tools
+COMMAND_TIMEOUT = 60
+CLEANUP_TIMEOUT = 1800
+
+# (section title, [(display name, function name, description, category), ...])
+TWEAK_SECTIONS = [
+    ("🚀 Performance Optimization", [
+        ("Set Services to Manual", "set_services_manual", "Set selected Windows services to manual startup", "service"),
+        ("Disable Visual Effects", "disable_visual_effects", "Optimize Windows for better performance", "performance"),
+        ("Disable Transparency", "disable_transparency", "Turn off transparency effects", "performance"),
+        ("Disable Animations", "disable_animations", "Turn off animation effects", "performance"),
+        ("Optimize Processor Scheduling", "optimize_processor_scheduling", "Adjust for best performance of programs", "performance"),
+        ("Disable Background Apps", "disable_background_apps", "Prevent apps from running in background", "performance"),
+        ("Disable Startup Delay", "disable_startup_delay", "Remove delay for startup programs", "performance"),
+        ("Clear Page File at Shutdown", "clear_page_file", "Secure but slower shutdown", "performance"),
+        ("Optimize SSD", "optimize_ssd", "Enable TRIM and disable defrag for SSDs", "performance")
+    ]),
+    ("🔒 Privacy & Security", [
+        ("Disable Telemetry", "disable_telemetry", "Reduce data collection by Windows", "privacy"),
+        ("Disable Cortana", "disable_cortana", "Turn off Cortana assistant", "privacy"),
+        ("Disable Activity History", "disable_activity_history", "Stop Windows from tracking activities", "privacy"),
+        ("Disable Location Tracking", "disable_location_tracking", "Turn off location services", "privacy"),
+        ("Disable Advertising ID", "disable_advertising_id", "Stop personalized ads", "privacy"),
+        ("Disable Windows Tips", "disable_windows_tips", "Stop Windows suggestions", "privacy"),
+        ("Disable Timeline", "disable_timeline", "Turn off Windows Timeline feature", "privacy"),
+        ("Disable Cloud Clipboard", "disable_cloud_clipboard", "Stop syncing clipboard to cloud", "privacy"),
+        ("Disable Diagnostic Data", "disable_diagnostic_data", "Minimize diagnostic data collection", "privacy"),
+        ("Disable Feedback", "disable_feedback", "Turn off feedback notifications", "privacy")
+    ]),
+    ("🖥️ Desktop & Explorer", [
+        ("Show File Extensions", "show_file_extensions", "Display all file extensions", "desktop"),
+        ("Show Hidden Files", "show_hidden_files", "Show hidden files and folders", "desktop"),
+        ("Disable Quick Access", "disable_quick_access", "Clean up File Explorer sidebar", "desktop"),
+        ("Classic Context Menu", "classic_context_menu", "Use Windows 10 style context menu", "desktop"),
+        ("Disable Search Highlights", "disable_search_highlights", "Remove search highlights", "desktop"),
+        ("Enable Dark Mode", "enable_dark_mode", "Enable system-wide dark theme", "desktop")
+    ]),
+    ("⚡ Power & Battery", [
+        ("High Performance", "set_high_performance", "Set power plan to high performance", "power"),
+        ("Disable USB Power Saving", "disable_usb_power_saving", "Prevent USB selective suspend", "power"),
+        ("Disable Sleep Timeout", "disable_sleep", "Prevent system from sleeping", "power")
+    ]),
+    ("🎮 Gaming Optimization", [
+        ("Game Mode", "enable_game_mode", "Enable Windows Game Mode", "gaming"),
+        ("Hardware Acceleration", "enable_hardware_acceleration", "Enable GPU scheduling", "gaming"),
+        ("Disable Game Bar", "disable_game_bar", "Remove Xbox Game Bar", "gaming")
+    ]),
+    ("🌐 Network & Internet", [
+        ("Optimize Network", "optimize_network", "Optimize network settings", "network"),
+        ("Use Fast DNS", "set_dns_servers", "Use faster DNS servers", "network")
+    ]),
+    ("🔧 System Maintenance", [
+        ("Clean Temp Files", "clean_temp_files", "Remove unnecessary files", "maintenance"),
+        ("Optimize Search", "optimize_windows_search", "Windows Search indexer", "maintenance"),
+        ("Optimize Prefetch", "optimize_prefetch", "Optimize Windows Prefetch settings", "maintenance"),
+        ("Optimize Disk Cleanup", "optimize_disk_cleanup", "Configure disk cleanup settings", "maintenance"),
+        ("Optimize System Restore", "optimize_system_restore", "Configure system restore settings", "maintenance")
+    ])
+]
+
+# Tweak class per category
+TWEAK_CLASSES = {
+    'performance': 'PerformanceTweaks',
+    'privacy': 'PrivacyTweaks',
+    'desktop': 'DesktopTweaks',
+    'power': 'PowerTweaks',
+    'gaming': 'GamingTweaks',
+    'network': 'NetworkTweaks',
+    'maintenance': 'MaintenanceTweaks'
+}
+
+
+def create_tweak_handler(category: str):
+    """Instantiate the tweak class for a category, or None if it has none"""
+    class_name = TWEAK_CLASSES.get(category)
+    return globals()[class_name]() if class_name else None
+
 
 class SystemTweaks:
     def __init__(self):
@@ -114,10 +193,10 @@ class PerformanceTweaks:
             mode = 'auto' if auto else 'demand'
             for service in services:
                 try:
-                    subprocess.run(['sc', 'config', service, f'start={mode}'], 
-                                 check=True, capture_output=True, text=True)
+                    run_command(['sc', 'config', service, f'start={mode}'],
+                                check=True, timeout=COMMAND_TIMEOUT)
                     self.logger.info(f"Successfully set {service} to {mode} startup")
-                except subprocess.CalledProcessError as e:
+                except subprocess.SubprocessError as e:
                     self.logger.error(f"Failed to modify {service}: {e.stderr}")
                     continue
             return True
@@ -136,13 +215,12 @@ class PerformanceTweaks:
             str: Current startup type of the service
         """
         try:
-            result = subprocess.run(['sc', 'qc', service_name], 
-                                  capture_output=True, text=True, check=True)
+            result = run_command(['sc', 'qc', service_name], check=True, timeout=COMMAND_TIMEOUT, retries=1)
             for line in result.stdout.splitlines():
                 if 'START_TYPE' in line:
                     return line.strip()
             return "Unknown"
-        except subprocess.CalledProcessError as e:
+        except subprocess.SubprocessError as e:
             self.logger.error(f"Failed to check service {service_name}: {e.stderr}")
             return "Error"
 
@@ -167,7 +245,7 @@ class PerformanceTweaks:
     def disable_system_restore(self, enable: bool = False) -> bool:
         try:
             # Disable System Restore
-            subprocess.run(['vssadmin', 'Delete', 'Shadows', '/All', '/Quiet'], check=True)
+            run_command(['vssadmin', 'Delete', 'Shadows', '/All', '/Quiet'], check=True, timeout=CLEANUP_TIMEOUT)
             reg_path = r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\SystemRestore"
             return self.apply_tweak(reg_path, "DisableSR", 1 if not enable else 0)
         except Exception as e:
@@ -195,11 +273,11 @@ class PerformanceTweaks:
         try:
             service_name = "WSearch"
             if disable:
-                subprocess.run(['sc', 'config', service_name, 'start=disabled'], check=True)
-                subprocess.run(['sc', 'stop', service_name], check=True)
+                run_command(['sc', 'config', service_name, 'start=disabled'], check=True, timeout=COMMAND_TIMEOUT)
+                run_command(['sc', 'stop', service_name], check=True, timeout=COMMAND_TIMEOUT)
             else:
-                subprocess.run(['sc', 'config', service_name, 'start=delayed-auto'], check=True)
-                subprocess.run(['sc', 'start', service_name], check=True)
+                run_command(['sc', 'config', service_name, 'start=delayed-auto'], check=True, timeout=COMMAND_TIMEOUT)
+                run_command(['sc', 'start', service_name], check=True, timeout=COMMAND_TIMEOUT)
             return True
         except Exception as e:
             self.logger.error(f"Failed to modify search indexing: {str(e)}")
@@ -214,13 +292,13 @@ class PerformanceTweaks:
             if optimize:
                 self.apply_tweak(prefetch_path, "EnablePrefetcher", 0)
                 self.apply_tweak(prefetch_path, "EnableSuperfetch", 0)
-                subprocess.run(['sc', 'config', 'SysMain', 'start=disabled'], check=True)
-                subprocess.run(['sc', 'stop', 'SysMain'], check=True)
+                run_command(['sc', 'config', 'SysMain', 'start=disabled'], check=True, timeout=COMMAND_TIMEOUT)
+                run_command(['sc', 'stop', 'SysMain'], check=True, timeout=COMMAND_TIMEOUT)
             else:
                 self.apply_tweak(prefetch_path, "EnablePrefetcher", 3)
                 self.apply_tweak(prefetch_path, "EnableSuperfetch", 3)
-                subprocess.run(['sc', 'config', 'SysMain', 'start=auto'], check=True)
-                subprocess.run(['sc', 'start', 'SysMain'], check=True)
+                run_command(['sc', 'config', 'SysMain', 'start=auto'], check=True, timeout=COMMAND_TIMEOUT)
+                run_command(['sc', 'start', 'SysMain'], check=True, timeout=COMMAND_TIMEOUT)
             return True
         except Exception as e:
             self.logger.error(f"Failed to optimize SSD: {str(e)}")
@@ -384,7 +462,7 @@ class PerformanceTweaks:
 
             # Check Search Indexing
             try:
-                result = subprocess.run(['sc', 'query', 'WSearch'], capture_output=True, text=True)
+                result = run_command(['sc', 'query', 'WSearch'], timeout=COMMAND_TIMEOUT, retries=1)
                 status['search_indexing'] = 'STOPPED' in result.stdout
             except Exception:
                 status['search_indexing'] = False
@@ -624,7 +702,7 @@ class PerformanceTweaks:
                 superfetch, _ = winreg.QueryValueEx(key, "EnableSuperfetch")
                 
                 # Check if SysMain service is disabled
-                result = subprocess.run(['sc', 'query', 'SysMain'], capture_output=True, text=True)
+                result = run_command(['sc', 'query', 'SysMain'], timeout=COMMAND_TIMEOUT, retries=1)
                 service_disabled = 'STOPPED' in result.stdout
                 
                 return prefetcher == 0 and superfetch == 0 and service_disabled
@@ -645,7 +723,7 @@ class PerformanceTweaks:
     def check_disable_search_indexing(self) -> bool:
         try:
             service_name = "WSearch"
-            result = subprocess.run(['sc', 'query', service_name], capture_output=True, text=True)
+            result = run_command(['sc', 'query', service_name], timeout=COMMAND_TIMEOUT, retries=1)
             return "STOPPED" in result.stdout and "DISABLED" in result.stdout
         except Exception as e:
             self.logger.error(f"Failed to check search indexing status: {str(e)}")
@@ -893,21 +971,21 @@ class PrivacyTweaks:
     def disable_telemetry(self, disable: bool = True) -> bool:
         try:
             if disable:
-                subprocess.run(['powershell', '-Command', 
-                              "Set-ItemProperty -Path 'HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows\\DataCollection' -Name 'AllowTelemetry' -Value 0"],
-                             check=True)
+                run_command(['powershell', '-Command', 
+                             "Set-ItemProperty -Path 'HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows\\DataCollection' -Name 'AllowTelemetry' -Value 0"],
+                             check=True, timeout=COMMAND_TIMEOUT)
                 
                 # Disable DiagTrack service
-                subprocess.run(['sc', 'config', 'DiagTrack', 'start=disabled'], check=True)
-                subprocess.run(['sc', 'stop', 'DiagTrack'], check=True)
+                run_command(['sc', 'config', 'DiagTrack', 'start=disabled'], check=True, timeout=COMMAND_TIMEOUT)
+                run_command(['sc', 'stop', 'DiagTrack'], check=True, timeout=COMMAND_TIMEOUT)
             else:
-                subprocess.run(['powershell', '-Command',
-                              "Set-ItemProperty -Path 'HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows\\DataCollection' -Name 'AllowTelemetry' -Value 3"],
-                             check=True)
+                run_command(['powershell', '-Command',
+                             "Set-ItemProperty -Path 'HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows\\DataCollection' -Name 'AllowTelemetry' -Value 3"],
+                             check=True, timeout=COMMAND_TIMEOUT)
                 
                 # Re-enable DiagTrack service
-                subprocess.run(['sc', 'config', 'DiagTrack', 'start=auto'], check=True)
-                subprocess.run(['sc', 'start', 'DiagTrack'], check=True)
+                run_command(['sc', 'config', 'DiagTrack', 'start=auto'], check=True, timeout=COMMAND_TIMEOUT)
+                run_command(['sc', 'start', 'DiagTrack'], check=True, timeout=COMMAND_TIMEOUT)
                 
             return True
         except Exception as e:
@@ -953,11 +1031,11 @@ class PrivacyTweaks:
             
             # Disable Location Service
             if disable:
-                subprocess.run(['sc', 'config', 'lfsvc', 'start=disabled'], check=True)
-                subprocess.run(['sc', 'stop', 'lfsvc'], check=True)
+                run_command(['sc', 'config', 'lfsvc', 'start=disabled'], check=True, timeout=COMMAND_TIMEOUT)
+                run_command(['sc', 'stop', 'lfsvc'], check=True, timeout=COMMAND_TIMEOUT)
             else:
-                subprocess.run(['sc', 'config', 'lfsvc', 'start=auto'], check=True)
-                subprocess.run(['sc', 'start', 'lfsvc'], check=True)
+                run_command(['sc', 'config', 'lfsvc', 'start=auto'], check=True, timeout=COMMAND_TIMEOUT)
+                run_command(['sc', 'start', 'lfsvc'], check=True, timeout=COMMAND_TIMEOUT)
             
             return True
         except Exception as e:
@@ -1125,7 +1203,7 @@ class PrivacyTweaks:
                     continue
             
             # Check DiagTrack service
-            result = subprocess.run(['sc', 'query', 'DiagTrack'], capture_output=True, text=True)
+            result = run_command(['sc', 'query', 'DiagTrack'], timeout=COMMAND_TIMEOUT, retries=1)
             return "STOPPED" in result.stdout and "DISABLED" in result.stdout
         except Exception as e:
             self.logger.error(f"Failed to check telemetry status: {str(e)}")
@@ -1302,7 +1380,7 @@ class PowerTweaks:
         try:
             # Set power plan to High Performance or Balanced
             plan = "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c" if enable else "381b4222-f694-41f0-9685-ff5bb260df2e"
-            subprocess.run(['powercfg', '/setactive', plan], check=True)
+            run_command(['powercfg', '/setactive', plan], check=True, timeout=COMMAND_TIMEOUT)
             return True
         except Exception as e:
             self.logger.error(f"Failed to set power plan: {str(e)}")
@@ -1326,8 +1404,8 @@ class PowerTweaks:
             
             # Also disable USB selective suspend via power settings
             try:
-                subprocess.run(['powercfg', '/setacvalueindex', 'scheme_current', 'sub_buttons', 'UsbSelectiveSuspend', '0' if enable else '1'], check=True)
-                subprocess.run(['powercfg', '/setdcvalueindex', 'scheme_current', 'sub_buttons', 'UsbSelectiveSuspend', '0' if enable else '1'], check=True)
+                run_command(['powercfg', '/setacvalueindex', 'scheme_current', 'sub_buttons', 'UsbSelectiveSuspend', '0' if enable else '1'], check=True, timeout=COMMAND_TIMEOUT)
+                run_command(['powercfg', '/setdcvalueindex', 'scheme_current', 'sub_buttons', 'UsbSelectiveSuspend', '0' if enable else '1'], check=True, timeout=COMMAND_TIMEOUT)
             except Exception:
                 pass
             
@@ -1339,10 +1417,10 @@ class PowerTweaks:
     def disable_sleep(self, enable: bool = True) -> bool:
         try:
             # Disable sleep mode and hibernation
-            subprocess.run(['powercfg', '/change', 'standby-timeout-ac', '0' if enable else '30'], check=True)
-            subprocess.run(['powercfg', '/change', 'standby-timeout-dc', '0' if enable else '15'], check=True)
-            subprocess.run(['powercfg', '/change', 'hibernate-timeout-ac', '0' if enable else '180'], check=True)
-            subprocess.run(['powercfg', '/change', 'hibernate-timeout-dc', '0' if enable else '60'], check=True)
+            run_command(['powercfg', '/change', 'standby-timeout-ac', '0' if enable else '30'], check=True, timeout=COMMAND_TIMEOUT)
+            run_command(['powercfg', '/change', 'standby-timeout-dc', '0' if enable else '15'], check=True, timeout=COMMAND_TIMEOUT)
+            run_command(['powercfg', '/change', 'hibernate-timeout-ac', '0' if enable else '180'], check=True, timeout=COMMAND_TIMEOUT)
+            run_command(['powercfg', '/change', 'hibernate-timeout-dc', '0' if enable else '60'], check=True, timeout=COMMAND_TIMEOUT)
             return True
         except Exception as e:
             self.logger.error(f"Failed to modify sleep settings: {str(e)}")
@@ -1350,7 +1428,7 @@ class PowerTweaks:
 
     def check_high_performance(self) -> bool:
         try:
-            result = subprocess.run(['powercfg', '/getactivescheme'], capture_output=True, text=True)
+            result = run_command(['powercfg', '/getactivescheme'], timeout=COMMAND_TIMEOUT, retries=1)
             return "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c" in result.stdout
         except Exception as e:
             self.logger.error(f"Failed to check power plan status: {str(e)}")
@@ -1379,7 +1457,7 @@ class PowerTweaks:
     def check_sleep(self) -> bool:
         try:
             # Check if sleep is disabled in power settings
-            result = subprocess.run(['powercfg', '/query', 'scheme_current', 'sub_sleep'], capture_output=True, text=True)
+            result = run_command(['powercfg', '/query', 'scheme_current', 'sub_sleep'], timeout=COMMAND_TIMEOUT, retries=1)
             # Look for ACSettingIndex and DCSettingIndex with value 0 (disabled)
             ac_disabled = 'ACSettingIndex    0x00000000' in result.stdout
             dc_disabled = 'DCSettingIndex    0x00000000' in result.stdout
@@ -1402,7 +1480,7 @@ class PowerTweaks:
     def check_set_high_performance(self) -> bool:
         """Check if high performance power plan is active."""
         try:
-            result = subprocess.run(['powercfg', '/getactivescheme'], capture_output=True, text=True)
+            result = run_command(['powercfg', '/getactivescheme'], timeout=COMMAND_TIMEOUT, retries=1)
             # High Performance GUID: 8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c
             return '8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c' in result.stdout
         except Exception as e:
@@ -1424,7 +1502,7 @@ class PowerTweaks:
         """Check if sleep mode is disabled."""
         try:
             # Check if sleep is disabled in power settings
-            result = subprocess.run(['powercfg', '/query', 'scheme_current', 'sub_sleep'], capture_output=True, text=True)
+            result = run_command(['powercfg', '/query', 'scheme_current', 'sub_sleep'], timeout=COMMAND_TIMEOUT, retries=1)
             # Look for ACSettingIndex and DCSettingIndex with value 0 (disabled)
             ac_disabled = 'ACSettingIndex    0x00000000' in result.stdout
             dc_disabled = 'DCSettingIndex    0x00000000' in result.stdout
@@ -1740,7 +1818,7 @@ class NetworkTweaks:
         """Check if custom DNS servers are set."""
         try:
             # Get network interfaces
-            result = subprocess.run(['netsh', 'interface', 'ipv4', 'show', 'dns'], capture_output=True, text=True)
+            result = run_command(['netsh', 'interface', 'ipv4', 'show', 'dns'], timeout=COMMAND_TIMEOUT, retries=1)
             
             # Look for common DNS servers (Google, Cloudflare, etc.)
             common_dns = ['8.8.8.8', '8.8.4.4', '1.1.1.1', '1.0.0.1']
@@ -1769,8 +1847,8 @@ class MaintenanceTweaks:
         try:
             if enable:
                 # Clean Windows temp files
-                subprocess.run(['del', '/s', '/q', '%temp%'], shell=True, check=True)
-                subprocess.run(['del', '/s', '/q', 'C:\\Windows\\Temp'], shell=True, check=True)
+                run_command(['del', '/s', '/q', '%temp%'], shell=True, check=True, timeout=CLEANUP_TIMEOUT)
+                run_command(['del', '/s', '/q', 'C:\\Windows\\Temp'], shell=True, check=True, timeout=CLEANUP_TIMEOUT)
                 return True
             return False
         except Exception as e:
@@ -1805,7 +1883,7 @@ class MaintenanceTweaks:
         try:
             if enable:
                 # Run disk cleanup silently
-                subprocess.run(['cleanmgr', '/sagerun:1'], check=True)
+                run_command(['cleanmgr', '/sagerun:1'], check=True, timeout=CLEANUP_TIMEOUT)
             return True
         except Exception as e:
             self.logger.error(f"Failed to run disk cleanup: {str(e)}")
@@ -1900,7 +1978,7 @@ class MaintenanceTweaks:
         """Check if Windows Search service is optimized."""
         try:
             # Check Windows Search service status
-            result = subprocess.run(['sc', 'query', 'WSearch'], capture_output=True, text=True)
+            result = run_command(['sc', 'query', 'WSearch'], timeout=COMMAND_TIMEOUT, retries=1)
             # Return True if service is stopped
             return 'STOPPED' in result.stdout
         except Exception as e:
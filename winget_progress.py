@@ -0,0 +1,112 @@
+import re
+import time
+from collections import namedtuple
+
+# phase: found, downloading, verifying, installing, done or failed.
+# percent / bytes fields are None when winget did not report them.
+ProgressEvent = namedtuple('ProgressEvent', ['phase', 'percent', 'bytes_done', 'bytes_total', 'message'])
+
+UNITS = {'b': 1, 'kb': 1024, 'mb': 1024 ** 2, 'gb': 1024 ** 3}
+BYTES_PATTERN = re.compile(r'([\d.]+)\s*(B|KB|MB|GB)\s*/\s*([\d.]+)\s*(B|KB|MB|GB)', re.IGNORECASE)
+PERCENT_PATTERN = re.compile(r'(\d{1,3})\s*%')
+# Phase lines in winget's output, matched case-insensitively at the start
+PHASES = (
+    ('found ', 'found'),
+    ('downloading ', 'downloading'),
+    ('successfully verified installer hash', 'verifying'),
+    ('starting package install', 'installing'),
+    ('starting package uninstall', 'installing'),
+    ('successfully installed', 'done'),
+    ('successfully uninstalled', 'done'),
+    ('installer failed', 'failed'),
+    ('installation failed', 'failed')
+)
+
+
+def _to_bytes(value, unit):
+    return int(float(value) * UNITS[unit.lower()])
+
+
+class WingetProgressParser:
+    """Turns chunks of winget console output into ProgressEvents.
+
+    winget redraws its progress bar with carriage returns, so input is split
+    on both \\r and \\n and only complete segments are parsed.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.phase = 'starting'
+
+    def feed(self, text):
+        """Parse a chunk of output and return the events it produced"""
+        self.buffer += text
+        *segments, self.buffer = re.split(r'[\r\n]', self.buffer)
+        events = []
+        for segment in segments:
+            event = self.parse_segment(segment.strip())
+            if event:
+                events.append(event)
+        return events
+
+    def parse_segment(self, segment):
+        if not segment:
+            return None
+        lower = segment.lower()
+        for prefix, phase in PHASES:
+            if lower.startswith(prefix):
+                self.phase = phase
+                return ProgressEvent(phase, 100 if phase == 'done' else None, None, None, segment)
+
+        match = BYTES_PATTERN.search(segment)
+        if match:
+            done = _to_bytes(match.group(1), match.group(2))
+            total = _to_bytes(match.group(3), match.group(4))
+            percent = min(100, int(done * 100 / total)) if total else None
+            return ProgressEvent(self.phase, percent, done, total, segment)
+
+        match = PERCENT_PATTERN.search(segment)
+        if match:
+            return ProgressEvent(self.phase, min(100, int(match.group(1))), None, None, segment)
+        return None
+
+
+class ProgressThrottle:
+    """Forwards at most one event per `interval` seconds.
+
+    Phase changes and completion always go through, so the UI never misses a
+    step, but a fast-redrawing progress bar cannot flood the status queue.
+    """
+
+    def __init__(self, emit, interval=0.25):
+        self.emit = emit
+        self.interval = interval
+        self.last_time = 0.0
+        self.last_phase = None
+        self.pending = None
+
+    def __call__(self, event):
+        now = time.monotonic()
+        if event.phase != self.last_phase or event.percent == 100 or now - self.last_time >= self.interval:
+            self.last_time = now
+            self.last_phase = event.phase
+            self.pending = None
+            self.emit(event)
+        else:
+            self.pending = event
+
+    def flush(self):
+        """Emit the last suppressed event, if any"""
+        if self.pending:
+            event, self.pending = self.pending, None
+            self.emit(event)
+
+
+def format_progress(event):
+    """Short status text for an event, e.g. 'Downloading 1.2 MB / 5.0 MB (24%)'"""
+    label = event.phase.capitalize()
+    if event.bytes_total:
+        return f"{label} {event.bytes_done / UNITS['mb']:.1f} MB / {event.bytes_total / UNITS['mb']:.1f} MB ({event.percent}%)"
+    if event.percent is not None:
+        return f"{label} {event.percent}%"
+    return label
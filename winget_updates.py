@@ -0,0 +1,179 @@
+"""
+Parsing of `winget upgrade` output into typed update records, of `winget
+list` output into the installed IDs and names, and a comparator for the
+version strings winget prints.
+"""
+
+import logging
+import re
+import unicodedata
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Column keys of `winget list` / `winget upgrade` tables, used when the
+# header is localized and cannot be matched by name
+TABLE_COLUMNS = ('name', 'id', 'version', 'available', 'source')
+UNKNOWN_VERSIONS = {'', 'unknown'}
+# winget ends a cell it had to cut short with this
+TRUNCATED = '…'
+VERSION_SEGMENT = re.compile(r'\d+|[a-z]+')
+
+
+class UpdateInfo(namedtuple('UpdateInfo', ['name', 'package_id', 'installed', 'available', 'source'])):
+    """One upgradable package as reported by winget"""
+    __slots__ = ()
+
+    @property
+    def delta(self):
+        return f"{self.installed or '?'} → {self.available or '?'}"
+
+
+class InstalledList(namedtuple('InstalledList', ['ids', 'names', 'truncated_ids', 'truncated_names'])):
+    """Lowercase IDs and names from `winget list`; cells winget cut short are kept as prefixes"""
+    __slots__ = ()
+
+    def has_id(self, package_id):
+        package_id = package_id.lower()
+        return package_id in self.ids or any(package_id.startswith(prefix) for prefix in self.truncated_ids)
+
+    def has_name(self, name):
+        name = name.lower()
+        return name in self.names or any(name.startswith(prefix) for prefix in self.truncated_names)
+
+
+def _cut_columns(line, columns):
+    """Slice a row at the header's offsets, counted in display cells.
+
+    winget pads columns by display width, and wide (e.g. CJK) characters take
+    two cells, so plain character offsets drift on such rows.
+    """
+    cell_index = []
+    for i, char in enumerate(line):
+        cell_index.extend([i] * (2 if unicodedata.east_asian_width(char) in 'WF' else 1))
+
+    def index(cell):
+        return cell_index[cell] if cell is not None and cell < len(cell_index) else len(line)
+    return {name: line[index(start):index(end)].strip() for name, start, end in columns}
+
+
+def parse_winget_table(output):
+    """Parse `winget list` / `winget upgrade` output into one dict per row.
+
+    Columns are cut at the header's offsets, so names containing spaces stay
+    intact. Spinner output before the header and summary lines after a table
+    are skipped; a second table (e.g. upgrades that need explicit targeting)
+    is parsed too.
+    """
+    lines = output.replace('\r', '\n').split('\n')
+    rows = []
+    columns = None
+    for i, line in enumerate(lines):
+        following = lines[i + 1].strip() if i + 1 < len(lines) else ''
+        if following and set(following) == {'-'}:
+            headers = [(m.group().lower(), m.start()) for m in re.finditer(r'\S+', line)]
+            if len(headers) < 3:
+                continue
+            if 'id' not in (name for name, _ in headers):
+                headers = [(key, start) for key, (_, start) in zip(TABLE_COLUMNS, headers)]
+            columns = [(name, start, headers[j + 1][1] if j + 1 < len(headers) else None)
+                       for j, (name, start) in enumerate(headers)]
+            continue
+        if columns is None or not line.strip() or set(line.strip()) == {'-'}:
+            continue
+        row = _cut_columns(line, columns)
+        # Summary lines ("3 upgrades available.") don't fill the ID column
+        if not row.get('id') or ' ' in row['id']:
+            continue
+        rows.append(row)
+    return rows
+
+
+def parse_version(text):
+    """Split a version string into a comparable (segments, bound) key.
+
+    Handles dotted numbers, a leading 'v', pre-release tags ('1.2-beta1')
+    and winget's '< 1.2' / '> 1.2' for versions it could only bracket.
+    Returns None for 'Unknown' or an empty string.
+    """
+    text = (text or '').strip().lower()
+    bound = 0
+    if text[:1] in ('<', '>'):
+        bound = -1 if text[0] == '<' else 1
+        text = text[1:].strip()
+    if text in UNKNOWN_VERSIONS:
+        return None
+    if text[:1] == 'v' and text[1:2].isdigit():
+        text = text[1:]
+    segments = tuple(int(part) if part.isdigit() else part for part in VERSION_SEGMENT.findall(text))
+    return (segments, bound) if segments else None
+
+
+def _compare_segments(a, b):
+    for i in range(max(len(a), len(b))):
+        # A missing number counts as 0 (1.2 == 1.2.0); a missing segment
+        # against a tag means a release against its pre-release (1.2 > 1.2-beta)
+        x = a[i] if i < len(a) else (0 if isinstance(b[i], int) else None)
+        y = b[i] if i < len(b) else (0 if isinstance(a[i], int) else None)
+        if x == y:
+            continue
+        if x is None:
+            return 1
+        if y is None:
+            return -1
+        if type(x) is type(y):
+            return -1 if x < y else 1
+        # A number outranks a tag in the same place: 1.2.1 > 1.2.beta
+        return 1 if isinstance(x, int) else -1
+    return 0
+
+
+def compare_versions(a, b):
+    """-1, 0 or 1 as version `a` is older, equal or newer than `b`; None if either is unknown"""
+    key_a, key_b = parse_version(a), parse_version(b)
+    if key_a is None or key_b is None:
+        return None
+    result = _compare_segments(key_a[0], key_b[0])
+    if result:
+        return result
+    # '< 1.2' sorts just below 1.2, '> 1.2' just above
+    return (key_a[1] > key_b[1]) - (key_a[1] < key_b[1])
+
+
+def is_newer(available, installed):
+    """Whether `available` is an upgrade over `installed`; unknown versions trust winget"""
+    result = compare_versions(available, installed)
+    return result is None or result > 0
+
+
+def parse_installed(output):
+    """`winget list` output as an InstalledList"""
+    ids, names, truncated_ids, truncated_names = set(), set(), set(), set()
+    for row in parse_winget_table(output):
+        for value, exact, truncated in ((row['id'], ids, truncated_ids),
+                                        (row.get('name', ''), names, truncated_names)):
+            value = value.lower()
+            if value.endswith(TRUNCATED):
+                # A bare '…' would be a prefix of everything
+                if value.rstrip(TRUNCATED):
+                    truncated.add(value.rstrip(TRUNCATED))
+            elif value:
+                exact.add(value)
+    return InstalledList(ids, names, truncated_ids, truncated_names)
+
+
+def parse_updates(output):
+    """`winget upgrade` output as {lowercase package ID: UpdateInfo}.
+
+    Rows whose available version is not actually newer than the installed
+    one are dropped.
+    """
+    updates = {}
+    for row in parse_winget_table(output):
+        update = UpdateInfo(row.get('name', ''), row['id'], row.get('version', ''),
+                            row.get('available', ''), row.get('source', ''))
+        if not update.available or not is_newer(update.available, update.installed):
+            logger.debug(f"Ignoring {update.package_id}: {update.delta} is not an upgrade")
+            continue
+        updates[update.package_id.lower()] = update
+    return updates
@@ -0,0 +1,312 @@
+"""
+Command-line interface for MTech WinTool.
+
+Drives PackageOperations, the tweak classes and SystemTools directly
+without loading Tk. Every command prints a single JSON object to stdout and
+exits non-zero if any part of it failed.
+
+    python -m wintool_cli pkg list --installed
+    python -m wintool_cli pkg install "7-Zip" Mozilla.Firefox
+    python -m wintool_cli pkg update --all
+    python -m wintool_cli tweak apply --profile office.json
+    python -m wintool_cli clean --dry-run
+    python -m wintool_cli history --op install --limit 20
+"""
+
+import argparse
+import json
+import sys
+from log_config import setup_logging
+
+
+def _load_packages():
+    # Imported per command so unrelated commands stay fast
+    from package_operations import PackageOperations
+    pkg_ops = PackageOperations()
+    pkg_ops.load_packages_async()
+    if not pkg_ops.packages_data:
+        raise RuntimeError("Failed to load the package catalog")
+    return pkg_ops
+
+
+def _resolve_packages(pkg_ops, names, results):
+    """Map requested names/IDs to catalog names, recording unknown ones as failures"""
+    resolved = []
+    for name in names:
+        package_name = pkg_ops.find_package(name)
+        if package_name:
+            resolved.append(package_name)
+        else:
+            results.append({'package': name, 'ok': False, 'error': 'package not found'})
+    return resolved
+
+
+def _collect_messages(messages):
+    def callback(message, show_progress=False):
+        messages.append(message.strip())
+    return callback
+
+
+def pkg_list(args):
+    pkg_ops = _load_packages()
+    packages = []
+    for package_name, entry in pkg_ops.packages_data.items():
+        installed = pkg_ops.installation_status.get(package_name, False)
+        needs_update = pkg_ops.update_status_dict.get(package_name, False)
+        if args.installed and not installed:
+            continue
+        if args.updates and not needs_update:
+            continue
+        if args.search and args.search.lower() not in entry.search_text:
+            continue
+        package = {
+            'name': package_name,
+            'category': entry.category,
+            'installed': installed,
+            'update_available': needs_update
+        }
+        update = pkg_ops.available_updates.get(package_name)
+        if update:
+            package['installed_version'] = update.installed
+            package['available_version'] = update.available
+        packages.append(package)
+    return True, {'packages': packages}
+
+
+def pkg_install(args):
+    pkg_ops = _load_packages()
+    results = []
+    to_install = []
+    for package_name in _resolve_packages(pkg_ops, args.packages, results):
+        if pkg_ops.installation_status.get(package_name, False):
+            results.append({'package': package_name, 'ok': True, 'skipped': 'already installed'})
+        else:
+            to_install.append(package_name)
+
+    messages = {name: [] for name in to_install}
+    jobs = {}
+    for package_name in to_install:
+        jobs[package_name] = pkg_ops.install_packages([package_name], _collect_messages(messages[package_name]))[0]
+    pkg_ops.scheduler.wait_idle()
+    pkg_ops.shutdown()
+
+    for package_name in to_install:
+        results.append({
+            'package': package_name,
+            'ok': jobs[package_name].result is True,
+            'messages': messages[package_name]
+        })
+    return all(r['ok'] for r in results), {'results': results}
+
+
+def _run_each(args, operation):
+    """Run a synchronous PackageOperations method, which returns whether it succeeded, for each requested package"""
+    pkg_ops = _load_packages()
+    results = []
+    for package_name in _resolve_packages(pkg_ops, args.packages, results):
+        messages = []
+        ok = getattr(pkg_ops, operation)(package_name, _collect_messages(messages)) is True
+        results.append({'package': package_name, 'ok': ok, 'messages': messages})
+    return all(r['ok'] for r in results), {'results': results}
+
+
+def pkg_uninstall(args):
+    return _run_each(args, 'uninstall_package')
+
+
+def pkg_update(args):
+    if not args.all and not args.packages:
+        return False, {'error': 'name packages to update or pass --all'}
+    pkg_ops = _load_packages()
+    results = []
+    if args.all:
+        requested = [name for name, needs_update in pkg_ops.update_status_dict.items() if needs_update]
+    else:
+        requested = _resolve_packages(pkg_ops, args.packages, results)
+    to_update = []
+    for package_name in requested:
+        if pkg_ops.update_status_dict.get(package_name, False):
+            to_update.append(package_name)
+        else:
+            results.append({'package': package_name, 'ok': True, 'skipped': 'no update available'})
+
+    messages = {name: [] for name in to_update}
+    summary = []
+
+    def callback(message, show_progress=False):
+        # Longest match, so "Foo" doesn't claim messages about "Foo Beta"
+        name = max((n for n in to_update if n in message), key=len, default=None)
+        if name:
+            messages[name].append(message.strip())
+
+    pkg_ops.upgrade_packages(to_update, callback, on_complete=summary.extend)
+    pkg_ops.scheduler.wait_idle()
+    pkg_ops.shutdown()
+
+    for entry in summary:
+        results.append(dict(entry, ok=entry['result'] == 'updated', messages=messages[entry['package']]))
+    return all(r['ok'] for r in results), {'results': results}
+
+
+def _tweak_table():
+    from system_tweaks import TWEAK_SECTIONS
+    return {
+        func_name: {'name': tweak_name, 'description': description, 'category': category, 'section': section}
+        for section, tweaks in TWEAK_SECTIONS
+        for tweak_name, func_name, description, category in tweaks
+    }
+
+
+def _tweak_handlers():
+    import system_tweaks
+    handlers = {}
+
+    def get(category):
+        if category not in handlers:
+            handlers[category] = system_tweaks.create_tweak_handler(category)
+        return handlers[category]
+    return get
+
+
+def tweak_list(args):
+    table = _tweak_table()
+    get_handler = _tweak_handlers()
+    tweaks = []
+    for func_name, info in table.items():
+        entry = dict(info, id=func_name)
+        if not args.no_state:
+            check = getattr(get_handler(info['category']), f"check_{func_name}", None)
+            try:
+                entry['enabled'] = bool(check()) if check else None
+            except Exception as e:
+                entry['enabled'] = None
+                entry['error'] = str(e)
+        tweaks.append(entry)
+    return True, {'tweaks': tweaks}
+
+
+def _load_profile(path):
+    """A profile is {"tweaks": {"id": true|false, ...}} or a plain list of IDs to apply"""
+    with open(path, 'r', encoding='utf-8') as f:
+        profile = json.load(f)
+    tweaks = profile.get('tweaks', profile) if isinstance(profile, dict) else profile
+    if isinstance(tweaks, list):
+        return {func_name: True for func_name in tweaks}
+    return {func_name: bool(enable) for func_name, enable in tweaks.items()}
+
+
+def _set_tweaks(requested):
+    from operation_history import open_history
+    table = _tweak_table()
+    get_handler = _tweak_handlers()
+    history = open_history()
+    results = []
+    for func_name, enable in requested.items():
+        result = {'tweak': func_name, 'enable': enable}
+        info = table.get(func_name)
+        func = getattr(get_handler(info['category']), func_name, None) if info else None
+        if func is None:
+            result.update(ok=False, error='unknown tweak')
+        else:
+            op_id = history.safe_start('tweak', func_name)
+            try:
+                result['ok'] = bool(func(enable))
+            except Exception as e:
+                result.update(ok=False, error=str(e))
+            history.safe_finish(op_id, result['ok'])
+        results.append(result)
+    return all(r['ok'] for r in results), {'results': results}
+
+
+def tweak_apply(args):
+    requested = _load_profile(args.profile) if args.profile else {}
+    requested.update({func_name: True for func_name in args.tweaks})
+    return _set_tweaks(requested)
+
+
+def tweak_revert(args):
+    return _set_tweaks({func_name: False for func_name in args.tweaks})
+
+
+def clean(args):
+    from system_tools import SystemTools
+    ok, sizes = SystemTools.get_disk_cleanup_size()
+    if not ok:
+        return False, {'error': sizes}
+    if args.dry_run:
+        return True, {'dry_run': True, 'reclaimable': sizes}
+
+    import system_tweaks
+    results = []
+    success, message = SystemTools.empty_recycle_bin()
+    results.append({'step': 'recycle_bin', 'ok': success, 'message': message})
+    success = system_tweaks.MaintenanceTweaks().clean_temp_files(True)
+    results.append({'step': 'temp_files', 'ok': success})
+    return all(r['ok'] for r in results), {'reclaimable': sizes, 'results': results}
+
+
+def history(args):
+    from operation_history import open_history
+    return True, {'operations': open_history().recent(args.limit, args.op, args.package_id)}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='wintool', description='MTech WinTool command line')
+    parser.add_argument('--pretty', action='store_true', help='indent JSON output')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    pkg = commands.add_parser('pkg', help='package operations').add_subparsers(dest='action', required=True)
+    list_parser = pkg.add_parser('list', help='list catalog packages with their status')
+    list_parser.add_argument('--installed', action='store_true', help='only installed packages')
+    list_parser.add_argument('--updates', action='store_true', help='only packages with updates')
+    list_parser.add_argument('--search', help='filter by name or description')
+    list_parser.set_defaults(func=pkg_list)
+    for action, func in (('install', pkg_install), ('uninstall', pkg_uninstall)):
+        action_parser = pkg.add_parser(action, help=f'{action} packages by catalog name or winget ID')
+        action_parser.add_argument('packages', nargs='+')
+        action_parser.set_defaults(func=func)
+    update_parser = pkg.add_parser('update', help='update packages by catalog name or winget ID')
+    update_parser.add_argument('packages', nargs='*')
+    update_parser.add_argument('--all', action='store_true', help='update every package with an update available')
+    update_parser.set_defaults(func=pkg_update)
+
+    tweak = commands.add_parser('tweak', help='system tweaks').add_subparsers(dest='action', required=True)
+    tweak_list_parser = tweak.add_parser('list', help='list tweaks and their current state')
+    tweak_list_parser.add_argument('--no-state', action='store_true', help='skip checking current state')
+    tweak_list_parser.set_defaults(func=tweak_list)
+    apply_parser = tweak.add_parser('apply', help='apply tweaks by ID and/or from a profile')
+    apply_parser.add_argument('tweaks', nargs='*')
+    apply_parser.add_argument('--profile', help='JSON profile of tweaks to set')
+    apply_parser.set_defaults(func=tweak_apply)
+    revert_parser = tweak.add_parser('revert', help='revert tweaks by ID')
+    revert_parser.add_argument('tweaks', nargs='+')
+    revert_parser.set_defaults(func=tweak_revert)
+
+    clean_parser = commands.add_parser('clean', help='empty the recycle bin and temp files')
+    clean_parser.add_argument('--dry-run', action='store_true', help='only report reclaimable space')
+    clean_parser.set_defaults(func=clean)
+
+    history_parser = commands.add_parser('history', help='recent install, update, uninstall and tweak operations')
+    history_parser.add_argument('--limit', type=int, default=50)
+    history_parser.add_argument('--op', choices=('install', 'update', 'uninstall', 'tweak'))
+    history_parser.add_argument('--package-id', help='only operations for this winget ID')
+    history_parser.set_defaults(func=history)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Logs go to the log file only so stdout stays pure JSON
+    setup_logging(console=False)
+
+    try:
+        ok, output = args.func(args)
+    except Exception as e:
+        ok, output = False, {'error': str(e)}
+    output = dict(ok=ok, **output)
+    print(json.dumps(output, indent=2 if args.pretty else None, default=str))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())